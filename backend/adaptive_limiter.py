@@ -0,0 +1,204 @@
+"""Adaptive (AIMD) concurrency limits per provider and API key.
+
+Each (provider, key) pair gets a window of allowed in-flight requests. The
+window grows by about one request per window's worth of successes (additive
+increase) and halves on a 429/overload response (multiplicative decrease).
+Requests beyond the window wait in per-conversation queues that are served
+round-robin, so one busy conversation cannot starve the others.
+"""
+
+import asyncio
+import contextvars
+import hashlib
+import re
+import time
+import logging
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Starting window per provider. Local backends usually serve one request at a time.
+INITIAL_LIMITS = {
+    "ollama": 2,
+}
+DEFAULT_INITIAL_LIMIT = 4
+MIN_LIMIT = 1
+MAX_LIMIT = 32
+
+# Multiplicative decrease applied on a 429/overload response
+BACKOFF_FACTOR = 0.5
+# A success this many times slower than the smoothed latency does not grow the window
+LATENCY_TOLERANCE = 2.5
+LATENCY_SMOOTHING = 0.2
+
+# HTTP statuses that mean "slow down"
+OVERLOAD_STATUSES = {429, 503, 529}
+_OVERLOAD_PATTERN = re.compile(r"\b(429|503|529)\b|rate.?limit|too many requests|overloaded", re.IGNORECASE)
+
+# Conversation the current request belongs to (fair queueing key)
+_conversation: contextvars.ContextVar[str] = contextvars.ContextVar("limiter_conversation", default="")
+
+
+@contextmanager
+def conversation_scope(conversation_id: str) -> Iterator[None]:
+    """Attribute provider requests made inside this block to a conversation."""
+    token = _conversation.set(conversation_id)
+    try:
+        yield
+    finally:
+        try:
+            _conversation.reset(token)
+        except ValueError:
+            # Async generators may be finalized from a different context
+            pass
+
+
+def current_conversation() -> str:
+    """Conversation the current request is attributed to ('' outside any conversation_scope)."""
+    return _conversation.get()
+
+
+def is_overload(response: Optional[Dict[str, Any]]) -> bool:
+    """Whether a provider response says the upstream is rate limiting or overloaded."""
+    if not response or not response.get("error"):
+        return False
+    if response.get("status_code") in OVERLOAD_STATUSES:
+        return True
+    error = response.get("error")
+    if isinstance(error, str) and (error == "rate_limited" or error in {f"http_{s}" for s in OVERLOAD_STATUSES}):
+        return True
+    return bool(_OVERLOAD_PATTERN.search(response.get("error_message") or ""))
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency window with round-robin queueing across conversations."""
+
+    def __init__(self, name: str, initial_limit: int):
+        self.name = name
+        self.limit = float(initial_limit)
+        self.in_flight = 0
+        self.latency_ewma: Optional[float] = None
+        self.successes = 0
+        self.overloads = 0
+        # When the window was last cut; overloads from requests started before
+        # this belong to the same congestion event and don't cut it again
+        self._last_decrease = 0.0
+        # conversation -> waiting futures, in the order conversations are served
+        self._queues: "OrderedDict[str, Deque[asyncio.Future]]" = OrderedDict()
+
+    @property
+    def waiting(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+
+    async def acquire(self) -> float:
+        """
+        Wait for a slot in the window.
+
+        Returns:
+            The monotonic start time, to pass back to release()
+        """
+        if self.in_flight < int(self.limit) and not self._queues:
+            self.in_flight += 1
+            return time.monotonic()
+
+        conversation = _conversation.get()
+        future = asyncio.get_running_loop().create_future()
+        self._queues.setdefault(conversation, deque()).append(future)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was handed over just as we were cancelled; pass it on
+                self.in_flight -= 1
+                self._dispatch()
+            else:
+                self._discard(conversation, future)
+            raise
+        return time.monotonic()
+
+    def release(self, started: float, response: Optional[Dict[str, Any]]):
+        """Free a slot and adapt the window to how the request went."""
+        self.in_flight -= 1
+
+        if is_overload(response):
+            self.overloads += 1
+            if started >= self._last_decrease:
+                self.limit = max(MIN_LIMIT, self.limit * BACKOFF_FACTOR)
+                self._last_decrease = time.monotonic()
+                logger.info(f"{self.name}: overloaded, concurrency window -> {int(self.limit)}")
+        elif response and not response.get("error"):
+            self.successes += 1
+            latency = time.monotonic() - started
+            slow = self.latency_ewma is not None and latency > self.latency_ewma * LATENCY_TOLERANCE
+            if self.latency_ewma is None:
+                self.latency_ewma = latency
+            else:
+                self.latency_ewma += LATENCY_SMOOTHING * (latency - self.latency_ewma)
+            if not slow:
+                self.limit = min(MAX_LIMIT, self.limit + 1.0 / self.limit)
+
+        self._dispatch()
+
+    def _dispatch(self):
+        """Hand free slots to waiters, one conversation at a time."""
+        while self._queues and self.in_flight < int(self.limit):
+            conversation, queue = next(iter(self._queues.items()))
+            future = queue.popleft()
+            # Rotate: this conversation goes to the back of the line
+            del self._queues[conversation]
+            if queue:
+                self._queues[conversation] = queue
+            if future.done():
+                continue
+            self.in_flight += 1
+            future.set_result(None)
+
+    def _discard(self, conversation: str, future: asyncio.Future):
+        queue = self._queues.get(conversation)
+        if queue is None:
+            return
+        try:
+            queue.remove(future)
+        except ValueError:
+            pass
+        if not queue:
+            del self._queues[conversation]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "waiting_conversations": len(self._queues),
+            "latency_ewma": round(self.latency_ewma, 3) if self.latency_ewma is not None else None,
+            "successes": self.successes,
+            "overloads": self.overloads,
+        }
+
+
+# Limiters keyed by (provider name, API key fingerprint)
+_limiters: Dict[Tuple[str, str], AdaptiveLimiter] = {}
+
+
+def key_fingerprint(secret: str) -> str:
+    """Short stable id for an API key (the key itself is never stored)."""
+    if not secret:
+        return "default"
+    return hashlib.sha256(secret.encode("utf-8")).hexdigest()[:12]
+
+
+def get_limiter(provider: str, credential: str = "") -> AdaptiveLimiter:
+    """Get the limiter for a provider and credential, creating it on first use."""
+    key = (provider, key_fingerprint(credential))
+    limiter = _limiters.get(key)
+    if limiter is None:
+        limiter = AdaptiveLimiter(f"{provider}[{key[1]}]", INITIAL_LIMITS.get(provider, DEFAULT_INITIAL_LIMIT))
+        _limiters[key] = limiter
+    return limiter
+
+
+def get_limiter_stats() -> Dict[str, Dict[str, Any]]:
+    """Current window, queue depth and counters of every limiter."""
+    return {limiter.name: limiter.stats() for limiter in _limiters.values()}
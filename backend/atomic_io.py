@@ -0,0 +1,40 @@
+"""Atomic file writes shared by the storage, cache and snapshot modules."""
+
+import json
+import os
+import tempfile
+from typing import Any, Callable, IO, Optional
+
+
+def atomic_write(path: str, write: Callable[[IO[str]], Any], durable: bool = True):
+    """
+    Call write(f) on a temp file in the same directory, then rename it over path.
+
+    Readers see either the old file or the complete new one, never a partial write.
+
+    Args:
+        path: Destination file (its directory is created if missing)
+        write: Writes the file content to the open temp file
+        durable: fsync before the rename, so the new content survives a power loss
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, 'w') as f:
+            write(f)
+            if durable:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def atomic_write_json(path: str, data: Any, indent: Optional[int] = None, durable: bool = True):
+    """Write data to path as JSON, atomically (see atomic_write)."""
+    atomic_write(path, lambda f: json.dump(data, f, indent=indent), durable)
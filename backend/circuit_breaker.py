@@ -0,0 +1,148 @@
+"""Per-model circuit breakers: stop sending requests to a model that keeps failing.
+
+closed     requests flow; consecutive failures are counted
+open       requests fail immediately until the cooldown has passed
+half_open  one probe request is let through; success closes the breaker,
+           failure re-opens it with a longer cooldown
+"""
+
+import time
+import logging
+from typing import Any, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Each consecutive re-open doubles the cooldown, up to this multiple
+MAX_COOLDOWN_MULTIPLIER = 8
+
+
+class CircuitBreaker:
+    """Breaker for one model on one provider."""
+
+    def __init__(self, model: str, provider: str):
+        self.model = model
+        self.provider = provider
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.cooldown = 0.0
+        self.reopen_count = 0
+        self.last_error: Optional[str] = None
+        self.probe_in_flight = False
+
+    def _retry_at(self) -> Optional[float]:
+        if self.state != OPEN or self.opened_at is None:
+            return None
+        return self.opened_at + self.cooldown
+
+    def allow(self, cooldown: float) -> bool:
+        """Whether a request may be sent now (moves open -> half_open when the cooldown is over)."""
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN and time.monotonic() >= self._retry_at():
+            self.state = HALF_OPEN
+            self.probe_in_flight = False
+        if self.state == HALF_OPEN and not self.probe_in_flight:
+            self.probe_in_flight = True
+            return True
+        return False
+
+    def record_success(self):
+        if self.state != CLOSED:
+            logger.info(f"Circuit for {self.model} closed")
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.reopen_count = 0
+        self.opened_at = None
+        self.probe_in_flight = False
+
+    def record_failure(self, error_message: str, threshold: int, cooldown: float):
+        self.consecutive_failures += 1
+        self.last_error = error_message
+        if self.state == HALF_OPEN:
+            # The probe failed: back off for longer
+            self.reopen_count += 1
+            self._open(cooldown * min(2 ** self.reopen_count, MAX_COOLDOWN_MULTIPLIER))
+        elif self.state == CLOSED and self.consecutive_failures >= threshold:
+            self._open(cooldown)
+
+    def release_probe(self):
+        """A half-open probe ended without an outcome (e.g. cancelled); let another one through."""
+        self.probe_in_flight = False
+
+    def _open(self, cooldown: float):
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+        self.cooldown = cooldown
+        self.probe_in_flight = False
+        logger.warning(
+            f"Circuit for {self.model} opened after {self.consecutive_failures} consecutive failures "
+            f"(cooldown {cooldown:.0f}s): {(self.last_error or '')[:120]}"
+        )
+
+    def snapshot(self) -> Dict[str, Any]:
+        retry_at = self._retry_at()
+        return {
+            "model": self.model,
+            "provider": self.provider,
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "retry_in": round(max(0.0, retry_at - time.monotonic()), 1) if retry_at is not None else None,
+            "last_error": self.last_error,
+        }
+
+
+# Breakers keyed by model id (ids carry their provider prefix)
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_breaker(model: str, provider: str) -> CircuitBreaker:
+    """Get the breaker for a model, creating it on first use."""
+    breaker = _breakers.get(model)
+    if breaker is None:
+        breaker = CircuitBreaker(model, provider)
+        _breakers[model] = breaker
+    return breaker
+
+
+def open_circuit_error(breaker: CircuitBreaker) -> Dict[str, Any]:
+    """Error result returned instead of calling a model whose circuit is open."""
+    retry_in = breaker.snapshot()["retry_in"]
+    when = f"; next probe in {retry_in:.0f}s" if retry_in else ""
+    return {
+        "error": True,
+        "error_message": (
+            f"Skipped: {breaker.model} failed {breaker.consecutive_failures} times in a row{when}. "
+            f"Last error: {breaker.last_error}"
+        ),
+        "circuit_open": True,
+        "retryable": False,
+    }
+
+
+def get_states(models: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Breaker state per model.
+
+    Args:
+        models: Only report these models (unknown ones are reported closed);
+            None reports every breaker created so far
+    """
+    if models is None:
+        return {model: breaker.snapshot() for model, breaker in _breakers.items()}
+    return {
+        model: _breakers[model].snapshot() if model in _breakers else {"model": model, "state": CLOSED}
+        for model in models
+    }
+
+
+def reset(model: Optional[str] = None) -> int:
+    """Close one breaker (or all of them). Returns how many were reset."""
+    targets = [_breakers[model]] if model in _breakers else ([] if model else list(_breakers.values()))
+    for breaker in targets:
+        breaker.record_success()
+    return len(targets)
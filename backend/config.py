@@ -11,6 +11,24 @@ OPENROUTER_API_URL = "https://openrouter.ai/api/v1/chat/completions"
 # Data directory for conversation storage
 DATA_DIR = "data/conversations"
 
+# Conversation storage engine: "sqlite" (default) or "json" (one file per conversation)
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "sqlite")
+
+# SQLite database used by the "sqlite" storage engine
+DATABASE_PATH = os.getenv("DATABASE_PATH", "data/conversations.db")
+
+# On-disk tier of the provider response cache (used when response_cache_disk is on)
+RESPONSE_CACHE_DIR = "data/response_cache"
+
+# Per-model latency history used for adaptive timeouts and hedging
+LATENCY_STATS_PATH = "data/latency_stats.json"
+
+# Snapshot of the provider model catalog, served at startup before the first refresh
+MODEL_CATALOG_PATH = "data/model_catalog.json"
+
+# Worker threads for blocking storage/settings I/O (keeps disk off the event loop)
+STORAGE_IO_WORKERS = int(os.getenv("STORAGE_IO_WORKERS", "4"))
+
 
 def get_openrouter_api_key() -> str:
     """Get OpenRouter API key from settings or environment."""
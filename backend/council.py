@@ -1,13 +1,33 @@
 """3-stage LLM Council orchestration."""
 
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Tuple, Callable, Optional
 import asyncio
 import logging
+import time
 from . import openrouter
 from . import ollama_client
 from .config import get_council_models, get_chairman_model
 from .search import perform_web_search, SearchProvider
 from .settings import get_settings
+from . import response_cache
+from . import single_flight
+from .adaptive_limiter import get_limiter, current_conversation
+from .rate_limits import wait_for_capacity
+from .run_events import set_event_sink
+from .providers.retry import RetryPolicy, is_timeout
+from .circuit_breaker import get_breaker, open_circuit_error
+from .routing import get_routes
+from .prompt_budget import prompt_budget, fit_sections
+from .tokens import count_messages
+from .tournament import response_label, assign_shards, merge_rankings
+from . import latency
+from . import hedging
+from .judge_panel import select_panel
+from . import ranking_output
+from .ranking_output import ranking_schema, parse_json_ranking, format_ranking_text
+from .providers.structured import json_output, current_schema, rejects_structured_output
+from .prompts import STAGE2_JSON_INSTRUCTION
+from .io_pool import run_blocking
 
 logger = logging.getLogger(__name__)
 
@@ -35,21 +55,402 @@ PROVIDERS = {
     "custom": CustomOpenAIProvider(),
 }
 
-def get_provider_for_model(model_id: str) -> Any:
-    """Determine the provider for a given model ID."""
+def get_provider_name(model_id: str) -> str:
+    """Determine the provider name for a given model ID."""
     if ":" in model_id:
         provider_name = model_id.split(":")[0]
         if provider_name in PROVIDERS:
-            return PROVIDERS[provider_name]
+            return provider_name
 
     # Default to OpenRouter for unprefixed models (legacy support)
-    return PROVIDERS["openrouter"]
+    return "openrouter"
+
+
+def get_provider_for_model(model_id: str) -> Any:
+    """Determine the provider for a given model ID."""
+    return PROVIDERS[get_provider_name(model_id)]
+
+
+# Callback receiving streamed deltas: on_token(kind, delta) where kind is 'content' or 'reasoning'
+TokenCallback = Callable[[str, str], None]
+
+# Per-attempt timeout when adaptive timeouts are off
+DEFAULT_TIMEOUT = 120.0
+
+
+async def query_model(
+    model: str,
+    messages: List[Dict[str, str]],
+    timeout: Optional[float] = None,
+    temperature: float = 0.7,
+    on_token: Optional[TokenCallback] = None,
+    stage: Optional[str] = None,
+    deadline: Optional[float] = None
+) -> Dict[str, Any]:
+    """
+    Dispatch query to appropriate provider.
+
+    When on_token is given the provider's streaming API is used and every delta is
+    passed to the callback as it arrives. The return value has the same shape either way.
+
+    When the response cache is enabled for `stage`, identical (model, messages,
+    temperature) queries are answered from the cache. Cached answers carry
+    "cached": True and are replayed to on_token as a single delta.
+
+    Concurrent identical queries share one upstream request (single-flight).
+
+    Models with several routes in settings.model_routes fail over between them;
+    the result's 'route' names the one that answered.
+
+    Transient failures are retried under the shared retry policy; `deadline`
+    (a time.monotonic() value, e.g. the Stage 1 deadline) bounds the retries.
+
+    Without an explicit `timeout`, each attempt's timeout is derived from the
+    model's latency history (see latency.timeout_for).
+    """
+    settings = get_settings()
+    key = response_cache.make_key(model, messages, temperature)
+    if not (settings.response_cache_enabled and stage in settings.response_cache_stages):
+        return await _query_coalesced(key, model, messages, timeout, temperature, on_token, deadline)
+
+    ttl = settings.response_cache_ttl
+    max_entries = settings.response_cache_max_entries
+
+    cached = response_cache.lookup_memory(key, ttl, stage)
+    if cached is None:
+        if settings.response_cache_disk:
+            cached = await run_blocking(response_cache.lookup_disk, key, ttl, stage, max_entries)
+        else:
+            response_cache.record_miss(stage)
+
+    if cached is not None:
+        if on_token is not None:
+            if cached.get("reasoning"):
+                on_token("reasoning", cached["reasoning"])
+            if cached.get("content"):
+                on_token("content", cached["content"])
+        cached["cached"] = True
+        return cached
+
+    response = await _query_coalesced(key, model, messages, timeout, temperature, on_token, deadline)
+    if not response.get("error"):
+        if settings.response_cache_disk:
+            await run_blocking(response_cache.store, key, model, response, stage, max_entries, True)
+        else:
+            response_cache.store(key, model, response, stage, max_entries)
+    return response
+
+
+async def _query_coalesced(
+    key: str,
+    model: str,
+    messages: List[Dict[str, str]],
+    timeout: Optional[float],
+    temperature: float,
+    on_token: Optional[TokenCallback],
+    deadline: Optional[float] = None
+) -> Dict[str, Any]:
+    """
+    Query the provider, joining an identical request already in flight if there is one.
+
+    Only requests from the same conversation under the same settings snapshot
+    are joined, since the shared call runs with the first caller's context.
+    """
+    flight_key = f"{key}:{current_conversation()}:{id(get_settings())}"
+    return await single_flight.run(
+        flight_key,
+        lambda fan_out: _query_routed(model, messages, timeout, temperature, fan_out, deadline),
+        on_token
+    )
+
+
+async def _query_routed(
+    model: str,
+    messages: List[Dict[str, str]],
+    timeout: Optional[float],
+    temperature: float,
+    on_token: Optional[TokenCallback],
+    deadline: Optional[float] = None
+) -> Dict[str, Any]:
+    """
+    Query a logical model over its routes (settings.model_routes) in priority order.
+
+    A route that errors, times out or has an open circuit fails over to the
+    next one; only the last route gets the full retry policy. A streamed
+    answer that already delivered tokens is never failed over. The result
+    carries the route that produced it in 'route'.
+    """
+    routes = get_routes(model, get_settings().model_routes)
+    streamed = False
+
+    def _tracking(kind: str, delta: str):
+        nonlocal streamed
+        streamed = True
+        on_token(kind, delta)
+
+    response: Dict[str, Any] = {}
+    for index, route in enumerate(routes):
+        last = index == len(routes) - 1
+        response = await _query_with_retries(
+            route, messages, timeout, temperature, _tracking if on_token else None, deadline,
+            max_attempts=None if last else 1
+        )
+        if not response.get("error") or streamed or last:
+            break
+        if deadline is not None and time.monotonic() >= deadline:
+            break
+        logger.info(
+            f"Failing over {model}: {route} -> {routes[index + 1]} "
+            f"({str(response.get('error_message', ''))[:120]})"
+        )
+    return {**response, "route": route}
+
+
+async def _query_with_retries(
+    model: str,
+    messages: List[Dict[str, str]],
+    timeout: Optional[float],
+    temperature: float,
+    on_token: Optional[TokenCallback],
+    deadline: Optional[float] = None,
+    max_attempts: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Query the provider, retrying retryable failures (429/5xx, connection
+    resets, timeouts) with Retry-After or jittered backoff within the budget.
+
+    A streamed attempt that already delivered tokens is never retried, since
+    the deltas cannot be taken back.
+
+    The final outcome feeds the model's circuit breaker; while the circuit is
+    open the call fails immediately. A structured request the API rejected
+    (400/422) says nothing about the model's health and is not counted.
+    """
+    settings = get_settings()
+
+    # Skip models whose circuit is open (failing repeatedly) without calling them
+    breaker = None
+    if settings.breaker_failure_threshold > 0:
+        breaker = get_breaker(model, get_provider_name(model))
+        if not breaker.allow(settings.breaker_cooldown):
+            return open_circuit_error(breaker)
+
+    response = None
+    try:
+        response = await _retry_loop(model, messages, timeout, temperature, on_token, deadline, max_attempts)
+        return response
+    finally:
+        if breaker is not None:
+            if response is None or (current_schema() is not None and rejects_structured_output(response)):
+                breaker.release_probe()
+            elif response.get("error"):
+                breaker.record_failure(
+                    str(response.get("error_message", "Unknown error")),
+                    settings.breaker_failure_threshold,
+                    settings.breaker_cooldown
+                )
+            else:
+                breaker.record_success()
+
+
+async def _retry_loop(
+    model: str,
+    messages: List[Dict[str, str]],
+    timeout: Optional[float],
+    temperature: float,
+    on_token: Optional[TokenCallback],
+    deadline: Optional[float],
+    max_attempts: Optional[int] = None
+) -> Dict[str, Any]:
+    settings = get_settings()
+    policy = RetryPolicy(max_attempts or settings.retry_max_attempts, settings.retry_budget, deadline)
+    streamed = False
+
+    def _tracking(kind: str, delta: str):
+        nonlocal streamed
+        streamed = True
+        on_token(kind, delta)
+
+    while True:
+        response = await _query_hedged(model, messages, timeout, temperature, _tracking if on_token else None)
+        if not response.get("error") or streamed:
+            return response
+
+        delay = policy.next_delay(response)
+        if delay is None:
+            return response
+        logger.info(
+            f"Retrying {model} in {delay:.1f}s (attempt {policy.attempts + 1}/{policy.max_attempts}): "
+            f"{str(response.get('error_message', ''))[:120]}"
+        )
+        await asyncio.sleep(delay)
+
+
+async def _query_provider(
+    model: str,
+    messages: List[Dict[str, str]],
+    timeout: Optional[float],
+    temperature: float,
+    on_token: Optional[TokenCallback]
+) -> Dict[str, Any]:
+    """
+    Send one query to the model's provider (streaming when on_token is given).
+
+    The request first waits out any configured RPM/TPM limits (emitting a
+    'queued' run event), then for a slot in the adaptive concurrency window of
+    its provider and API key; its outcome feeds back into that window.
+    """
+    provider_name = get_provider_name(model)
+    provider = PROVIDERS[provider_name]
+    credential = provider.credential_id()
+
+    # Configured RPM/TPM budgets first, so a request waiting on them holds no slot
+    await wait_for_capacity(get_settings().rate_limits, provider_name, model, credential, messages)
+
+    if timeout is None:
+        timeout = _default_timeout(model, streaming=on_token is not None)
+
+    limiter = get_limiter(provider_name, credential)
+    started = await limiter.acquire()
+
+    # Latency history (used for timeouts and hedging) is measured from when the request is sent
+    first_token_at = None
+
+    def _timed(kind: str, delta: str):
+        nonlocal first_token_at
+        if first_token_at is None:
+            first_token_at = time.monotonic()
+        on_token(kind, delta)
 
+    response = None
+    try:
+        response = await _send_to_provider(provider, model, messages, timeout, temperature, _timed if on_token else None)
+        return response
+    finally:
+        limiter.release(started, response)
+        if response is not None and not response.get("error"):
+            latency.record(model, time.monotonic() - started)
+            if first_token_at is not None:
+                latency.record(model, first_token_at - started, kind="first_token")
+        elif is_timeout(response) and first_token_at is None:
+            # Count the timeout as a (lower bound) sample so a model that got
+            # slower pushes its own timeout up instead of timing out forever
+            latency.record(model, timeout, kind="first_token" if on_token else "total")
+
+
+def _default_timeout(model: str, streaming: bool) -> float:
+    """Timeout for a call that didn't ask for one: adaptive, or the fixed default."""
+    settings = get_settings()
+    if not settings.adaptive_timeout_enabled:
+        return DEFAULT_TIMEOUT
+    return latency.timeout_for(model, settings.timeout_floor, settings.timeout_ceiling, streaming)
 
-async def query_model(model: str, messages: List[Dict[str, str]], timeout: float = 120.0, temperature: float = 0.7) -> Dict[str, Any]:
-    """Dispatch query to appropriate provider."""
-    provider = get_provider_for_model(model)
-    return await provider.query(model, messages, timeout, temperature)
+
+async def _query_hedged(
+    model: str,
+    messages: List[Dict[str, str]],
+    timeout: Optional[float],
+    temperature: float,
+    on_token: Optional[TokenCallback]
+) -> Dict[str, Any]:
+    """
+    Send a query, hedging it if enabled: when the request is still unanswered at
+    the model's observed latency quantile (time to first token when streaming),
+    an identical second request is fired and whichever answers first wins; the
+    other is cancelled. Hedges are capped at hedge_max_extra_load of all requests.
+    """
+    settings = get_settings()
+    hedging.note_primary()
+    delay = None
+    if settings.hedge_enabled:
+        delay = latency.quantile(model, settings.hedge_quantile, kind="first_token" if on_token else "total")
+    if delay is None:
+        return await _query_provider(model, messages, timeout, temperature, on_token)
+
+    attempts: List[asyncio.Task] = []
+    # When streaming, the first attempt to produce a token owns the stream
+    stream_owner: Optional[int] = None
+
+    def _claiming(index: int) -> TokenCallback:
+        def _on_token(kind: str, delta: str):
+            nonlocal stream_owner
+            if stream_owner is None:
+                stream_owner = index
+                for other, task in enumerate(attempts):
+                    if other != index:
+                        task.cancel()
+            if stream_owner == index:
+                on_token(kind, delta)
+        return _on_token
+
+    def _start(index: int) -> asyncio.Task:
+        task = asyncio.create_task(
+            _query_provider(model, messages, timeout, temperature, _claiming(index) if on_token else None)
+        )
+        attempts.append(task)
+        return task
+
+    primary = _start(0)
+    try:
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        if done or stream_owner is not None or not hedging.try_acquire(settings.hedge_max_extra_load):
+            return await primary
+
+        logger.info(f"Hedging {model}: no answer after {delay:.1f}s")
+        _start(1)
+        pending = set(attempts)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                index = attempts.index(task)
+                if task.cancelled() or (stream_owner is not None and stream_owner != index):
+                    continue
+                result = task.result()
+                # A failed attempt only wins if there is nothing left to wait for
+                if not result.get("error") or not pending or stream_owner == index:
+                    if index == 1:
+                        hedging.note_hedge_win()
+                    return {**result, "hedged": True}
+        return {"error": True, "error_message": "All hedged attempts were cancelled"}
+    finally:
+        for task in attempts:
+            if not task.done():
+                task.cancel()
+
+
+async def _send_to_provider(
+    provider: Any,
+    model: str,
+    messages: List[Dict[str, str]],
+    timeout: Optional[float],
+    temperature: float,
+    on_token: Optional[TokenCallback]
+) -> Dict[str, Any]:
+    if on_token is None:
+        return await provider.query(model, messages, timeout, temperature)
+
+    content_parts = []
+    reasoning_parts = []
+    async for chunk in provider.query_stream(model, messages, timeout, temperature):
+        if chunk.get("error"):
+            error = {"error": True, "error_message": chunk.get("error_message", "Unknown error")}
+            # Keep what the limiter and retry policy need to classify the failure
+            for field in ("status_code", "retry_after", "retryable", "timed_out"):
+                if chunk.get(field) is not None:
+                    error[field] = chunk[field]
+            return error
+        if chunk.get("reasoning"):
+            reasoning_parts.append(chunk["reasoning"])
+            on_token("reasoning", chunk["reasoning"])
+        if chunk.get("content"):
+            content_parts.append(chunk["content"])
+            on_token("content", chunk["content"])
+
+    return {
+        "content": "".join(content_parts),
+        "reasoning": "".join(reasoning_parts) or None,
+        "error": False
+    }
 
 
 async def query_models_parallel(models: List[str], messages: List[Dict[str, str]]) -> Dict[str, Any]:
@@ -93,7 +494,10 @@ async def stage1_collect_responses(user_query: str, search_context: str = "", re
 
     Yields:
         - First yield: total_models (int)
-        - Subsequent yields: Individual model results (dict)
+        - Subsequent yields: Individual model results (dict), interleaved with
+          streamed token events ({'type': 'stage1_token', 'model', 'kind', 'delta'})
+        - If the quorum or deadline cuts the stage short: a 'stage1_quorum' event,
+          then either cancelled-model results or a LateResponses holder
     """
     settings = get_settings()
 
@@ -128,70 +532,229 @@ async def stage1_collect_responses(user_query: str, search_context: str = "", re
 
     council_temp = settings.council_temperature
 
+    # Quorum/deadline policy: proceed once K successful answers are in, or when
+    # the stage deadline expires (0 disables either check)
+    quorum = min(settings.stage1_quorum, len(models)) if settings.stage1_quorum > 0 else 0
+    deadline = time.monotonic() + settings.stage1_deadline if settings.stage1_deadline > 0 else None
+
+    # Streamed deltas and finished results from every model share one queue,
+    # so each model's tokens are always delivered before its final result
+    events: asyncio.Queue = asyncio.Queue()
+
+    def _token_forwarder(m: str) -> TokenCallback:
+        def _on_token(kind: str, delta: str):
+            events.put_nowait({"type": "stage1_token", "model": m, "kind": kind, "delta": delta})
+        return _on_token
+
     async def _query_safe(m: str):
+        # Rate-limit waits and other run events share the ordered queue
+        set_event_sink(events.put_nowait)
         try:
-            return m, await query_model(m, messages, temperature=council_temp)
+            response = await query_model(
+                m, messages, temperature=council_temp, on_token=_token_forwarder(m), stage="stage1", deadline=deadline
+            )
         except Exception as e:
-            return m, {"error": True, "error_message": str(e)}
+            response = {"error": True, "error_message": str(e)}
+        events.put_nowait((m, response))
+        return m, response
 
     # Create tasks
-    tasks = [asyncio.create_task(_query_safe(m)) for m in models]
+    tasks = {m: asyncio.create_task(_query_safe(m)) for m in models}
     
     # Process as they complete
-    pending = set(tasks)
+    finished = set()
+    successes = 0
+    early_exit_reason = None
     try:
-        while pending:
+        while len(finished) < len(tasks):
             # Check for client disconnect
             if request and await request.is_disconnected():
                 logger.info("Client disconnected during Stage 1. Cancelling tasks...")
-                for t in pending:
+                for t in tasks.values():
                     t.cancel()
                 raise asyncio.CancelledError("Client disconnected")
 
-            # Wait for the next task to complete (with timeout to check for disconnects)
-            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED, timeout=1.0)
+            if quorum and successes >= quorum:
+                early_exit_reason = "quorum"
+                break
+            if deadline is not None and time.monotonic() >= deadline:
+                early_exit_reason = "deadline"
+                break
+
+            # Wait for the next token or result (with timeout to check for disconnects)
+            wait = 1.0 if deadline is None else max(0.0, min(1.0, deadline - time.monotonic()))
+            try:
+                event = await asyncio.wait_for(events.get(), timeout=wait)
+            except asyncio.TimeoutError:
+                continue
+
+            # Streamed token deltas are passed straight through
+            if isinstance(event, dict):
+                yield event
+                continue
+
+            try:
+                model, response = event
+                finished.add(model)
+                result = _format_stage1_result(model, response)
+                if not result.get("error"):
+                    successes += 1
+                yield result
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error processing Stage 1 task result: {e}")
+
+        if early_exit_reason:
+            # Results that arrived alongside the one that ended the stage still count
+            while not events.empty():
+                event = events.get_nowait()
+                if isinstance(event, dict):
+                    yield event
+                    continue
+                model, response = event
+                finished.add(model)
+                yield _format_stage1_result(model, response)
+
+            stragglers = {m: t for m, t in tasks.items() if m not in finished}
+            policy = settings.stage1_straggler_policy
+            logger.info(f"Stage 1 {early_exit_reason} reached; {len(stragglers)} straggler(s) ({policy})")
+            yield {
+                "type": "stage1_quorum",
+                "reason": early_exit_reason,
+                "policy": policy,
+                "pending": list(stragglers)
+            }
 
-            for task in done:
-                try:
-                    model, response = await task
-                    
-                    result = None
-                    if response is not None:
-                        if response.get('error'):
-                            # Include failed models with error info
-                            result = {
-                                "model": model,
-                                "response": None,
-                                "error": response.get('error'),
-                                "error_message": response.get('error_message', 'Unknown error')
-                            }
-                        else:
-                            # Successful response - ensure content is always a string
-                            content = response.get('content', '')
-                            if not isinstance(content, str):
-                                # Handle case where API returns non-string content (array, object, etc.)
-                                content = str(content) if content is not None else ''
-                            result = {
-                                "model": model,
-                                "response": content,
-                                "error": None
-                            }
-                    
-                    if result:
-                        yield result
-                except asyncio.CancelledError:
-                    raise
-                except Exception as e:
-                    logger.error(f"Error processing Stage 1 task result: {e}")
+            if policy == "late":
+                # Leave them running; the caller collects them at the end of the turn
+                yield LateResponses(stragglers)
+            else:
+                for model, task in stragglers.items():
+                    task.cancel()
+                    yield {
+                        "model": model,
+                        "response": None,
+                        "error": True,
+                        "error_message": f"Skipped: Stage 1 {early_exit_reason} reached before this model answered",
+                        "cancelled": True
+                    }
 
     except asyncio.CancelledError:
         # Ensure all tasks are cancelled if we get cancelled
-        for t in tasks:
+        for t in tasks.values():
             if not t.done():
                 t.cancel()
         raise
 
 
+def _format_stage1_result(model: str, response: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Normalize a provider response into a Stage 1 result entry."""
+    if response is None:
+        return {"model": model, "response": None, "error": True, "error_message": "No response received"}
+
+    if response.get('error'):
+        # Include failed models with error info
+        return {
+            "model": model,
+            "response": None,
+            "error": response.get('error'),
+            "error_message": response.get('error_message', 'Unknown error')
+        }
+
+    # Successful response - ensure content is always a string
+    content = response.get('content', '')
+    if not isinstance(content, str):
+        # Handle case where API returns non-string content (array, object, etc.)
+        content = str(content) if content is not None else ''
+    result = {
+        "model": model,
+        "response": content,
+        "error": None
+    }
+    return _with_route(result, response)
+
+
+def _with_route(result: Dict[str, Any], response: Dict[str, Any]) -> Dict[str, Any]:
+    """Record which route served a result when it wasn't the model's own (failover)."""
+    if response.get("route") and response["route"] != result["model"]:
+        result["route"] = response["route"]
+    return result
+
+
+class LateResponses:
+    """
+    Stage 1 members still running after the quorum or deadline was reached.
+
+    Used with stage1_straggler_policy='late': the requests keep running while
+    Stages 2 and 3 proceed, and whatever has arrived by the end of the turn is
+    recorded in the stored message with 'late': True.
+    """
+
+    def __init__(self, tasks: Dict[str, "asyncio.Task"]):
+        self.tasks = tasks
+
+    @property
+    def models(self) -> List[str]:
+        return list(self.tasks)
+
+    def collect(self) -> List[Dict[str, Any]]:
+        """Return results for all stragglers, cancelling any that are still running."""
+        results = []
+        for model, task in self.tasks.items():
+            if task.done() and not task.cancelled():
+                _, response = task.result()
+                result = _format_stage1_result(model, response)
+            else:
+                task.cancel()
+                result = {
+                    "model": model,
+                    "response": None,
+                    "error": True,
+                    "error_message": "Did not answer before the turn finished"
+                }
+            result["late"] = True
+            results.append(result)
+        return results
+
+    def cancel(self) -> None:
+        """Cancel any stragglers that are still running."""
+        for task in self.tasks.values():
+            if not task.done():
+                task.cancel()
+
+
+def _build_ranking_messages(user_query: str, sections: Dict[str, str], settings: Any) -> List[Dict[str, str]]:
+    """Build the Stage 2 ranking prompt from the labelled responses (and optional 'search_context')."""
+    responses_text = "\n\n".join([
+        f"{label}:\n{text}"
+        for label, text in sections.items()
+        if label != "search_context"
+    ])
+
+    search_context_block = ""
+    if sections.get("search_context"):
+        search_context_block = f"Context from Web Search:\n{sections['search_context']}\n"
+
+    try:
+        # Ensure prompt is not None
+        prompt_template = settings.stage2_prompt
+        if not prompt_template:
+            from .prompts import STAGE2_PROMPT_DEFAULT
+            prompt_template = STAGE2_PROMPT_DEFAULT
+
+        ranking_prompt = prompt_template.format(
+            user_query=user_query,
+            responses_text=responses_text,
+            search_context_block=search_context_block
+        )
+    except (KeyError, AttributeError, TypeError) as e:
+        logger.warning(f"Error formatting Stage 2 prompt: {e}. Using fallback.")
+        ranking_prompt = f"Question: {user_query}\n\n{responses_text}\n\nRank these responses."
+
+    return [{"role": "user", "content": ranking_prompt}]
+
+
 async def stage2_collect_rankings(
     user_query: str,
     stage1_results: List[Dict[str, Any]],
@@ -200,10 +763,26 @@ async def stage2_collect_rankings(
 ) -> Any: # Returns an async generator
     """
     Stage 2: Collect peer rankings from all council models.
-    
+
+    With stage2_strategy='tournament' and more members than stage2_shard_size + 1,
+    each judge ranks only a shard of the other members' responses (see
+    tournament.py); its result lists those labels under 'shard'.
+
+    With stage2_panel_size set, only a panel of that many members judges (see
+    judge_panel.py); the panel is announced with a {'type': 'stage2_panel', ...}
+    event right after the mapping. Combined with the tournament strategy, each
+    panel judge keeps its own shard, so responses get fewer judgments.
+
+    With stage2_structured_output, judges whose provider supports it are asked
+    for a JSON ranking (see ranking_output.py); replies that don't validate are
+    parsed with the FINAL RANKING regexes instead. A judge whose API rejects
+    the schema is asked once more for text and not sent the schema again.
+    Each result's 'ranking_format' says which path produced 'parsed_ranking'.
+
     Yields:
         - First yield: label_to_model mapping (dict)
-        - Subsequent yields: Individual model results (dict)
+        - Subsequent yields: Individual model results (dict), interleaved with
+          run events such as {'type': 'queued', ...}
     """
     settings = get_settings()
 
@@ -211,7 +790,7 @@ async def stage2_collect_rankings(
     successful_results = [r for r in stage1_results if not r.get('error')]
 
     # Create anonymized labels for responses (Response A, Response B, etc.)
-    labels = [chr(65 + i) for i in range(len(successful_results))]  # A, B, C, ...
+    labels = [response_label(i) for i in range(len(successful_results))]  # A, B, ..., Z, AA, AB, ...
 
     # Create mapping from label to model name
     label_to_model = {
@@ -222,103 +801,182 @@ async def stage2_collect_rankings(
     # Yield the mapping first so the caller has it
     yield label_to_model
 
-    # Build the ranking prompt
-    responses_text = "\n\n".join([
-        f"Response {label}:\n{result['response']}"
+    # Prompt sections that may be trimmed to fit a judge's context window
+    sections = {
+        f"Response {label}": result['response']
         for label, result in zip(labels, successful_results)
-    ])
-
-    search_context_block = ""
+    }
     if search_context:
-        search_context_block = f"Context from Web Search:\n{search_context}\n"
-
-    try:
-        # Ensure prompt is not None
-        prompt_template = settings.stage2_prompt
-        if not prompt_template:
-            from .prompts import STAGE2_PROMPT_DEFAULT
-            prompt_template = STAGE2_PROMPT_DEFAULT
-
-        ranking_prompt = prompt_template.format(
-            user_query=user_query,
-            responses_text=responses_text,
-            search_context_block=search_context_block
-        )
-    except (KeyError, AttributeError, TypeError) as e:
-        logger.warning(f"Error formatting Stage 2 prompt: {e}. Using fallback.")
-        ranking_prompt = f"Question: {user_query}\n\n{responses_text}\n\nRank these responses."
-
-    messages = [{"role": "user", "content": ranking_prompt}]
+        sections["search_context"] = search_context
+    # Judge model -> what was cut from its prompt
+    trims: Dict[str, Dict[str, Dict[str, int]]] = {}
 
     # Only use models that successfully responded in Stage 1
     # (no point asking failed models to rank - they'll just fail again)
     successful_models = [r['model'] for r in successful_results]
 
+    # Only the panel judges; the other members are done after Stage 1
+    judges = select_panel(
+        successful_models, settings.stage2_panel_size,
+        settings.stage2_panel_strategy, settings.stage2_panel_models
+    )
+    if len(judges) < len(successful_models):
+        yield {"type": "stage2_panel", "judges": judges, "strategy": settings.stage2_panel_strategy}
+
+    # Judge model -> labels it ranks (None: every judge ranks every response)
+    shards: Optional[Dict[str, List[str]]] = None
+    shard_size = settings.stage2_shard_size
+    if settings.stage2_strategy == "tournament" and len(successful_models) > shard_size + 1:
+        shards = {
+            m: [f"Response {labels[i]}" for i in indices]
+            for m, indices in zip(successful_models, assign_shards(len(successful_models), shard_size))
+        }
+
+    def _judge_sections(m: str) -> Dict[str, str]:
+        if shards is None:
+            return sections
+        judged = {label: sections[label] for label in shards[m]}
+        if search_context:
+            judged["search_context"] = search_context
+        return judged
+
+    # Judges asked for a JSON ranking rather than a FINAL RANKING section
+    structured_judges = {
+        m for m in judges
+        if settings.stage2_structured_output
+        and get_provider_for_model(m).supports_json_output
+        and ranking_output.json_supported(m)
+    }
+
+    def _judge_labels(m: str) -> List[str]:
+        return shards[m] if shards is not None else list(label_to_model)
+
+    def _judge_messages(m: str, judge_sections: Dict[str, str]) -> List[Dict[str, str]]:
+        messages = _build_ranking_messages(user_query, judge_sections, settings)
+        if m in structured_judges:
+            messages[-1] = {**messages[-1], "content": messages[-1]["content"] + STAGE2_JSON_INSTRUCTION}
+        return messages
+
     # Use dedicated Stage 2 temperature (lower for consistent ranking output)
     stage2_temp = settings.stage2_temperature
 
+    # Run events (e.g. rate-limit waits) and finished results share one queue
+    events: asyncio.Queue = asyncio.Queue()
+
     async def _query_safe(m: str):
+        set_event_sink(events.put_nowait)
         try:
-            return m, await query_model(m, messages, temperature=stage2_temp)
+            judge_sections = _judge_sections(m)
+            judge_messages = _judge_messages(m, judge_sections)
+            fitted, trimmed = fit_sections(
+                judge_sections, count_messages(judge_messages, m), prompt_budget(m, settings), m
+            )
+            if trimmed:
+                trims[m] = trimmed
+                judge_messages = _judge_messages(m, fitted)
+            schema = ranking_schema(_judge_labels(m)) if m in structured_judges else None
+            with json_output(schema):
+                response = await query_model(m, judge_messages, temperature=stage2_temp, stage="stage2")
+            if schema is not None and rejects_structured_output(response):
+                # The model (not the provider) may not take response_format: ask once more for text
+                logger.warning(
+                    f"{m} rejected the ranking schema ({response.get('error_message', 'Unknown error')}); "
+                    "retrying with the text format"
+                )
+                structured_judges.discard(m)
+                judge_messages = _judge_messages(m, fitted if trimmed else judge_sections)
+                response = await query_model(m, judge_messages, temperature=stage2_temp, stage="stage2")
+                if not response.get("error"):
+                    ranking_output.mark_unsupported(m)
         except Exception as e:
-            return m, {"error": True, "error_message": str(e)}
+            response = {"error": True, "error_message": str(e)}
+        events.put_nowait((m, response))
 
     # Create tasks
-    tasks = [asyncio.create_task(_query_safe(m)) for m in successful_models]
+    tasks = [asyncio.create_task(_query_safe(m)) for m in judges]
 
     # Process as they complete
-    pending = set(tasks)
+    finished = 0
     try:
-        while pending:
+        while finished < len(tasks):
             # Check for client disconnect
             if request and await request.is_disconnected():
                 logger.info("Client disconnected during Stage 2. Cancelling tasks...")
-                for t in pending:
+                for t in tasks:
                     t.cancel()
                 raise asyncio.CancelledError("Client disconnected")
 
-            # Wait for the next task to complete (with timeout to check for disconnects)
-            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED, timeout=1.0)
-
-            for task in done:
-                try:
-                    model, response = await task
-                    
-                    result = None
-                    if response is not None:
-                        if response.get('error'):
-                            # Include failed models with error info
-                            result = {
-                                "model": model,
-                                "ranking": None,
-                                "parsed_ranking": [],
-                                "error": response.get('error'),
-                                "error_message": response.get('error_message', 'Unknown error')
-                            }
+            # Wait for the next event or result (with timeout to check for disconnects)
+            try:
+                event = await asyncio.wait_for(events.get(), timeout=1.0)
+            except asyncio.TimeoutError:
+                continue
+
+            # Run events are passed straight through
+            if isinstance(event, dict):
+                yield event
+                continue
+
+            finished += 1
+            try:
+                model, response = event
+                result = None
+                if response is not None:
+                    if response.get('error'):
+                        # Include failed models with error info
+                        result = {
+                            "model": model,
+                            "ranking": None,
+                            "parsed_ranking": [],
+                            "error": response.get('error'),
+                            "error_message": response.get('error_message', 'Unknown error')
+                        }
+                    else:
+                        # Ensure content is always a string before parsing
+                        full_text = response.get('content', '')
+                        if not isinstance(full_text, str):
+                            # Handle case where API returns non-string content (array, object, etc.)
+                            full_text = str(full_text) if full_text is not None else ''
+                        
+                        structured = None
+                        if model in structured_judges:
+                            structured = parse_json_ranking(full_text, _judge_labels(model))
+
+                        if structured is not None:
+                            evaluation, parsed = structured
+                            # Keep the free-text form the UI and the chairman prompt read
+                            full_text = format_ranking_text(evaluation, parsed)
+                            ranking_format = "json"
                         else:
-                            # Ensure content is always a string before parsing
-                            full_text = response.get('content', '')
-                            if not isinstance(full_text, str):
-                                # Handle case where API returns non-string content (array, object, etc.)
-                                full_text = str(full_text) if full_text is not None else ''
-                            
                             # Parse with expected count to avoid duplicates
-                            expected_count = len(successful_results)
-                            parsed = parse_ranking_from_text(full_text, expected_count=expected_count)
-                            
-                            result = {
-                                "model": model,
-                                "ranking": full_text,
-                                "parsed_ranking": parsed,
-                                "error": None
-                            }
-                    
-                    if result:
-                        yield result
-                except asyncio.CancelledError:
-                    raise
-                except Exception as e:
-                    logger.error(f"Error processing task result: {e}")
+                            if shards is None:
+                                parsed = parse_ranking_from_text(full_text, expected_count=len(successful_results))
+                            else:
+                                parsed = _ranking_within(parse_ranking_from_text(full_text), shards[model])
+                            if not parsed:
+                                ranking_format = "failed"
+                            else:
+                                ranking_format = "fallback" if model in structured_judges else "text"
+                        ranking_output.record(model, ranking_format)
+
+                        result = _with_route({
+                            "model": model,
+                            "ranking": full_text,
+                            "parsed_ranking": parsed,
+                            "ranking_format": ranking_format,
+                            "error": None
+                        }, response)
+                        if shards is not None:
+                            result["shard"] = shards[model]
+                        if model in trims:
+                            result["prompt_trimmed"] = trims[model]
+                
+                if result:
+                    yield result
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error processing task result: {e}")
 
     except asyncio.CancelledError:
         # Ensure all tasks are cancelled if we get cancelled
@@ -328,41 +986,23 @@ async def stage2_collect_rankings(
         raise
 
 
-async def stage3_synthesize_final(
-    user_query: str,
-    stage1_results: List[Dict[str, Any]],
-    stage2_results: List[Dict[str, Any]],
-    search_context: str = ""
-) -> Dict[str, Any]:
-    """
-    Stage 3: Chairman synthesizes final response.
-
-    Args:
-        user_query: The original user query
-        stage1_results: Individual model responses from Stage 1
-        stage2_results: Rankings from Stage 2
-
-    Returns:
-        Dict with 'model' and 'response' keys
-    """
-    settings = get_settings()
-
-    # Build comprehensive context for chairman (only include successful responses)
+def _build_chairman_messages(user_query: str, sections: Dict[str, str], settings: Any) -> List[Dict[str, str]]:
+    """Build the Stage 3 chairman messages from 'stage1:<model>' / 'stage2:<model>' / 'search_context' sections."""
     stage1_text = "\n\n".join([
-        f"Model: {result['model']}\nResponse: {result.get('response', 'No response')}"
-        for result in stage1_results
-        if result.get('response') is not None
+        f"Model: {name[len('stage1:'):]}\nResponse: {text}"
+        for name, text in sections.items()
+        if name.startswith("stage1:")
     ])
 
     stage2_text = "\n\n".join([
-        f"Model: {result['model']}\nRanking: {result.get('ranking', 'No ranking')}"
-        for result in stage2_results
-        if result.get('ranking') is not None
+        f"Model: {name[len('stage2:'):]}\nRanking: {text}"
+        for name, text in sections.items()
+        if name.startswith("stage2:")
     ])
 
     search_context_block = ""
-    if search_context:
-        search_context_block = f"Context from Web Search:\n{search_context}\n"
+    if sections.get("search_context"):
+        search_context_block = f"Context from Web Search:\n{sections['search_context']}\n"
 
     try:
         # Ensure prompt is not None
@@ -397,12 +1037,55 @@ async def stage3_synthesize_final(
         # If custom prompt, send as single User message to respect user's custom persona/structure
         messages = [{"role": "user", "content": chairman_prompt}]
 
-    # Query the chairman model with error handling
+    return messages
+
+
+async def stage3_synthesize_final(
+    user_query: str,
+    stage1_results: List[Dict[str, Any]],
+    stage2_results: List[Dict[str, Any]],
+    search_context: str = "",
+    on_token: Optional[TokenCallback] = None
+) -> Dict[str, Any]:
+    """
+    Stage 3: Chairman synthesizes final response.
+
+    Args:
+        user_query: The original user query
+        stage1_results: Individual model responses from Stage 1
+        stage2_results: Rankings from Stage 2
+        on_token: Optional callback to receive the chairman's streamed deltas
+
+    Returns:
+        Dict with 'model' and 'response' keys, plus 'reasoning' when the chairman returned any
+    """
+    settings = get_settings()
+
+    # Prompt sections that may be trimmed to fit the chairman's context window
+    # (only include successful responses)
+    sections = {}
+    for result in stage1_results:
+        if result.get('response') is not None:
+            sections[f"stage1:{result['model']}"] = result['response']
+    for result in stage2_results:
+        if result.get('ranking') is not None:
+            sections[f"stage2:{result['model']}"] = result['ranking']
+    if search_context:
+        sections["search_context"] = search_context
+
     chairman_model = get_chairman_model()
+    messages = _build_chairman_messages(user_query, sections, settings)
+    fitted, trimmed = fit_sections(
+        sections, count_messages(messages, chairman_model), prompt_budget(chairman_model, settings), chairman_model
+    )
+    if trimmed:
+        messages = _build_chairman_messages(user_query, fitted, settings)
+
+    # Query the chairman model with error handling
     chairman_temp = settings.chairman_temperature
 
     try:
-        response = await query_model(chairman_model, messages, temperature=chairman_temp)
+        response = await query_model(chairman_model, messages, temperature=chairman_temp, on_token=on_token, stage="stage3")
 
         # Check for error in response
         if response is None or response.get('error'):
@@ -414,27 +1097,30 @@ async def stage3_synthesize_final(
                 "error_message": error_msg
             }
 
-        # Combine reasoning and content if available
+        # Reasoning is kept separate from the answer text
         content = response.get('content') or ''
         reasoning = response.get('reasoning') or response.get('reasoning_details') or ''
+        if not isinstance(reasoning, str):
+            reasoning = str(reasoning)
         
         final_response = content
         if reasoning and not content:
             # If only reasoning is provided (some reasoning models do this)
             final_response = f"**Reasoning:**\n{reasoning}"
-        elif reasoning and content:
-            # If both are provided, prepend reasoning in a collapsible block or just prepend
-            # For now, we'll just prepend it clearly
-            final_response = f"<think>\n{reasoning}\n</think>\n\n{content}"
 
         if not final_response:
              final_response = "No response generated by the Chairman."
 
-        return {
+        result = _with_route({
             "model": chairman_model,
             "response": final_response,
             "error": False
-        }
+        }, response)
+        if reasoning and content:
+            result["reasoning"] = reasoning
+        if trimmed:
+            result["prompt_trimmed"] = trimmed
+        return result
 
     except Exception as e:
         logger.error(f"Unexpected error in Stage 3 synthesis: {e}")
@@ -446,6 +1132,62 @@ async def stage3_synthesize_final(
         }
 
 
+async def stage3_stream_final(
+    user_query: str,
+    stage1_results: List[Dict[str, Any]],
+    stage2_results: List[Dict[str, Any]],
+    search_context: str = "",
+    request: Any = None
+) -> Any:
+    """
+    Stage 3 with live output: stream the chairman's synthesis as it is generated.
+
+    Yields:
+        - Delta events: {'type': 'stage3_delta', 'model', 'delta'} for answer text and
+          {'type': 'stage3_reasoning_delta', 'model', 'delta'} for reasoning
+        - Last yield: the final result dict from stage3_synthesize_final
+    """
+    chairman_model = get_chairman_model()
+    events: asyncio.Queue = asyncio.Queue()
+
+    def _on_token(kind: str, delta: str):
+        event_type = "stage3_delta" if kind == "content" else "stage3_reasoning_delta"
+        events.put_nowait({"type": event_type, "model": chairman_model, "delta": delta})
+
+    async def _synthesize():
+        set_event_sink(events.put_nowait)
+        # The final result goes through the queue too, so it always follows the last delta
+        result = await stage3_synthesize_final(
+            user_query, stage1_results, stage2_results, search_context, on_token=_on_token
+        )
+        events.put_nowait(result)
+
+    task = asyncio.create_task(_synthesize())
+    try:
+        while True:
+            # Check for client disconnect
+            if request and await request.is_disconnected():
+                logger.info("Client disconnected during Stage 3. Cancelling chairman request...")
+                task.cancel()
+                raise asyncio.CancelledError("Client disconnected")
+
+            try:
+                item = await asyncio.wait_for(events.get(), timeout=1.0)
+            except asyncio.TimeoutError:
+                if task.done() and task.exception():
+                    raise task.exception()
+                continue
+
+            yield item
+            if not item.get("type"):
+                break
+
+    except asyncio.CancelledError:
+        if not task.done():
+            task.cancel()
+        raise
+
+
 def parse_ranking_from_text(ranking_text: str, expected_count: int = None) -> List[str]:
     """
     Parse the FINAL RANKING section from the model's response.
@@ -473,17 +1215,17 @@ def parse_ranking_from_text(ranking_text: str, expected_count: int = None) -> Li
             ranking_section = parts[1]
             # Try to extract numbered list format (e.g., "1. Response A")
             # This pattern looks for: number, period, optional space, "Response X"
-            numbered_matches = re.findall(r'\d+\.\s*Response [A-Z]', ranking_section)
+            numbered_matches = re.findall(r'\d+\.\s*Response [A-Z]{1,3}\b', ranking_section)
             if numbered_matches:
                 # Extract just the "Response X" part
-                matches = [re.search(r'Response [A-Z]', m).group() for m in numbered_matches]
+                matches = [re.search(r'Response [A-Z]{1,3}\b', m).group() for m in numbered_matches]
             else:
                 # Fallback: Extract all "Response X" patterns in order from the section
-                matches = re.findall(r'Response [A-Z]', ranking_section)
+                matches = re.findall(r'Response [A-Z]{1,3}\b', ranking_section)
     
     # If no matches found in section (or section missing), fallback to full text search
     if not matches:
-        matches = re.findall(r'Response [A-Z]', ranking_text)
+        matches = re.findall(r'Response [A-Z]{1,3}\b', ranking_text)
 
     # Truncate if expected_count is provided
     if expected_count and len(matches) > expected_count:
@@ -492,6 +1234,16 @@ def parse_ranking_from_text(ranking_text: str, expected_count: int = None) -> Li
     return matches
 
 
+def _ranking_within(parsed: List[str], shard: List[str]) -> List[str]:
+    """Keep a sharded judge's ranking to the labels it was given, first mention only."""
+    allowed = set(shard)
+    ranking = []
+    for label in parsed:
+        if label in allowed and label not in ranking:
+            ranking.append(label)
+    return ranking
+
+
 def calculate_aggregate_rankings(
     stage2_results: List[Dict[str, Any]],
     label_to_model: Dict[str, str]
@@ -499,6 +1251,10 @@ def calculate_aggregate_rankings(
     """
     Calculate aggregate rankings across all models.
 
+    For sharded (tournament) Stage 2 results, positions are rescaled to the
+    full council size so shards are comparable, and the order comes from a
+    Bradley-Terry fit of the partial rankings ('strength' in the output).
+
     Args:
         stage2_results: Rankings from each model
         label_to_model: Mapping from anonymous labels to model names
@@ -510,16 +1266,27 @@ def calculate_aggregate_rankings(
 
     # Track positions for each model
     model_positions = defaultdict(list)
+    partial_rankings = []
+    sharded = any(ranking.get('shard') for ranking in stage2_results)
 
     for ranking in stage2_results:
         ranking_text = ranking['ranking']
 
-        # Parse the ranking from the structured format
+        # Stage 2 already parsed each ranking; re-parse only results stored without it
         expected_count = len(label_to_model)
-        parsed_ranking = parse_ranking_from_text(ranking_text, expected_count=expected_count)
+        parsed_ranking = ranking.get('parsed_ranking')
+        if parsed_ranking is None:
+            if ranking.get('shard'):
+                parsed_ranking = _ranking_within(parse_ranking_from_text(ranking_text), ranking['shard'])
+            else:
+                parsed_ranking = parse_ranking_from_text(ranking_text, expected_count=expected_count)
+        partial_rankings.append([label for label in parsed_ranking if label in label_to_model])
 
         for position, label in enumerate(parsed_ranking, start=1):
             if label in label_to_model:
+                if sharded and len(parsed_ranking) > 1:
+                    # Spread the shard's positions over 1..N
+                    position = 1 + (position - 1) * (expected_count - 1) / (len(parsed_ranking) - 1)
                 model_name = label_to_model[label]
                 model_positions[model_name].append(position)
 
@@ -534,6 +1301,15 @@ def calculate_aggregate_rankings(
                 "rankings_count": len(positions)
             })
 
+    if sharded:
+        strengths = merge_rankings(partial_rankings, list(label_to_model))
+        model_strengths = {label_to_model[label]: value for label, value in strengths.items()}
+        for entry in aggregate:
+            entry["strength"] = round(model_strengths[entry["model"]], 3)
+        # Higher strength is better
+        aggregate.sort(key=lambda x: (-x['strength'], x['average_rank']))
+        return aggregate
+
     # Sort by average rank (lower is better)
     aggregate.sort(key=lambda x: x['average_rank'])
 
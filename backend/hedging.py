@@ -0,0 +1,56 @@
+"""Load cap for hedged requests.
+
+A hedge is a duplicate request fired when the original is slower than the
+model's usual tail latency. Hedges may add at most `max_extra_load` (a fraction)
+on top of the primary requests sent in the recent window.
+"""
+
+import time
+from collections import deque
+from typing import Any, Deque, Dict
+
+# Seconds of history the load ratio is measured over
+WINDOW = 300.0
+
+_primaries: Deque[float] = deque()
+_hedges: Deque[float] = deque()
+_hedge_wins = 0
+
+
+def _trim(now: float):
+    for events in (_primaries, _hedges):
+        while events and now - events[0] > WINDOW:
+            events.popleft()
+
+
+def note_primary():
+    """Count a primary (non-hedge) request."""
+    now = time.monotonic()
+    _trim(now)
+    _primaries.append(now)
+
+
+def try_acquire(max_extra_load: float) -> bool:
+    """Claim budget for one hedge; False if it would exceed the load cap."""
+    now = time.monotonic()
+    _trim(now)
+    if len(_hedges) + 1 > max_extra_load * len(_primaries):
+        return False
+    _hedges.append(now)
+    return True
+
+
+def note_hedge_win():
+    global _hedge_wins
+    _hedge_wins += 1
+
+
+def get_stats() -> Dict[str, Any]:
+    _trim(time.monotonic())
+    return {
+        "window_seconds": WINDOW,
+        "primaries": len(_primaries),
+        "hedges": len(_hedges),
+        "extra_load": round(len(_hedges) / len(_primaries), 4) if _primaries else 0.0,
+        "hedge_wins_total": _hedge_wins,
+    }
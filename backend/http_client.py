@@ -0,0 +1,89 @@
+"""Shared HTTP connection pools for LLM providers."""
+
+import os
+import logging
+import httpx
+from typing import Dict, Tuple
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+# HTTP/2 is used when the optional `h2` package is installed (pip install httpx[http2]).
+# Set LLM_COUNCIL_HTTP2=0 to force HTTP/1.1.
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = os.getenv("LLM_COUNCIL_HTTP2", "1") != "0"
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Default timeout for pooled clients. Individual requests pass their own timeout.
+DEFAULT_TIMEOUT = 120.0
+
+# Per-provider connection limits. Local backends (Ollama) get fewer connections
+# since they usually serve one model at a time.
+PROVIDER_LIMITS: Dict[str, httpx.Limits] = {
+    "openai": httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=90.0),
+    "anthropic": httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=90.0),
+    "google": httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=90.0),
+    "mistral": httpx.Limits(max_connections=10, max_keepalive_connections=5, keepalive_expiry=90.0),
+    "deepseek": httpx.Limits(max_connections=10, max_keepalive_connections=5, keepalive_expiry=90.0),
+    "groq": httpx.Limits(max_connections=10, max_keepalive_connections=5, keepalive_expiry=90.0),
+    "openrouter": httpx.Limits(max_connections=40, max_keepalive_connections=20, keepalive_expiry=90.0),
+    "ollama": httpx.Limits(max_connections=8, max_keepalive_connections=4, keepalive_expiry=300.0),
+    "custom": httpx.Limits(max_connections=10, max_keepalive_connections=5, keepalive_expiry=90.0),
+}
+DEFAULT_LIMITS = httpx.Limits(max_connections=10, max_keepalive_connections=5, keepalive_expiry=60.0)
+
+# Providers that talk to plain-HTTP local servers (no TLS, so no HTTP/2)
+LOCAL_PROVIDERS = {"ollama"}
+
+# Registry of pooled clients, keyed by (provider, origin)
+_clients: Dict[Tuple[str, str], httpx.AsyncClient] = {}
+
+
+def _origin(url: str) -> str:
+    """Reduce a URL to scheme://host[:port] so all paths share one pool."""
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def get_client(url: str, provider: str = "default") -> httpx.AsyncClient:
+    """
+    Get the pooled client for a provider and base URL, creating it on first use.
+
+    Args:
+        url: Any URL on the target host (only the origin is used as the key)
+        provider: Provider name used to pick connection limits
+
+    Returns:
+        A long-lived httpx.AsyncClient with keep-alive enabled
+    """
+    key = (provider, _origin(url))
+    client = _clients.get(key)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            timeout=DEFAULT_TIMEOUT,
+            limits=PROVIDER_LIMITS.get(provider, DEFAULT_LIMITS),
+            http2=HTTP2_AVAILABLE and provider not in LOCAL_PROVIDERS,
+        )
+        _clients[key] = client
+    return client
+
+
+def get_pool_info() -> Dict[str, Dict[str, object]]:
+    """Describe the currently open pools (for diagnostics)."""
+    return {
+        f"{provider}|{origin}": {"provider": provider, "origin": origin, "closed": client.is_closed}
+        for (provider, origin), client in _clients.items()
+    }
+
+
+async def close_clients() -> None:
+    """Close every pooled client. Called from the FastAPI lifespan on shutdown."""
+    clients = list(_clients.values())
+    _clients.clear()
+    for client in clients:
+        try:
+            await client.aclose()
+        except Exception as e:
+            logger.warning(f"Error closing HTTP client: {e}")
@@ -0,0 +1,51 @@
+"""Bounded thread pool for blocking disk I/O called from async code."""
+
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+from .config import STORAGE_IO_WORKERS
+
+T = TypeVar("T")
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=max(1, STORAGE_IO_WORKERS),
+            thread_name_prefix="storage-io",
+        )
+    return _executor
+
+
+async def run_blocking(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run a blocking function on the I/O pool and await its result.
+
+    Context variables (e.g. the per-run settings snapshot) are carried over
+    to the worker thread.
+
+    Args:
+        func: Synchronous function to run
+        *args, **kwargs: Arguments for func
+
+    Returns:
+        Whatever func returns (exceptions propagate to the caller)
+    """
+    loop = asyncio.get_running_loop()
+    ctx = contextvars.copy_context()
+    call = functools.partial(ctx.run, func, *args, **kwargs)
+    return await loop.run_in_executor(_get_executor(), call)
+
+
+def shutdown_io_pool() -> None:
+    """Wait for queued writes to finish and stop the pool. Called on app shutdown."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
@@ -0,0 +1,132 @@
+"""Judge-panel sampling for Stage 2.
+
+With stage2_panel_size = K, only K of the council members rank the Stage 1
+responses; the rest are done after Stage 1. Panels are picked by one of:
+
+- fixed: stage2_panel_models first, topped up in council order
+- round_robin: a window of K members that rotates every run
+- fastest: lowest median latency observed so far (see latency.py)
+- agreement: highest historical agreement with the aggregate ranking
+
+Agreement is the Kendall tau between a judge's ranking and the aggregate
+order, smoothed over runs. Members that have not judged yet start at the
+maximum score, so every member gets sampled before the scores settle.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence
+
+from . import latency
+
+STRATEGIES = ("fixed", "round_robin", "fastest", "agreement")
+
+# Weight of the newest run in a judge's smoothed agreement score
+AGREEMENT_SMOOTHING = 0.2
+# Score assumed for members with no history (optimistic, so they get tried)
+AGREEMENT_PRIOR = 1.0
+
+# Start of the next round-robin window
+_rotation = 0
+# Model -> smoothed Kendall tau against the aggregate ranking
+_agreement: Dict[str, float] = {}
+_agreement_runs: Dict[str, int] = {}
+
+
+def select_panel(
+    models: Sequence[str],
+    size: int,
+    strategy: str,
+    fixed: Optional[Sequence[str]] = None
+) -> List[str]:
+    """
+    Pick the Stage 2 judges.
+
+    Args:
+        models: Candidate judges (members that answered in Stage 1), in council order
+        size: Panel size; 0 or at least len(models) means every candidate judges
+        strategy: One of STRATEGIES
+        fixed: Preferred judges for the "fixed" strategy
+
+    Returns:
+        The judges, in council order
+    """
+    global _rotation
+    models = list(models)
+    if size <= 0 or size >= len(models):
+        return models
+
+    if strategy == "round_robin":
+        start = _rotation % len(models)
+        _rotation = start + size
+        chosen = {models[(start + i) % len(models)] for i in range(size)}
+    elif strategy == "fastest":
+        def median(m: str) -> float:
+            value = latency.quantile(m, 0.5)
+            # Members without enough history go last, in council order
+            return value if value is not None else float("inf")
+        chosen = set(sorted(models, key=median)[:size])
+    elif strategy == "agreement":
+        chosen = set(sorted(models, key=lambda m: -_agreement.get(m, AGREEMENT_PRIOR))[:size])
+    else:
+        preferred = [m for m in (fixed or []) if m in models]
+        chosen = set((preferred + [m for m in models if m not in preferred])[:size])
+
+    return [m for m in models if m in chosen]
+
+
+def kendall_tau(ranking: Sequence[str], reference: Sequence[str]) -> Optional[float]:
+    """
+    Rank correlation of a ranking with a reference order, over the items both contain.
+
+    Returns:
+        -1.0 (reversed) .. 1.0 (identical), or None with fewer than two common items
+    """
+    position = {item: i for i, item in enumerate(reference)}
+    common = [item for item in ranking if item in position]
+    if len(common) < 2:
+        return None
+    concordant = discordant = 0
+    for i in range(len(common)):
+        for j in range(i + 1, len(common)):
+            if position[common[i]] < position[common[j]]:
+                concordant += 1
+            else:
+                discordant += 1
+    return (concordant - discordant) / (concordant + discordant)
+
+
+def record_agreement(
+    stage2_results: List[Dict[str, Any]],
+    aggregate_rankings: List[Dict[str, Any]],
+    label_to_model: Dict[str, str]
+):
+    """
+    Update each judge's agreement score from a finished Stage 2.
+
+    Args:
+        stage2_results: Rankings from each judge (with 'parsed_ranking')
+        aggregate_rankings: Output of calculate_aggregate_rankings, best first
+        label_to_model: Mapping from anonymous labels to model names
+    """
+    consensus = [entry["model"] for entry in aggregate_rankings]
+    for result in stage2_results:
+        if result.get("error"):
+            continue
+        ranking = [label_to_model[label] for label in result.get("parsed_ranking") or [] if label in label_to_model]
+        tau = kendall_tau(ranking, consensus)
+        if tau is None:
+            continue
+        judge = result["model"]
+        previous = _agreement.get(judge)
+        _agreement[judge] = tau if previous is None else previous + AGREEMENT_SMOOTHING * (tau - previous)
+        _agreement_runs[judge] = _agreement_runs.get(judge, 0) + 1
+
+
+def get_stats() -> Dict[str, Any]:
+    """Agreement scores and round-robin position."""
+    return {
+        "rotation": _rotation,
+        "agreement": {
+            model: {"score": round(score, 3), "runs": _agreement_runs.get(model, 0)}
+            for model, score in sorted(_agreement.items(), key=lambda item: -item[1])
+        },
+    }
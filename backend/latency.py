@@ -0,0 +1,151 @@
+"""Per-model latency history and the adaptive timeouts derived from it.
+
+A sliding window of recent samples is kept per model and kind; quantiles are
+read off the window. The windows are saved to LATENCY_STATS_PATH so timeouts
+stay calibrated across restarts.
+"""
+
+import json
+import logging
+import math
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from .atomic_io import atomic_write_json
+from .config import LATENCY_STATS_PATH
+
+logger = logging.getLogger(__name__)
+
+# Samples kept per (model, kind)
+WINDOW = 200
+# Quantiles are not trusted below this many samples
+MIN_SAMPLES = 10
+
+# "total": whole call, "first_token": time to the first streamed delta
+KINDS = ("total", "first_token")
+
+# Adaptive timeout = TIMEOUT_MULTIPLIER x p99 of recent calls, clamped to the configured floor/ceiling
+TIMEOUT_QUANTILE = 0.99
+TIMEOUT_MULTIPLIER = 3.0
+
+_samples: Dict[Tuple[str, str], Deque[float]] = {}
+_dirty = False
+
+
+def record(model: str, seconds: float, kind: str = "total"):
+    """Add a latency sample for a successful (or timed-out) call."""
+    global _dirty
+    _dirty = True
+    key = (model, kind)
+    samples = _samples.get(key)
+    if samples is None:
+        samples = _samples[key] = deque(maxlen=WINDOW)
+    samples.append(seconds)
+
+
+def quantile(model: str, q: float, kind: str = "total") -> Optional[float]:
+    """
+    Latency quantile (e.g. q=0.9 for p90) over the recent window.
+
+    Returns:
+        Seconds, or None when there are fewer than MIN_SAMPLES samples
+    """
+    samples = _samples.get((model, kind))
+    if not samples or len(samples) < MIN_SAMPLES:
+        return None
+    return _pick(sorted(samples), q)
+
+
+def _pick(ordered: List[float], q: float) -> float:
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))]
+
+
+def timeout_for(model: str, floor: float, ceiling: float, streaming: bool = False) -> float:
+    """
+    Request timeout for a model based on how long its recent calls took.
+
+    HTTP timeouts apply per read, so a streamed call is bounded by its time to
+    first token rather than its total duration.
+
+    Args:
+        model: Model identifier
+        floor: Lowest timeout ever returned
+        ceiling: Highest timeout ever returned (also used until there is enough history)
+        streaming: Whether the call will be streamed
+
+    Returns:
+        Timeout in seconds
+    """
+    p99 = quantile(model, TIMEOUT_QUANTILE, kind="first_token" if streaming else "total")
+    if p99 is None:
+        return ceiling
+    return min(ceiling, max(floor, p99 * TIMEOUT_MULTIPLIER))
+
+
+def get_stats(floor: Optional[float] = None, ceiling: Optional[float] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    p50/p90/p99 and sample count per model and kind, plus the timeout that
+    would currently be used when floor/ceiling are given.
+    """
+    stats: Dict[str, Dict[str, Any]] = {}
+    for (model, kind), samples in _samples.items():
+        ordered = sorted(samples)
+        entry = {
+            "count": len(ordered),
+            "p50": round(_pick(ordered, 0.5), 3),
+            "p90": round(_pick(ordered, 0.9), 3),
+            "p99": round(_pick(ordered, 0.99), 3),
+        }
+        if floor is not None and ceiling is not None:
+            entry["timeout"] = round(timeout_for(model, floor, ceiling, streaming=kind == "first_token"), 1)
+        stats.setdefault(model, {})[kind] = entry
+    return stats
+
+
+def reset(model: Optional[str] = None):
+    """Forget the latency history of one model, or of all models."""
+    global _dirty
+    for key in list(_samples):
+        if model is None or key[0] == model:
+            del _samples[key]
+    _dirty = True
+
+
+def snapshot() -> Optional[Dict[str, Dict[str, List[float]]]]:
+    """
+    Copy of the history for save(), or None if nothing changed since the last one.
+
+    Must be called on the event loop thread (the windows are not thread safe).
+    """
+    global _dirty
+    if not _dirty:
+        return None
+    _dirty = False
+    data: Dict[str, Dict[str, List[float]]] = {}
+    for (model, kind), samples in _samples.items():
+        data.setdefault(model, {})[kind] = [round(s, 4) for s in samples]
+    return data
+
+
+def save(data: Dict[str, Dict[str, List[float]]], path: str = LATENCY_STATS_PATH):
+    """Write a snapshot() to disk atomically (blocking)."""
+    atomic_write_json(path, {"version": 1, "models": data})
+
+
+def load(path: str = LATENCY_STATS_PATH):
+    """Restore the history saved by a previous run (blocking). Missing or bad files are ignored."""
+    try:
+        with open(path, 'r') as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable latency stats {path}: {e}")
+        return
+
+    for model, kinds in (data.get("models") or {}).items():
+        for kind, values in (kinds or {}).items():
+            if kind not in KINDS or not isinstance(values, list):
+                continue
+            samples = _samples.setdefault((model, kind), deque(maxlen=WINDOW))
+            samples.extend(float(v) for v in values if isinstance(v, (int, float)) and v >= 0)
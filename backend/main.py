@@ -1,21 +1,81 @@
 """FastAPI backend for LLM Council."""
 
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import FastAPI, HTTPException, Request, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import StreamingResponse, JSONResponse
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
 import os
 import uuid
 import json
 import asyncio
+from contextlib import asynccontextmanager
 
-from . import storage
-from .council import generate_conversation_title, generate_search_query, stage1_collect_responses, stage2_collect_rankings, stage3_synthesize_final, calculate_aggregate_rankings, PROVIDERS
+from .storage import aio as storage
+from .council import generate_conversation_title, generate_search_query, stage1_collect_responses, stage2_collect_rankings, stage3_stream_final, calculate_aggregate_rankings, LateResponses, PROVIDERS, get_provider_name
 from .search import perform_web_search, SearchProvider
-from .settings import get_settings, update_settings, Settings, DEFAULT_COUNCIL_MODELS, DEFAULT_CHAIRMAN_MODEL, AVAILABLE_MODELS
-
-app = FastAPI(title="LLM Council Plus API")
+from .settings import get_settings, update_settings, settings_snapshot, Settings, DEFAULT_COUNCIL_MODELS, DEFAULT_CHAIRMAN_MODEL, AVAILABLE_MODELS
+from .http_client import close_clients
+from .io_pool import run_blocking, shutdown_io_pool
+from . import response_cache
+from . import circuit_breaker
+from . import hedging
+from . import latency
+from . import warmup
+from . import model_catalog
+from . import judge_panel
+from . import ranking_output
+from .config import get_council_models
+from .adaptive_limiter import conversation_scope, get_limiter_stats
+from .rate_limits import validate_rate_limits
+from .routing import validate_model_routes
+
+
+# Largest council accepted in settings (use stage2_strategy='tournament' beyond ~8)
+MAX_COUNCIL_MODELS = 32
+
+# Seconds between saves of the latency history
+LATENCY_SAVE_INTERVAL = 60.0
+
+
+async def _save_latency():
+    data = latency.snapshot()
+    if data is not None:
+        try:
+            await run_blocking(latency.save, data)
+        except OSError as e:
+            print(f"Could not save latency stats: {e}")
+
+
+async def _save_latency_periodically():
+    while True:
+        await asyncio.sleep(LATENCY_SAVE_INTERVAL)
+        await _save_latency()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Own shared resources for the lifetime of the app."""
+    # Load settings once off the event loop; later get_settings() calls hit the cache
+    await run_blocking(get_settings)
+    # Latency history from previous runs calibrates timeouts immediately
+    await run_blocking(latency.load)
+    # Last known model catalog, so the Settings page doesn't wait on providers
+    await run_blocking(model_catalog.load_snapshot)
+    saver = asyncio.create_task(_save_latency_periodically())
+    # Open provider/search connections now and keep them alive while in use
+    keeper = asyncio.create_task(warmup.keepalive_loop(PROVIDERS, get_provider_name))
+    # Provider HTTP pools are created lazily on first use and closed here
+    yield
+    keeper.cancel()
+    saver.cancel()
+    await _save_latency()
+    await close_clients()
+    # Let pending storage writes finish
+    shutdown_io_pool()
+
+
+app = FastAPI(title="LLM Council Plus API", lifespan=lifespan)
 
 # Enable CORS for local development
 app.add_middleware(
@@ -57,28 +117,31 @@ class Conversation(BaseModel):
 
 @app.get("/")
 async def root():
-    """Health check endpoint."""
-    return {"status": "ok", "service": "LLM Council API"}
+    """Health check endpoint (includes provider connection warmup status)."""
+    return {"status": "ok", "service": "LLM Council API", "warmup": warmup.get_status()}
 
 
 @app.get("/api/conversations", response_model=List[ConversationMetadata])
-async def list_conversations():
-    """List all conversations (metadata only)."""
-    return storage.list_conversations()
+async def list_conversations(
+    limit: Optional[int] = Query(None, ge=1),
+    offset: int = Query(0, ge=0)
+):
+    """List conversations (metadata only), newest first. Supports paging via limit/offset."""
+    return await storage.list_conversations(limit=limit, offset=offset)
 
 
 @app.post("/api/conversations", response_model=Conversation)
 async def create_conversation(request: CreateConversationRequest):
     """Create a new conversation."""
     conversation_id = str(uuid.uuid4())
-    conversation = storage.create_conversation(conversation_id)
+    conversation = await storage.create_conversation(conversation_id)
     return conversation
 
 
 @app.get("/api/conversations/{conversation_id}", response_model=Conversation)
 async def get_conversation(conversation_id: str):
     """Get a specific conversation with all its messages."""
-    conversation = storage.get_conversation(conversation_id)
+    conversation = await storage.get_conversation(conversation_id)
     if conversation is None:
         raise HTTPException(status_code=404, detail="Conversation not found")
     return conversation
@@ -87,12 +150,22 @@ async def get_conversation(conversation_id: str):
 @app.delete("/api/conversations/{conversation_id}")
 async def delete_conversation(conversation_id: str):
     """Delete a conversation."""
-    deleted = storage.delete_conversation(conversation_id)
+    deleted = await storage.delete_conversation(conversation_id)
     if not deleted:
         raise HTTPException(status_code=404, detail="Conversation not found")
     return {"status": "deleted"}
 
 
+async def _with_run_context(events, conversation_id: str):
+    """
+    Run a council event stream against one settings snapshot for all its stages,
+    with its provider requests attributed to the conversation (fair queueing).
+    """
+    with settings_snapshot(), conversation_scope(conversation_id):
+        async for event in events:
+            yield event
+
+
 @app.post("/api/conversations/{conversation_id}/message/stream")
 async def send_message_stream(conversation_id: str, body: SendMessageRequest, request: Request):
     """Send a message and stream the 3-stage council process."""
@@ -105,10 +178,13 @@ async def send_message_stream(conversation_id: str, body: SendMessageRequest, re
         )
     
     # Check if conversation exists
-    conversation = storage.get_conversation(conversation_id)
+    conversation = await storage.get_conversation(conversation_id)
     if conversation is None:
         raise HTTPException(status_code=404, detail="Conversation not found")
 
+    # Re-warm provider connections if they went cold while the app was idle
+    warmup.note_activity(PROVIDERS, get_provider_name)
+
     # Check if this is the first message
     is_first_message = len(conversation["messages"]) == 0
 
@@ -120,9 +196,11 @@ async def send_message_stream(conversation_id: str, body: SendMessageRequest, re
             stage3_result = None
             label_to_model = {}
             aggregate_rankings = {}
+            judge_panel_info = None
+            late_responses = None
             
             # Add user message
-            storage.add_user_message(conversation_id, body.content)
+            await storage.add_user_message(conversation_id, body.content)
 
             # Start title generation in parallel (don't await yet)
             title_task = None
@@ -185,7 +263,18 @@ async def send_message_stream(conversation_id: str, body: SendMessageRequest, re
                 if isinstance(item, int):
                     total_models = item
                     print(f"DEBUG: Sending stage1_init with total={total_models}")
-                    yield f"data: {json.dumps({'type': 'stage1_init', 'total': total_models})}\n\n"
+                    breakers = circuit_breaker.get_states(get_council_models())
+                    yield f"data: {json.dumps({'type': 'stage1_init', 'total': total_models, 'breakers': breakers})}\n\n"
+                    continue
+
+                # Stragglers kept running under the 'late' policy
+                if isinstance(item, LateResponses):
+                    late_responses = item
+                    continue
+
+                # Streamed token deltas and quorum notices are forwarded as-is
+                if item.get('type'):
+                    yield f"data: {json.dumps(item)}\n\n"
                     continue
                 
                 stage1_results.append(item)
@@ -198,7 +287,9 @@ async def send_message_stream(conversation_id: str, body: SendMessageRequest, re
             # Check if any models responded successfully in Stage 1
             if not any(r for r in stage1_results if not r.get('error')):
                 error_msg = 'All models failed to respond in Stage 1, likely due to rate limits or API errors. Please try again or adjust your model selection.'
-                storage.add_error_message(conversation_id, error_msg)
+                await storage.add_error_message(conversation_id, error_msg)
+                if late_responses:
+                    late_responses.cancel()
                 yield f"data: {json.dumps({'type': 'error', 'message': error_msg})}\n\n"
                 return # Stop further processing
 
@@ -209,23 +300,40 @@ async def send_message_stream(conversation_id: str, body: SendMessageRequest, re
                 
                 # Iterate over the async generator
                 async for item in stage2_collect_rankings(body.content, stage1_results, search_context, request):
+                    # Only the panel judges rank; progress counts them instead of every response
+                    if item.get('type') == 'stage2_panel':
+                        judge_panel_info = {k: v for k, v in item.items() if k != 'type'}
+                        stage2_total = len(item['judges'])
+                        yield f"data: {json.dumps({'type': 'stage2_init', 'total': stage2_total})}\n\n"
+                        continue
+
+                    # Run events (e.g. rate-limit waits) are forwarded as-is
+                    if item.get('type'):
+                        yield f"data: {json.dumps(item)}\n\n"
+                        continue
+
                     # First item is the label mapping
                     if isinstance(item, dict) and not item.get('model'):
                         label_to_model = item
+                        stage2_total = len(label_to_model)
                         # Send init event with total count
-                        yield f"data: {json.dumps({'type': 'stage2_init', 'total': len(label_to_model)})}\n\n"
+                        yield f"data: {json.dumps({'type': 'stage2_init', 'total': stage2_total})}\n\n"
                         continue
                     
                     # Subsequent items are results
                     stage2_results.append(item)
                     
                     # Send progress update
-                    print(f"Stage 2 Progress: {len(stage2_results)}/{len(label_to_model)} - {item['model']}")
-                    yield f"data: {json.dumps({'type': 'stage2_progress', 'data': item, 'count': len(stage2_results), 'total': len(label_to_model)})}\n\n"
+                    print(f"Stage 2 Progress: {len(stage2_results)}/{stage2_total} - {item['model']}")
+                    yield f"data: {json.dumps({'type': 'stage2_progress', 'data': item, 'count': len(stage2_results), 'total': stage2_total})}\n\n"
                     await asyncio.sleep(0.01)
 
                 aggregate_rankings = calculate_aggregate_rankings(stage2_results, label_to_model)
-                yield f"data: {json.dumps({'type': 'stage2_complete', 'data': stage2_results, 'metadata': {'label_to_model': label_to_model, 'aggregate_rankings': aggregate_rankings, 'search_query': search_query, 'search_context': search_context}})}\n\n"
+                judge_panel.record_agreement(stage2_results, aggregate_rankings, label_to_model)
+                stage2_metadata = {'label_to_model': label_to_model, 'aggregate_rankings': aggregate_rankings, 'search_query': search_query, 'search_context': search_context}
+                if judge_panel_info:
+                    stage2_metadata['judge_panel'] = judge_panel_info
+                yield f"data: {json.dumps({'type': 'stage2_complete', 'data': stage2_results, 'metadata': stage2_metadata})}\n\n"
                 await asyncio.sleep(0.05)
 
             # Stage 3: Only if mode is 'full'
@@ -238,34 +346,66 @@ async def send_message_stream(conversation_id: str, body: SendMessageRequest, re
                     print("Client disconnected before Stage 3")
                     raise asyncio.CancelledError("Client disconnected")
 
-                stage3_result = await stage3_synthesize_final(body.content, stage1_results, stage2_results, search_context)
+                async for item in stage3_stream_final(body.content, stage1_results, stage2_results, search_context, request):
+                    # Delta events are forwarded as-is; the last item is the final result
+                    if item.get('type'):
+                        yield f"data: {json.dumps(item)}\n\n"
+                        continue
+                    stage3_result = item
+
                 yield f"data: {json.dumps({'type': 'stage3_complete', 'data': stage3_result})}\n\n"
 
             # Wait for title generation if it was started
             if title_task:
                 try:
                     title = await title_task
-                    storage.update_conversation_title(conversation_id, title)
+                    await storage.update_conversation_title(conversation_id, title)
                     yield f"data: {json.dumps({'type': 'title_complete', 'data': {'title': title}})}\n\n"
                 except Exception as e:
                     print(f"Error waiting for title task: {e}")
 
+            # Record stragglers that were left running past the Stage 1 quorum/deadline
+            if late_responses:
+                late_results = late_responses.collect()
+                stage1_results.extend(late_results)
+                yield f"data: {json.dumps({'type': 'stage1_late', 'data': late_results})}\n\n"
+
             # Save complete assistant message with metadata
             metadata = {
                 "execution_mode": body.execution_mode,  # Save mode for historical context
             }
+            if late_responses:
+                metadata["late_models"] = late_responses.models
+
+            # Models answered by a failover route rather than their primary one
+            served = stage1_results + stage2_results + ([stage3_result] if stage3_result else [])
+            routes = {r["model"]: r["route"] for r in served if r.get("route")}
+            if routes:
+                metadata["routes"] = routes
+
+            # Prompt sections cut to fit a judge's or the chairman's context window
+            prompt_trimming = {}
+            stage2_trims = {r["model"]: r["prompt_trimmed"] for r in stage2_results if r.get("prompt_trimmed")}
+            if stage2_trims:
+                prompt_trimming["stage2"] = stage2_trims
+            if stage3_result and stage3_result.get("prompt_trimmed"):
+                prompt_trimming["stage3"] = stage3_result["prompt_trimmed"]
+            if prompt_trimming:
+                metadata["prompt_trimming"] = prompt_trimming
             
             # Only include stage2/stage3 metadata if they were executed
             if body.execution_mode in ["chat_ranking", "full"]:
                 metadata["label_to_model"] = label_to_model
                 metadata["aggregate_rankings"] = aggregate_rankings
+                if judge_panel_info:
+                    metadata["judge_panel"] = judge_panel_info
             
             if search_context:
                 metadata["search_context"] = search_context
             if search_query:
                 metadata["search_query"] = search_query
 
-            storage.add_assistant_message(
+            await storage.add_assistant_message(
                 conversation_id,
                 stage1_results,
                 stage2_results if body.execution_mode in ["chat_ranking", "full"] else None,
@@ -278,25 +418,29 @@ async def send_message_stream(conversation_id: str, body: SendMessageRequest, re
 
         except asyncio.CancelledError:
             print(f"Stream cancelled for conversation {conversation_id}")
+            if late_responses:
+                late_responses.cancel()
             # Even if cancelled, try to save the title if it's ready or nearly ready
             if title_task:
                 try:
                     # Give it a small grace period to finish if it's close
                     title = await asyncio.wait_for(title_task, timeout=2.0)
-                    storage.update_conversation_title(conversation_id, title)
+                    await storage.update_conversation_title(conversation_id, title)
                     print(f"Saved title despite cancellation: {title}")
                 except Exception as e:
                     print(f"Could not save title during cancellation: {e}")
             raise
         except Exception as e:
             print(f"Stream error: {e}")
+            if late_responses:
+                late_responses.cancel()
             # Save error to conversation history
-            storage.add_error_message(conversation_id, f"Error: {str(e)}")
+            await storage.add_error_message(conversation_id, f"Error: {str(e)}")
             # Send error event
             yield f"data: {json.dumps({'type': 'error', 'message': str(e)})}\n\n"
 
     return StreamingResponse(
-        event_generator(),
+        _with_run_context(event_generator(), conversation_id),
         media_type="text/event-stream",
         headers={
             "Cache-Control": "no-cache",
@@ -346,6 +490,58 @@ class UpdateSettingsRequest(BaseModel):
     chairman_temperature: Optional[float] = None
     stage2_temperature: Optional[float] = None
 
+    # Stage 1 quorum/deadline
+    stage1_quorum: Optional[int] = None
+    stage1_deadline: Optional[float] = None
+    stage1_straggler_policy: Optional[str] = None
+
+    # Provider response cache
+    response_cache_enabled: Optional[bool] = None
+    response_cache_stages: Optional[List[str]] = None
+    response_cache_ttl: Optional[float] = None
+    response_cache_max_entries: Optional[int] = None
+    response_cache_disk: Optional[bool] = None
+
+    # Per provider/model RPM and TPM limits
+    rate_limits: Optional[Dict[str, Dict[str, float]]] = None
+    model_routes: Optional[Dict[str, List[str]]] = None
+
+    # Provider retry policy
+    retry_max_attempts: Optional[int] = None
+    retry_budget: Optional[float] = None
+
+    # Per-model circuit breaker
+    breaker_failure_threshold: Optional[int] = None
+    breaker_cooldown: Optional[float] = None
+
+    # Stage 2 strategy
+    stage2_strategy: Optional[str] = None
+    stage2_shard_size: Optional[int] = None
+    stage2_panel_size: Optional[int] = None
+    stage2_panel_strategy: Optional[str] = None
+    stage2_panel_models: Optional[List[str]] = None
+    stage2_structured_output: Optional[bool] = None
+
+    # Prompt budgeting
+    prompt_budget_enabled: Optional[bool] = None
+    prompt_budget_output_reserve: Optional[int] = None
+    prompt_budget_default_context: Optional[int] = None
+
+    # Connection warmup/keepalive
+    connection_warmup_enabled: Optional[bool] = None
+    keepalive_interval: Optional[float] = None
+    keepalive_idle_timeout: Optional[float] = None
+
+    # Adaptive timeouts
+    adaptive_timeout_enabled: Optional[bool] = None
+    timeout_floor: Optional[float] = None
+    timeout_ceiling: Optional[float] = None
+
+    # Hedged requests
+    hedge_enabled: Optional[bool] = None
+    hedge_quantile: Optional[float] = None
+    hedge_max_extra_load: Optional[float] = None
+
     # Execution Mode
     execution_mode: Optional[str] = None
 
@@ -395,6 +591,7 @@ async def get_app_settings():
         # Council Configuration (unified)
         "council_models": settings.council_models,
         "chairman_model": settings.chairman_model,
+        "max_council_models": MAX_COUNCIL_MODELS,
         
         # Remote/Local filters
         "council_member_filters": settings.council_member_filters,
@@ -407,6 +604,42 @@ async def get_app_settings():
         "chairman_temperature": settings.chairman_temperature,
         "stage2_temperature": settings.stage2_temperature,
 
+        # Stage 1 quorum/deadline
+        "stage1_quorum": settings.stage1_quorum,
+        "stage1_deadline": settings.stage1_deadline,
+        "stage1_straggler_policy": settings.stage1_straggler_policy,
+
+        # Provider response cache
+        "response_cache_enabled": settings.response_cache_enabled,
+        "response_cache_stages": settings.response_cache_stages,
+        "response_cache_ttl": settings.response_cache_ttl,
+        "response_cache_max_entries": settings.response_cache_max_entries,
+        "response_cache_disk": settings.response_cache_disk,
+        "rate_limits": settings.rate_limits,
+        "model_routes": settings.model_routes,
+        "retry_max_attempts": settings.retry_max_attempts,
+        "retry_budget": settings.retry_budget,
+        "breaker_failure_threshold": settings.breaker_failure_threshold,
+        "breaker_cooldown": settings.breaker_cooldown,
+        "stage2_strategy": settings.stage2_strategy,
+        "stage2_shard_size": settings.stage2_shard_size,
+        "stage2_panel_size": settings.stage2_panel_size,
+        "stage2_panel_strategy": settings.stage2_panel_strategy,
+        "stage2_panel_models": settings.stage2_panel_models,
+        "stage2_structured_output": settings.stage2_structured_output,
+        "prompt_budget_enabled": settings.prompt_budget_enabled,
+        "prompt_budget_output_reserve": settings.prompt_budget_output_reserve,
+        "prompt_budget_default_context": settings.prompt_budget_default_context,
+        "connection_warmup_enabled": settings.connection_warmup_enabled,
+        "keepalive_interval": settings.keepalive_interval,
+        "keepalive_idle_timeout": settings.keepalive_idle_timeout,
+        "adaptive_timeout_enabled": settings.adaptive_timeout_enabled,
+        "timeout_floor": settings.timeout_floor,
+        "timeout_ceiling": settings.timeout_ceiling,
+        "hedge_enabled": settings.hedge_enabled,
+        "hedge_quantile": settings.hedge_quantile,
+        "hedge_max_extra_load": settings.hedge_max_extra_load,
+
         # Prompts
         "stage1_prompt": settings.stage1_prompt,
         "stage2_prompt": settings.stage2_prompt,
@@ -531,10 +764,10 @@ async def update_app_settings(request: UpdateSettingsRequest):
                 status_code=400,
                 detail="At least two council models must be selected"
             )
-        if len(request.council_models) > 8:
+        if len(request.council_models) > MAX_COUNCIL_MODELS:
             raise HTTPException(
                 status_code=400,
-                detail="Maximum of 8 council models allowed"
+                detail=f"Maximum of {MAX_COUNCIL_MODELS} council models allowed"
             )
         updates["council_models"] = request.council_models
 
@@ -557,6 +790,137 @@ async def update_app_settings(request: UpdateSettingsRequest):
     if request.stage2_temperature is not None:
         updates["stage2_temperature"] = request.stage2_temperature
 
+    # Stage 1 quorum/deadline
+    if request.stage1_quorum is not None:
+        if request.stage1_quorum < 0:
+            raise HTTPException(status_code=400, detail="stage1_quorum must be 0 (disabled) or positive")
+        updates["stage1_quorum"] = request.stage1_quorum
+    if request.stage1_deadline is not None:
+        if request.stage1_deadline < 0:
+            raise HTTPException(status_code=400, detail="stage1_deadline must be 0 (disabled) or positive")
+        updates["stage1_deadline"] = request.stage1_deadline
+    if request.stage1_straggler_policy is not None:
+        if request.stage1_straggler_policy not in ["cancel", "late"]:
+            raise HTTPException(status_code=400, detail="stage1_straggler_policy must be 'cancel' or 'late'")
+        updates["stage1_straggler_policy"] = request.stage1_straggler_policy
+
+    if request.response_cache_enabled is not None:
+        updates["response_cache_enabled"] = request.response_cache_enabled
+    if request.response_cache_stages is not None:
+        invalid = [stage for stage in request.response_cache_stages if stage not in response_cache.CACHE_STAGES]
+        if invalid:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid response_cache_stages {invalid}. Must be from: {response_cache.CACHE_STAGES}"
+            )
+        updates["response_cache_stages"] = request.response_cache_stages
+    if request.response_cache_ttl is not None:
+        if request.response_cache_ttl < 0:
+            raise HTTPException(status_code=400, detail="response_cache_ttl must be 0 (no expiry) or positive")
+        updates["response_cache_ttl"] = request.response_cache_ttl
+    if request.response_cache_max_entries is not None:
+        if request.response_cache_max_entries < 1:
+            raise HTTPException(status_code=400, detail="response_cache_max_entries must be at least 1")
+        updates["response_cache_max_entries"] = request.response_cache_max_entries
+    if request.response_cache_disk is not None:
+        updates["response_cache_disk"] = request.response_cache_disk
+
+    if request.rate_limits is not None:
+        error = validate_rate_limits(request.rate_limits)
+        if error:
+            raise HTTPException(status_code=400, detail=error)
+        updates["rate_limits"] = request.rate_limits
+
+    if request.model_routes is not None:
+        error = validate_model_routes(request.model_routes, PROVIDERS)
+        if error:
+            raise HTTPException(status_code=400, detail=error)
+        updates["model_routes"] = request.model_routes
+
+    if request.retry_max_attempts is not None:
+        if request.retry_max_attempts < 1:
+            raise HTTPException(status_code=400, detail="retry_max_attempts must be at least 1 (1 disables retries)")
+        updates["retry_max_attempts"] = request.retry_max_attempts
+    if request.retry_budget is not None:
+        if request.retry_budget < 0:
+            raise HTTPException(status_code=400, detail="retry_budget must be 0 or positive")
+        updates["retry_budget"] = request.retry_budget
+
+    if request.breaker_failure_threshold is not None:
+        if request.breaker_failure_threshold < 0:
+            raise HTTPException(status_code=400, detail="breaker_failure_threshold must be 0 (disabled) or positive")
+        updates["breaker_failure_threshold"] = request.breaker_failure_threshold
+    if request.breaker_cooldown is not None:
+        if request.breaker_cooldown <= 0:
+            raise HTTPException(status_code=400, detail="breaker_cooldown must be positive")
+        updates["breaker_cooldown"] = request.breaker_cooldown
+
+    if request.stage2_strategy is not None:
+        if request.stage2_strategy not in ("full", "tournament"):
+            raise HTTPException(status_code=400, detail="stage2_strategy must be 'full' or 'tournament'")
+        updates["stage2_strategy"] = request.stage2_strategy
+    if request.stage2_shard_size is not None:
+        if request.stage2_shard_size < 2:
+            raise HTTPException(status_code=400, detail="stage2_shard_size must be at least 2")
+        updates["stage2_shard_size"] = request.stage2_shard_size
+    if request.stage2_panel_size is not None:
+        if request.stage2_panel_size < 0:
+            raise HTTPException(status_code=400, detail="stage2_panel_size must be non-negative (0 = every member judges)")
+        updates["stage2_panel_size"] = request.stage2_panel_size
+    if request.stage2_panel_strategy is not None:
+        if request.stage2_panel_strategy not in judge_panel.STRATEGIES:
+            raise HTTPException(
+                status_code=400,
+                detail=f"stage2_panel_strategy must be one of: {', '.join(judge_panel.STRATEGIES)}"
+            )
+        updates["stage2_panel_strategy"] = request.stage2_panel_strategy
+    if request.stage2_panel_models is not None:
+        updates["stage2_panel_models"] = request.stage2_panel_models
+    if request.stage2_structured_output is not None:
+        updates["stage2_structured_output"] = request.stage2_structured_output
+    if request.prompt_budget_enabled is not None:
+        updates["prompt_budget_enabled"] = request.prompt_budget_enabled
+    if request.prompt_budget_output_reserve is not None:
+        if request.prompt_budget_output_reserve < 0:
+            raise HTTPException(status_code=400, detail="prompt_budget_output_reserve must not be negative")
+        updates["prompt_budget_output_reserve"] = request.prompt_budget_output_reserve
+    if request.prompt_budget_default_context is not None:
+        if request.prompt_budget_default_context < 0:
+            raise HTTPException(status_code=400, detail="prompt_budget_default_context must be 0 (unknown) or positive")
+        updates["prompt_budget_default_context"] = request.prompt_budget_default_context
+    if request.connection_warmup_enabled is not None:
+        updates["connection_warmup_enabled"] = request.connection_warmup_enabled
+    if request.keepalive_interval is not None:
+        if request.keepalive_interval != 0 and request.keepalive_interval < 5:
+            raise HTTPException(status_code=400, detail="keepalive_interval must be 0 (off) or at least 5 seconds")
+        updates["keepalive_interval"] = request.keepalive_interval
+    if request.keepalive_idle_timeout is not None:
+        if request.keepalive_idle_timeout < 0:
+            raise HTTPException(status_code=400, detail="keepalive_idle_timeout must not be negative")
+        updates["keepalive_idle_timeout"] = request.keepalive_idle_timeout
+    if request.adaptive_timeout_enabled is not None:
+        updates["adaptive_timeout_enabled"] = request.adaptive_timeout_enabled
+    if request.timeout_floor is not None or request.timeout_ceiling is not None:
+        current = get_settings()
+        floor = request.timeout_floor if request.timeout_floor is not None else current.timeout_floor
+        ceiling = request.timeout_ceiling if request.timeout_ceiling is not None else current.timeout_ceiling
+        if floor < 1.0:
+            raise HTTPException(status_code=400, detail="timeout_floor must be at least 1 second")
+        if ceiling < floor:
+            raise HTTPException(status_code=400, detail="timeout_ceiling must not be below timeout_floor")
+        updates["timeout_floor"] = floor
+        updates["timeout_ceiling"] = ceiling
+    if request.hedge_enabled is not None:
+        updates["hedge_enabled"] = request.hedge_enabled
+    if request.hedge_quantile is not None:
+        if not 0.5 <= request.hedge_quantile < 1.0:
+            raise HTTPException(status_code=400, detail="hedge_quantile must be between 0.5 and 1.0")
+        updates["hedge_quantile"] = request.hedge_quantile
+    if request.hedge_max_extra_load is not None:
+        if not 0.0 <= request.hedge_max_extra_load <= 1.0:
+            raise HTTPException(status_code=400, detail="hedge_max_extra_load must be between 0 and 1")
+        updates["hedge_max_extra_load"] = request.hedge_max_extra_load
+
     # Prompts   # Execution Mode
     if request.execution_mode is not None:
         valid_modes = ["chat_only", "chat_ranking", "full"]
@@ -568,7 +932,7 @@ async def update_app_settings(request: UpdateSettingsRequest):
         updates["execution_mode"] = request.execution_mode
 
     if updates:
-        settings = update_settings(**updates)
+        settings = await run_blocking(update_settings, **updates)
     else:
         settings = get_settings()
 
@@ -606,6 +970,42 @@ async def update_app_settings(request: UpdateSettingsRequest):
         "council_member_filters": settings.council_member_filters,
         "chairman_filter": settings.chairman_filter,
 
+        # Stage 1 quorum/deadline
+        "stage1_quorum": settings.stage1_quorum,
+        "stage1_deadline": settings.stage1_deadline,
+        "stage1_straggler_policy": settings.stage1_straggler_policy,
+
+        # Provider response cache
+        "response_cache_enabled": settings.response_cache_enabled,
+        "response_cache_stages": settings.response_cache_stages,
+        "response_cache_ttl": settings.response_cache_ttl,
+        "response_cache_max_entries": settings.response_cache_max_entries,
+        "response_cache_disk": settings.response_cache_disk,
+        "rate_limits": settings.rate_limits,
+        "model_routes": settings.model_routes,
+        "retry_max_attempts": settings.retry_max_attempts,
+        "retry_budget": settings.retry_budget,
+        "breaker_failure_threshold": settings.breaker_failure_threshold,
+        "breaker_cooldown": settings.breaker_cooldown,
+        "stage2_strategy": settings.stage2_strategy,
+        "stage2_shard_size": settings.stage2_shard_size,
+        "stage2_panel_size": settings.stage2_panel_size,
+        "stage2_panel_strategy": settings.stage2_panel_strategy,
+        "stage2_panel_models": settings.stage2_panel_models,
+        "stage2_structured_output": settings.stage2_structured_output,
+        "prompt_budget_enabled": settings.prompt_budget_enabled,
+        "prompt_budget_output_reserve": settings.prompt_budget_output_reserve,
+        "prompt_budget_default_context": settings.prompt_budget_default_context,
+        "connection_warmup_enabled": settings.connection_warmup_enabled,
+        "keepalive_interval": settings.keepalive_interval,
+        "keepalive_idle_timeout": settings.keepalive_idle_timeout,
+        "adaptive_timeout_enabled": settings.adaptive_timeout_enabled,
+        "timeout_floor": settings.timeout_floor,
+        "timeout_ceiling": settings.timeout_ceiling,
+        "hedge_enabled": settings.hedge_enabled,
+        "hedge_quantile": settings.hedge_quantile,
+        "hedge_max_extra_load": settings.hedge_max_extra_load,
+
         # Prompts
         "stage1_prompt": settings.stage1_prompt,
         "stage2_prompt": settings.stage2_prompt,
@@ -613,39 +1013,105 @@ async def update_app_settings(request: UpdateSettingsRequest):
     }
 
 
+@app.get("/api/admin/limiters")
+async def get_provider_limiters():
+    """Adaptive concurrency window, queue depth and counters per provider/API key."""
+    return get_limiter_stats()
+
+
+@app.get("/api/admin/breakers")
+async def get_circuit_breakers():
+    """Circuit breaker state of every model that has been queried."""
+    return circuit_breaker.get_states()
+
+
+@app.delete("/api/admin/breakers")
+async def reset_circuit_breakers(model: Optional[str] = None):
+    """Close the breaker of one model (or of all models) so it is tried again right away."""
+    return {"status": "reset", "count": circuit_breaker.reset(model)}
+
+
+@app.get("/api/admin/latency")
+async def get_latency_stats():
+    """Recent latency quantiles per model and the timeout each would currently get."""
+    settings = get_settings()
+    return {
+        "adaptive_timeout_enabled": settings.adaptive_timeout_enabled,
+        "timeout_floor": settings.timeout_floor,
+        "timeout_ceiling": settings.timeout_ceiling,
+        "models": latency.get_stats(settings.timeout_floor, settings.timeout_ceiling),
+    }
+
+
+@app.delete("/api/admin/latency")
+async def reset_latency_stats(model: Optional[str] = None):
+    """Forget latency history (of one model, or all), e.g. after switching hardware."""
+    latency.reset(model)
+    return {"success": True}
+
+
+@app.get("/api/admin/hedging")
+async def get_hedging_stats():
+    """Hedged request load over the recent window, and how often hedges won."""
+    return hedging.get_stats()
+
+
+@app.get("/api/admin/judges")
+async def get_judge_stats():
+    """Stage 2 judge agreement with the aggregate ranking, used by the 'agreement' panel strategy."""
+    return judge_panel.get_stats()
+
+
+@app.get("/api/admin/rankings")
+async def get_ranking_parse_stats():
+    """How each model's Stage 2 rankings were parsed (JSON, regex fallback, failed)."""
+    return ranking_output.get_stats()
+
+
+@app.get("/api/cache/stats")
+async def get_response_cache_stats():
+    """Hit/miss counters for the provider response cache."""
+    return response_cache.get_stats()
+
+
+@app.delete("/api/cache")
+async def clear_response_cache():
+    """Drop all cached provider responses (memory and disk)."""
+    await run_blocking(response_cache.clear)
+    return {"status": "cleared"}
+
+
+def _etag_response(request: Request, payload: Any) -> Response:
+    """JSON response with an ETag; answers 304 when the client already has this version."""
+    tag = model_catalog.etag(payload)
+    headers = {"ETag": tag, "Cache-Control": "no-cache"}
+    if tag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(payload, headers=headers)
+
+
 @app.get("/api/models")
-async def get_models():
-    """Get available models for council selection."""
-    from .openrouter import fetch_models
-    
-    # Try dynamic fetch first
-    dynamic_models = await fetch_models()
-    if dynamic_models:
-        return {"models": dynamic_models}
-        
-    # Fallback to static list
-    return {"models": AVAILABLE_MODELS}
+async def get_models(request: Request, refresh: bool = False):
+    """Get available models for council selection (cached OpenRouter catalog)."""
+    catalog = await model_catalog.get_models(["openrouter"], PROVIDERS, force=refresh)
+    # Fall back to the static list if OpenRouter can't be reached
+    return _etag_response(request, {"models": catalog["openrouter"] or AVAILABLE_MODELS})
 
 
 @app.get("/api/models/direct")
-async def get_direct_models():
-    """Get available models from all configured direct providers."""
-    all_models = []
-    
-    # Iterate over all providers
-    for provider_id, provider in PROVIDERS.items():
-        # Skip OpenRouter and Ollama as they are handled separately
-        if provider_id in ["openrouter", "ollama", "hybrid"]:
-            continue
-            
-        try:
-            # Fetch models from provider
-            models = await provider.get_models()
-            all_models.extend(models)
-        except Exception as e:
-            print(f"Error fetching models for {provider_id}: {e}")
-            
-    return all_models
+async def get_direct_models(request: Request, refresh: bool = False):
+    """Get available models from all configured direct providers (cached, fetched concurrently)."""
+    # OpenRouter and Ollama are handled separately
+    sources = [provider_id for provider_id in PROVIDERS if provider_id not in ["openrouter", "ollama", "hybrid"]]
+    catalog = await model_catalog.get_models(sources, PROVIDERS, force=refresh)
+    all_models = [model for source in sources for model in catalog[source]]
+    return _etag_response(request, all_models)
+
+
+@app.get("/api/models/catalog/stats")
+async def get_model_catalog_stats():
+    """Age and size of each cached model source."""
+    return model_catalog.get_stats()
 
 
 @app.post("/api/settings/test-tavily")
@@ -852,66 +1318,6 @@ async def get_custom_endpoint_models():
     return {"models": models}
 
 
-@app.get("/api/models")
-async def get_openrouter_models():
-    """Fetch available models from OpenRouter API."""
-    import httpx
-    from .config import get_openrouter_api_key
-
-    api_key = get_openrouter_api_key()
-    if not api_key:
-        return {"models": [], "error": "No OpenRouter API key configured"}
-
-    try:
-        async with httpx.AsyncClient(timeout=15.0) as client:
-            response = await client.get(
-                "https://openrouter.ai/api/v1/models",
-                headers={"Authorization": f"Bearer {api_key}"},
-            )
-
-            if response.status_code != 200:
-                return {"models": [], "error": f"API error: {response.status_code}"}
-
-            data = response.json()
-            models = []
-            
-            # Comprehensive exclusion list for non-text/chat models
-            excluded_terms = [
-                "embed", "audio", "whisper", "tts", "dall-e", "realtime", 
-                "vision-only", "voxtral", "speech", "transcribe", "sora"
-            ]
-
-            for model in data.get("data", []):
-                mid = model.get("id", "").lower()
-                name_lower = model.get("name", "").lower()
-                
-                if any(term in mid for term in excluded_terms) or any(term in name_lower for term in excluded_terms):
-                    continue
-
-                # Extract pricing - free models have 0 cost
-                pricing = model.get("pricing", {})
-                prompt_price = float(pricing.get("prompt", "0") or "0")
-                completion_price = float(pricing.get("completion", "0") or "0")
-                is_free = prompt_price == 0 and completion_price == 0
-
-                models.append({
-                    "id": f"openrouter:{model.get('id')}",
-                    "name": f"{model.get('name', model.get('id'))} [OpenRouter]",
-                    "provider": "OpenRouter",
-                    "context_length": model.get("context_length"),
-                    "is_free": is_free,
-                })
-
-            # Sort by name
-            models.sort(key=lambda x: x["name"].lower())
-            return {"models": models}
-
-    except httpx.TimeoutException:
-        return {"models": [], "error": "Request timed out"}
-    except Exception as e:
-        return {"models": [], "error": str(e)}
-
-
 @app.post("/api/settings/test-openrouter")
 async def test_openrouter_api(request: TestOpenRouterRequest):
     """Test OpenRouter API key with a simple request."""
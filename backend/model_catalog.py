@@ -0,0 +1,184 @@
+"""Cached catalog of the models every provider offers.
+
+Each source (OpenRouter, and each direct provider) is cached separately.
+Entries younger than FRESH_TTL are served as-is; older ones are still served
+while a background refresh runs (stale-while-revalidate), up to STALE_TTL,
+after which the caller waits for a fresh fetch. The cache is snapshotted to
+MODEL_CATALOG_PATH so a restart serves the last catalog immediately.
+
+Entries keep the providers' context_length and pricing fields; get_model_info()
+looks a council model id up for other subsystems.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+from .adaptive_limiter import key_fingerprint
+from .atomic_io import atomic_write_json
+from .config import MODEL_CATALOG_PATH
+from .io_pool import run_blocking
+
+logger = logging.getLogger(__name__)
+
+# Served without revalidation for this long (seconds)
+FRESH_TTL = 600.0
+# Served (while revalidating) for up to this long; older entries are refetched first
+STALE_TTL = 86400.0
+# After a failed refresh, wait this long before trying again
+RETRY_INTERVAL = 60.0
+
+SNAPSHOT_VERSION = 1
+
+# source -> {"models": [...], "fetched_at": epoch, "checked_at": epoch, "credential": fingerprint}
+_entries: Dict[str, Dict[str, Any]] = {}
+_refreshing: Dict[str, asyncio.Task] = {}
+# Model id (with and without the openrouter: prefix) -> catalog entry
+_index: Dict[str, Dict[str, Any]] = {}
+
+
+def _rebuild_index():
+    index = {}
+    for source, entry in _entries.items():
+        for model in entry["models"]:
+            model_id = model.get("id")
+            if not model_id:
+                continue
+            index[model_id] = model
+            if source == "openrouter":
+                index[f"openrouter:{model_id}"] = model
+    global _index
+    _index = index
+
+
+def get_model_info(model_id: str) -> Optional[Dict[str, Any]]:
+    """Cached catalog entry for a model id (may carry context_length and pricing), if known."""
+    return _index.get(model_id)
+
+
+async def _fetch(source: str, providers: Dict[str, Any]) -> List[Dict[str, Any]]:
+    if source == "openrouter":
+        from .openrouter import fetch_models
+        return await fetch_models()
+    return await providers[source].get_models()
+
+
+def _credential(source: str, providers: Dict[str, Any]) -> str:
+    provider = providers.get(source)
+    return key_fingerprint(provider.credential_id()) if provider is not None else "default"
+
+
+async def _refresh(source: str, providers: Dict[str, Any], credential: str):
+    now = time.time()
+    try:
+        models = await _fetch(source, providers)
+    except Exception as e:
+        logger.warning(f"Error fetching models for {source}: {e}")
+        models = []
+
+    previous = _entries.get(source)
+    if not models and previous and previous["models"] and previous["credential"] == credential:
+        # Keep serving the last good list; try again after RETRY_INTERVAL
+        _entries[source] = {**previous, "checked_at": now}
+        return
+    # An empty list may be a failed fetch: serve it, but let it go stale right away
+    fetched_at = now if models else now - FRESH_TTL
+    _entries[source] = {"models": models, "fetched_at": fetched_at, "checked_at": now, "credential": credential}
+    _rebuild_index()
+    await _save_snapshot()
+
+
+def _start_refresh(source: str, providers: Dict[str, Any], credential: str) -> asyncio.Task:
+    """Refresh a source in the background, joining a refresh already running."""
+    task = _refreshing.get(source)
+    if task is None or task.done():
+        task = asyncio.create_task(_refresh(source, providers, credential))
+        _refreshing[source] = task
+    return task
+
+
+async def _get_source(source: str, providers: Dict[str, Any], force: bool) -> List[Dict[str, Any]]:
+    credential = _credential(source, providers)
+    entry = _entries.get(source)
+    now = time.time()
+
+    if force or entry is None or entry["credential"] != credential or now - entry["fetched_at"] > STALE_TTL:
+        # Nothing usable cached: wait for the fetch (shielded so a client disconnect doesn't cancel it)
+        await asyncio.shield(_start_refresh(source, providers, credential))
+        return _entries[source]["models"]
+
+    if now - entry["fetched_at"] > FRESH_TTL and now - entry["checked_at"] > RETRY_INTERVAL:
+        _start_refresh(source, providers, credential)
+    return entry["models"]
+
+
+async def get_models(sources: List[str], providers: Dict[str, Any], force: bool = False) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Models per source, fetched concurrently where the cache can't answer.
+
+    Args:
+        sources: "openrouter" and/or direct provider names
+        providers: Provider name -> provider instance (council.PROVIDERS)
+        force: Refetch every source instead of using the cache
+
+    Returns:
+        Dict mapping each source to its model list
+    """
+    results = await asyncio.gather(*(_get_source(source, providers, force) for source in sources))
+    return dict(zip(sources, results))
+
+
+def etag(payload: Any) -> str:
+    """Strong ETag for a JSON-serializable response body."""
+    body = json.dumps(payload, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+async def _save_snapshot(path: str = MODEL_CATALOG_PATH):
+    # Entries are replaced, never mutated, so a shallow copy is a consistent snapshot
+    data = {"version": SNAPSHOT_VERSION, "sources": dict(_entries)}
+    try:
+        await run_blocking(atomic_write_json, path, data)
+    except OSError as e:
+        logger.warning(f"Could not save model catalog snapshot: {e}")
+
+
+def load_snapshot(path: str = MODEL_CATALOG_PATH):
+    """Load the catalog saved by a previous run (blocking). Missing or bad files are ignored."""
+    try:
+        with open(path, 'r') as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable model catalog {path}: {e}")
+        return
+    if data.get("version") != SNAPSHOT_VERSION:
+        return
+
+    for source, entry in (data.get("sources") or {}).items():
+        if isinstance(entry, dict) and isinstance(entry.get("models"), list) and source not in _entries:
+            _entries[source] = {
+                "models": entry["models"],
+                "fetched_at": float(entry.get("fetched_at") or 0),
+                "checked_at": float(entry.get("checked_at") or 0),
+                "credential": entry.get("credential") or "default",
+            }
+    _rebuild_index()
+
+
+def get_stats() -> Dict[str, Any]:
+    """Age and size of each cached source."""
+    now = time.time()
+    return {
+        source: {
+            "models": len(entry["models"]),
+            "age_seconds": round(now - entry["fetched_at"]),
+            "fresh": now - entry["fetched_at"] <= FRESH_TTL,
+            "refreshing": source in _refreshing and not _refreshing[source].done(),
+        }
+        for source, entry in _entries.items()
+    }
@@ -1,20 +1,20 @@
 """Ollama API client for making LLM requests."""
 
 import asyncio
+import json
 import httpx
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, AsyncIterator
 from .config import get_ollama_base_url
-
-# Retry configuration
-MAX_RETRIES = 2
-INITIAL_RETRY_DELAY = 1.0  # seconds
+from .http_client import get_client
+from .providers.retry import exception_error
 
 
 async def query_model(
     model: str,
     messages: List[Dict[str, str]],
     timeout: float = 120.0,
-    temperature: float = 0.7
+    temperature: float = 0.7,
+    response_schema: Optional[Dict[str, Any]] = None
 ) -> Optional[Dict[str, Any]]:
     """
     Query a single model via Ollama API.
@@ -24,6 +24,7 @@ async def query_model(
         messages: List of message dicts with 'role' and 'content'
         timeout: Request timeout in seconds
         temperature: Model temperature
+        response_schema: Optional JSON schema the reply must follow (Ollama's 'format')
 
     Returns:
         Response dict with 'content' and 'error' if failed
@@ -43,53 +44,130 @@ async def query_model(
             "temperature": temperature
         }
     }
+    if response_schema is not None:
+        payload["format"] = response_schema
+
+    try:
+        client = get_client(api_url, "ollama")
+        response = await client.post(
+            api_url,
+            json=payload,
+            timeout=timeout
+        )
+
+        response.raise_for_status()
+        data = response.json()
+        
+        return {
+            'content': data.get('message', {}).get('content', ''),
+            'error': None
+        }
 
-    last_error = None
-
-    for attempt in range(MAX_RETRIES):
-        try:
-            async with httpx.AsyncClient(timeout=timeout) as client:
-                response = await client.post(
-                    api_url,
-                    json=payload
-                )
-
-                response.raise_for_status()
-                data = response.json()
-                
-                return {
-                    'content': data.get('message', {}).get('content', ''),
-                    'error': None
-                }
+    except httpx.HTTPStatusError as e:
+        print(f"HTTP error querying Ollama model {model}: {e}")
+        return {
+            'content': None,
+            'error': f"http_{e.response.status_code}",
+            'error_message': f"Error: http_{e.response.status_code}",
+            'status_code': e.response.status_code
+        }
+    except httpx.ConnectError:
+        print(f"Connection error querying Ollama at {base_url}")
+        # Not retried: Ollama is most likely not running
+        return {
+            'content': None,
+            'error': "connection_error",
+            'error_message': "Could not connect to Ollama. Is it running?",
+            'retryable': False
+        }
+    except httpx.TimeoutException as e:
+        print(f"Timeout querying Ollama model {model}")
+        return {'content': None, **exception_error(e), 'error': "timeout", 'error_message': "Request timed out"}
+    except Exception as e:
+        print(f"Error querying Ollama model {model}: {e}")
+        return {'content': None, **exception_error(e)}
 
-        except httpx.HTTPStatusError as e:
-            print(f"HTTP error querying Ollama model {model}: {e}")
-            last_error = f"http_{e.response.status_code}"
-        except httpx.ConnectError:
-             print(f"Connection error querying Ollama at {base_url}")
-             last_error = "connection_error"
-             # Fail fast on connection error (likely Ollama not running)
-             break
-        except httpx.TimeoutException:
-            print(f"Timeout querying Ollama model {model}")
-            last_error = "timeout"
-        except Exception as e:
-            print(f"Error querying Ollama model {model}: {e}")
-            last_error = str(e)
-            
-        # Wait before retry if it wasn't a connection error
-        if attempt < MAX_RETRIES - 1 and last_error != "connection_error":
-            await asyncio.sleep(INITIAL_RETRY_DELAY * (2 ** attempt))
-
-    error_messages = {
-        "connection_error": "Could not connect to Ollama. Is it running?",
-        "timeout": "Request timed out",
-    }
-    return {
-        'content': None,
-        'error': last_error,
-        'error_message': error_messages.get(last_error, f"Error: {last_error}")
+
+async def query_model_stream(
+    model: str,
+    messages: List[Dict[str, str]],
+    timeout: float = 120.0,
+    temperature: float = 0.7,
+    response_schema: Optional[Dict[str, Any]] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Stream a single model's response via Ollama API (NDJSON chunks).
+
+    Args:
+        model: Ollama model identifier (e.g., "llama3")
+        messages: List of message dicts with 'role' and 'content'
+        timeout: Request timeout in seconds
+        temperature: Model temperature
+        response_schema: Optional JSON schema the reply must follow (Ollama's 'format')
+
+    Yields:
+        {'content': str} / {'reasoning': str} deltas, or a final error dict
+    """
+    base_url = get_ollama_base_url()
+    if base_url.endswith('/'):
+        base_url = base_url[:-1]
+
+    api_url = f"{base_url}/api/chat"
+
+    payload = {
+        "model": model,
+        "messages": messages,
+        "stream": True,
+        "options": {
+            "temperature": temperature
+        }
     }
+    if response_schema is not None:
+        payload["format"] = response_schema
+
+    try:
+        client = get_client(api_url, "ollama")
+        async with client.stream("POST", api_url, json=payload, timeout=timeout) as response:
+            if response.status_code != 200:
+                body = (await response.aread()).decode("utf-8", errors="replace")
+                yield {
+                    'error': True,
+                    'error_message': f"Ollama API error: {response.status_code} - {body}",
+                    'status_code': response.status_code
+                }
+                return
+
+            async for line in response.aiter_lines():
+                if not line.strip():
+                    continue
+                try:
+                    data = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+                if data.get('error'):
+                    yield {'error': True, 'error_message': f"Error: {data['error']}"}
+                    return
+
+                message = data.get('message', {})
+                # Reasoning models (e.g. deepseek-r1, qwen3) stream their thoughts separately
+                if message.get('thinking'):
+                    yield {'reasoning': message['thinking']}
+                if message.get('content'):
+                    yield {'content': message['content']}
+
+                if data.get('done'):
+                    return
+
+    except httpx.ConnectError:
+        print(f"Connection error querying Ollama at {base_url}")
+        yield {'error': True, 'error_message': "Could not connect to Ollama. Is it running?", 'retryable': False}
+    except httpx.TimeoutException as e:
+        print(f"Timeout querying Ollama model {model}")
+        yield {**exception_error(e), 'error_message': "Request timed out"}
+    except Exception as e:
+        print(f"Error querying Ollama model {model}: {e}")
+        yield {'error': True, 'error_message': f"Error: {e}"}
 
 
 async def query_models_parallel(
@@ -2,12 +2,11 @@
 
 import asyncio
 import httpx
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, AsyncIterator
 from .config import get_openrouter_api_key, OPENROUTER_API_URL
-
-# Retry configuration
-MAX_RETRIES = 2
-INITIAL_RETRY_DELAY = 1.0  # seconds
+from .http_client import get_client
+from .providers.streaming import stream_openai_compatible
+from .providers.retry import retry_after_from_headers, exception_error
 
 
 async def query_model(
@@ -17,7 +16,7 @@ async def query_model(
     temperature: float = 0.7
 ) -> Optional[Dict[str, Any]]:
     """
-    Query a single model via OpenRouter API with retry logic for rate limits.
+    Query a single model via OpenRouter API (retries are handled by the council's retry policy).
 
     Args:
         model: OpenRouter model identifier (e.g., "openai/gpt-4o")
@@ -40,81 +39,105 @@ async def query_model(
         "temperature": temperature
     }
 
-    last_error = None
-
-    for attempt in range(MAX_RETRIES):
-        try:
-            async with httpx.AsyncClient(timeout=timeout) as client:
-                response = await client.post(
-                    OPENROUTER_API_URL,
-                    headers=headers,
-                    json=payload
-                )
-
-                # Handle rate limiting with retry
-                if response.status_code == 429:
-                    retry_delay = INITIAL_RETRY_DELAY * (2 ** attempt)
-                    print(f"Rate limited on {model}, retrying in {retry_delay}s (attempt {attempt + 1}/{MAX_RETRIES})")
-                    last_error = "rate_limited"
-                    await asyncio.sleep(retry_delay)
-                    continue
-
-                # Handle other client errors without retry
-                if response.status_code == 400:
-                    error_detail = "bad_request"
-                    try:
-                        error_data = response.json()
-                        error_detail = error_data.get("error", {}).get("message", "bad_request")
-                    except:
-                        pass
-                    print(f"Bad request for {model}: {error_detail}")
-                    return {
-                        'content': None,
-                        'error': 'bad_request',
-                        'error_message': f"Model returned error: {error_detail}"
-                    }
-
-                response.raise_for_status()
-
-                data = response.json()
-                message = data['choices'][0]['message']
-
-                return {
-                    'content': message.get('content'),
-                    'reasoning': message.get('reasoning'), # Capture reasoning field (common in DeepSeek R1/reasoning models)
-                    'reasoning_details': message.get('reasoning_details'),
-                    'error': None
-                }
-
-        except httpx.HTTPStatusError as e:
-            print(f"HTTP error querying model {model}: {e}")
-            last_error = f"http_{e.response.status_code}"
-        except httpx.RemoteProtocolError as e:
-            # This handles "peer closed connection without sending complete message body"
-            retry_delay = INITIAL_RETRY_DELAY * (2 ** attempt)
-            print(f"Remote protocol error (disconnect) on {model}: {e}. Retrying in {retry_delay}s...")
-            last_error = "protocol_error"
-            await asyncio.sleep(retry_delay)
-            continue
-        except httpx.TimeoutException:
-            print(f"Timeout querying model {model}")
-            last_error = "timeout"
-        except Exception as e:
-            print(f"Error querying model {model}: {e}")
-            last_error = str(e)
-            break  # Don't retry on unknown errors
-
-    # All retries exhausted or non-retryable error
-    error_messages = {
-        "rate_limited": "Rate limited - too many requests",
-        "timeout": "Request timed out",
+    try:
+        client = get_client(OPENROUTER_API_URL, "openrouter")
+        response = await client.post(
+            OPENROUTER_API_URL,
+            headers=headers,
+            json=payload,
+            timeout=timeout
+        )
+
+        # Handle client errors (not retryable)
+        if response.status_code == 400:
+            error_detail = "bad_request"
+            try:
+                error_data = response.json()
+                error_detail = error_data.get("error", {}).get("message", "bad_request")
+            except:
+                pass
+            print(f"Bad request for {model}: {error_detail}")
+            return {
+                'content': None,
+                'error': 'bad_request',
+                'error_message': f"Model returned error: {error_detail}",
+                'status_code': 400
+            }
+
+        # Rate limits and other HTTP errors; the council's retry policy decides what to retry
+        if response.status_code != 200:
+            rate_limited = response.status_code == 429
+            print(f"{'Rate limited' if rate_limited else 'HTTP error'} querying model {model}: {response.status_code}")
+            return {
+                'content': None,
+                'error': 'rate_limited' if rate_limited else f"http_{response.status_code}",
+                'error_message': "Rate limited - too many requests" if rate_limited else f"Error: http_{response.status_code}",
+                'status_code': response.status_code,
+                'retry_after': retry_after_from_headers(response.headers)
+            }
+
+        data = response.json()
+        message = data['choices'][0]['message']
+
+        return {
+            'content': message.get('content'),
+            'reasoning': message.get('reasoning'), # Capture reasoning field (common in DeepSeek R1/reasoning models)
+            'reasoning_details': message.get('reasoning_details'),
+            'error': None
+        }
+
+    except httpx.RemoteProtocolError as e:
+        # This handles "peer closed connection without sending complete message body"
+        print(f"Remote protocol error (disconnect) on {model}: {e}")
+        return {'content': None, 'error': 'protocol_error', 'error_message': "Error: protocol_error"}
+    except httpx.TimeoutException:
+        print(f"Timeout querying model {model}")
+        return {'content': None, 'error': 'timeout', 'error_message': "Request timed out"}
+    except Exception as e:
+        print(f"Error querying model {model}: {e}")
+        return {'content': None, **exception_error(e)}
+
+
+async def query_model_stream(
+    model: str,
+    messages: List[Dict[str, str]],
+    timeout: float = 120.0,
+    temperature: float = 0.7
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Stream a single model's response via OpenRouter API.
+
+    Args:
+        model: OpenRouter model identifier (e.g., "openai/gpt-4o")
+        messages: List of message dicts with 'role' and 'content'
+        timeout: Request timeout in seconds
+        temperature: Model temperature
+
+    Yields:
+        {'content': str} / {'reasoning': str} deltas, or a final error dict
+    """
+    api_key = get_openrouter_api_key()
+    headers = {
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json",
     }
-    return {
-        'content': None,
-        'error': last_error,
-        'error_message': error_messages.get(last_error, f"Error: {last_error}")
+
+    payload = {
+        "model": model,
+        "messages": messages,
+        "temperature": temperature
     }
 
+    async for chunk in stream_openai_compatible(
+        get_client(OPENROUTER_API_URL, "openrouter"),
+        OPENROUTER_API_URL,
+        headers=headers,
+        payload=payload,
+        timeout=timeout,
+        label="OpenRouter"
+    ):
+        yield chunk
+
 
 async def query_models_parallel(
     models: List[str],
@@ -178,47 +201,47 @@ async def fetch_models() -> List[Dict[str, Any]]:
     Returns a list of model definitions compatible with the frontend.
     """
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.get("https://openrouter.ai/api/v1/models")
-            if response.status_code != 200:
-                print(f"Failed to fetch OpenRouter models: {response.status_code}")
-                return []
+        client = get_client(OPENROUTER_API_URL, "openrouter")
+        response = await client.get("https://openrouter.ai/api/v1/models", timeout=10.0)
+        if response.status_code != 200:
+            print(f"Failed to fetch OpenRouter models: {response.status_code}")
+            return []
+        
+        data = response.json()
+        models = []
+        for item in data.get("data", []):
+            # Determine if free based on pricing
+            pricing = item.get("pricing", {})
+            is_free = (
+                float(pricing.get("prompt", 0)) == 0 and 
+                float(pricing.get("completion", 0)) == 0
+            )
             
-            data = response.json()
-            models = []
-            for item in data.get("data", []):
-                # Determine if free based on pricing
-                pricing = item.get("pricing", {})
-                is_free = (
-                    float(pricing.get("prompt", 0)) == 0 and 
-                    float(pricing.get("completion", 0)) == 0
-                )
-                
-                # Extract provider from ID (e.g. "google/gemini" -> "Google")
-                model_id = item.get("id", "")
-                provider = "OpenRouter" # Default
-                if "/" in model_id:
-                    provider_slug = model_id.split("/")[0]
-                    # Capitalize nicely
-                    if provider_slug == "openai": provider = "OpenAI"
-                    elif provider_slug == "anthropic": provider = "Anthropic"
-                    elif provider_slug == "google": provider = "Google"
-                    elif provider_slug == "meta-llama": provider = "Meta"
-                    elif provider_slug == "mistralai": provider = "Mistral"
-                    elif provider_slug == "deepseek": provider = "DeepSeek"
-                    else: provider = provider_slug.title()
-                
-                models.append({
-                    "id": model_id,
-                    "name": item.get("name"),
-                    "provider": provider, 
-                    "source": "openrouter", # Explicitly set for frontend grouping
-                    "context_length": item.get("context_length"),
-                    "is_free": is_free,
-                    "pricing": pricing
-                })
+            # Extract provider from ID (e.g. "google/gemini" -> "Google")
+            model_id = item.get("id", "")
+            provider = "OpenRouter" # Default
+            if "/" in model_id:
+                provider_slug = model_id.split("/")[0]
+                # Capitalize nicely
+                if provider_slug == "openai": provider = "OpenAI"
+                elif provider_slug == "anthropic": provider = "Anthropic"
+                elif provider_slug == "google": provider = "Google"
+                elif provider_slug == "meta-llama": provider = "Meta"
+                elif provider_slug == "mistralai": provider = "Mistral"
+                elif provider_slug == "deepseek": provider = "DeepSeek"
+                else: provider = provider_slug.title()
             
-            return models
+            models.append({
+                "id": model_id,
+                "name": item.get("name"),
+                "provider": provider, 
+                "source": "openrouter", # Explicitly set for frontend grouping
+                "context_length": item.get("context_length"),
+                "is_free": is_free,
+                "pricing": pricing
+            })
+        
+        return models
     except Exception as e:
         print(f"Error fetching OpenRouter models: {e}")
         return []
@@ -0,0 +1,109 @@
+"""Fit Stage 2/3 prompts into the target model's context window.
+
+Stage 2 and Stage 3 prompts embed every Stage 1 answer (and Stage 3 every
+ranking) plus the search context. When the prompt (counted with
+backend.tokens) plus a reserve for the answer would not fit the model's
+context_length (from the model catalog), the embedded sections are trimmed with max-min fairness: short
+sections are kept whole and the long ones are cut to an equal share of what
+is left. Callers record the returned trim report in the stored metadata.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+from . import model_catalog
+from .routing import get_routes
+from .settings import Settings
+from .tokens import count_tokens
+
+# Estimates are rough; keep this fraction of the window unused
+SAFETY_MARGIN = 0.05
+# Tokens per section for the truncation marker
+MARKER_TOKENS = 12
+# A trimmed section keeps at least this much
+MIN_SECTION_TOKENS = 64
+
+TRUNCATION_MARKER = "\n[... truncated {tokens} tokens to fit the context window]"
+
+
+def context_window(model: str, settings: Settings) -> Optional[int]:
+    """
+    Context length of a model from the catalog; with failover routes, the smallest
+    of the known routes. Falls back to prompt_budget_default_context (0 = unknown).
+    """
+    known = []
+    for route in [model] + get_routes(model, settings.model_routes):
+        info = model_catalog.get_model_info(route)
+        if info and info.get("context_length"):
+            known.append(int(info["context_length"]))
+    if known:
+        return min(known)
+    return settings.prompt_budget_default_context or None
+
+
+def prompt_budget(model: str, settings: Settings) -> Optional[int]:
+    """Tokens available for a model's prompt, or None when no budgeting applies."""
+    if not settings.prompt_budget_enabled:
+        return None
+    window = context_window(model, settings)
+    if not window:
+        return None
+    return int(window * (1 - SAFETY_MARGIN)) - settings.prompt_budget_output_reserve
+
+
+def _fair_cap(sizes: List[int], budget: int) -> Optional[int]:
+    """Largest per-section cap such that the capped sizes fit the budget (None: all fit)."""
+    if sum(sizes) <= budget:
+        return None
+    remaining = budget
+    ordered = sorted(sizes)
+    for i, size in enumerate(ordered):
+        share = remaining // (len(ordered) - i)
+        if size > share:
+            return share
+        remaining -= size
+    return None
+
+
+def _truncate(text: str, tokens: int, keep: int) -> str:
+    keep_chars = int(len(text) * keep / tokens)
+    return text[:keep_chars].rstrip() + TRUNCATION_MARKER.format(tokens=tokens - keep)
+
+
+def fit_sections(
+    sections: Dict[str, str],
+    prompt_tokens: int,
+    budget: Optional[int],
+    model: str = ""
+) -> Tuple[Dict[str, str], Dict[str, Dict[str, int]]]:
+    """
+    Trim sections so a prompt that embeds them fits the budget.
+
+    Args:
+        sections: Name -> text of each trimmable part of the prompt
+        prompt_tokens: Tokens of the full, untrimmed prompt (messages included)
+        budget: Tokens the prompt may use (None: no limit)
+        model: Model the prompt is for (picks the tokenizer family)
+
+    Returns:
+        (sections with long ones truncated, {name: {"original_tokens", "kept_tokens"}}
+        for every section that was cut)
+    """
+    if budget is None or prompt_tokens <= budget or not sections:
+        return sections, {}
+
+    sizes = {name: count_tokens(text, model) for name, text in sections.items()}
+    fixed = prompt_tokens - sum(sizes.values())
+    available = budget - fixed - MARKER_TOKENS * len(sections)
+    cap = _fair_cap(list(sizes.values()), max(available, 0))
+    if cap is None:
+        return sections, {}
+    cap = max(cap, MIN_SECTION_TOKENS)
+
+    fitted, trimmed = {}, {}
+    for name, text in sections.items():
+        if sizes[name] > cap:
+            fitted[name] = _truncate(text, sizes[name], cap)
+            trimmed[name] = {"original_tokens": sizes[name], "kept_tokens": cap}
+        else:
+            fitted[name] = text
+    return fitted, trimmed
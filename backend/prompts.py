@@ -44,6 +44,14 @@ FINAL RANKING:
 
 Now provide your evaluation and ranking:"""
 
+# Appended to the Stage 2 prompt for judges asked for structured (JSON) output
+STAGE2_JSON_INSTRUCTION = """
+
+Instead of plain text, reply with a JSON object with two keys:
+- "evaluation": your evaluation of each response, as described above
+- "ranking": the response labels from best to worst, e.g. ["Response C", "Response A", "Response B"]
+Do not add a FINAL RANKING section or any text outside the JSON object."""
+
 STAGE3_PROMPT_DEFAULT = """You are the Chairman of an LLM Council. Multiple AI models have provided responses to a user's question, and then ranked each other's responses.
 
 Original Question: {user_query}
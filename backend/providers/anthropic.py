@@ -1,8 +1,11 @@
 """Anthropic provider implementation."""
 
-import httpx
-from typing import List, Dict, Any
+import json
+from typing import List, Dict, Any, AsyncIterator
 from .base import LLMProvider
+from .retry import retry_after_from_headers, exception_error
+from .streaming import iter_sse_data
+from ..http_client import get_client
 from ..settings import get_settings
 
 class AnthropicProvider(LLMProvider):
@@ -14,14 +17,10 @@ class AnthropicProvider(LLMProvider):
         settings = get_settings()
         return settings.anthropic_api_key or ""
 
-    async def query(self, model_id: str, messages: List[Dict[str, str]], timeout: float = 120.0, temperature: float = 0.7) -> Dict[str, Any]:
-        api_key = self._get_api_key()
-        if not api_key:
-            return {"error": True, "error_message": "Anthropic API key not configured"}
-            
+    def _build_payload(self, model_id: str, messages: List[Dict[str, str]], temperature: float) -> Dict[str, Any]:
+        """Convert messages to Anthropic format (system message is separate)."""
         model = model_id.removeprefix("anthropic:")
         
-        # Convert messages to Anthropic format (system message is separate)
         system_message = ""
         filtered_messages = []
         for msg in messages:
@@ -30,39 +29,102 @@ class AnthropicProvider(LLMProvider):
             else:
                 filtered_messages.append(msg)
         
+        payload = {
+            "model": model,
+            "messages": filtered_messages,
+            "max_tokens": 4096,
+            "temperature": temperature
+        }
+        if system_message:
+            payload["system"] = system_message
+        return payload
+
+    def _headers(self, api_key: str) -> Dict[str, str]:
+        return {
+            "x-api-key": api_key,
+            "anthropic-version": "2023-06-01",
+            "content-type": "application/json"
+        }
+
+    async def query(self, model_id: str, messages: List[Dict[str, str]], timeout: float = 120.0, temperature: float = 0.7) -> Dict[str, Any]:
+        api_key = self._get_api_key()
+        if not api_key:
+            return {"error": True, "error_message": "Anthropic API key not configured"}
+            
+        payload = self._build_payload(model_id, messages, temperature)
+        
         try:
-            async with httpx.AsyncClient(timeout=timeout) as client:
-                payload = {
-                    "model": model,
-                    "messages": filtered_messages,
-                    "max_tokens": 4096,
-                    "temperature": temperature
+            client = get_client(self.BASE_URL, "anthropic")
+            response = await client.post(
+                f"{self.BASE_URL}/messages",
+                headers=self._headers(api_key),
+                json=payload,
+                timeout=timeout
+            )
+            
+            if response.status_code != 200:
+                return {
+                    "error": True, 
+                    "error_message": f"Anthropic API error: {response.status_code} - {response.text}",
+                    "status_code": response.status_code,
+                    "retry_after": retry_after_from_headers(response.headers)
                 }
-                if system_message:
-                    payload["system"] = system_message
-                    
-                response = await client.post(
-                    f"{self.BASE_URL}/messages",
-                    headers={
-                        "x-api-key": api_key,
-                        "anthropic-version": "2023-06-01",
-                        "content-type": "application/json"
-                    },
-                    json=payload
-                )
                 
+            data = response.json()
+            content = data["content"][0]["text"]
+            return {"content": content, "error": False}
+            
+        except Exception as e:
+            return exception_error(e)
+
+    async def query_stream(self, model_id: str, messages: List[Dict[str, str]], timeout: float = 120.0, temperature: float = 0.7) -> AsyncIterator[Dict[str, Any]]:
+        api_key = self._get_api_key()
+        if not api_key:
+            yield {"error": True, "error_message": "Anthropic API key not configured"}
+            return
+
+        payload = self._build_payload(model_id, messages, temperature)
+        payload["stream"] = True
+
+        try:
+            client = get_client(self.BASE_URL, "anthropic")
+            async with client.stream(
+                "POST",
+                f"{self.BASE_URL}/messages",
+                headers=self._headers(api_key),
+                json=payload,
+                timeout=timeout
+            ) as response:
                 if response.status_code != 200:
-                    return {
-                        "error": True, 
-                        "error_message": f"Anthropic API error: {response.status_code} - {response.text}"
+                    body = (await response.aread()).decode("utf-8", errors="replace")
+                    yield {
+                        "error": True,
+                        "error_message": f"Anthropic API error: {response.status_code} - {body}",
+                        "status_code": response.status_code,
+                        "retry_after": retry_after_from_headers(response.headers)
                     }
-                    
-                data = response.json()
-                content = data["content"][0]["text"]
-                return {"content": content, "error": False}
-                
+                    return
+
+                async for data in iter_sse_data(response):
+                    try:
+                        event = json.loads(data)
+                    except json.JSONDecodeError:
+                        continue
+
+                    if event.get("type") == "error":
+                        message = event.get("error", {}).get("message", "Unknown error")
+                        yield {"error": True, "error_message": f"Anthropic API error: {message}"}
+                        return
+
+                    if event.get("type") == "content_block_delta":
+                        delta = event.get("delta", {})
+                        if delta.get("type") == "text_delta" and delta.get("text"):
+                            yield {"content": delta["text"]}
+                        elif delta.get("type") == "thinking_delta" and delta.get("thinking"):
+                            yield {"reasoning": delta["thinking"]}
+
         except Exception as e:
-            return {"error": True, "error_message": str(e)}
+            yield exception_error(e)
 
     async def get_models(self) -> List[Dict[str, Any]]:
         api_key = self._get_api_key()
@@ -70,62 +132,56 @@ class AnthropicProvider(LLMProvider):
             return []
             
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.get(
-                    f"{self.BASE_URL}/models",
-                    headers={
-                        "x-api-key": api_key,
-                        "anthropic-version": "2023-06-01",
-                        "content-type": "application/json"
-                    }
-                )
-                
-                if response.status_code != 200:
-                    # Fallback to hardcoded list if API fails (e.g. older keys or API not enabled)
-                    return [
-                        {"id": "anthropic:claude-3-5-sonnet-20241022", "name": "Claude 3.5 Sonnet", "provider": "Anthropic"},
-                        {"id": "anthropic:claude-3-opus-20240229", "name": "Claude 3 Opus", "provider": "Anthropic"},
-                        {"id": "anthropic:claude-3-sonnet-20240229", "name": "Claude 3 Sonnet", "provider": "Anthropic"},
-                        {"id": "anthropic:claude-3-haiku-20240307", "name": "Claude 3 Haiku", "provider": "Anthropic"},
-                    ]
-                    
-                data = response.json()
-                models = []
-                
-                for model in data.get("data", []):
-                    if model.get("type") == "model":
-                        models.append({
-                            "id": f"anthropic:{model['id']}",
-                            "name": f"{model.get('display_name', model['id'])} [Anthropic]",
-                            "provider": "Anthropic"
-                        })
-                
-                return sorted(models, key=lambda x: x["name"])
+            client = get_client(self.BASE_URL, "anthropic")
+            response = await client.get(
+                f"{self.BASE_URL}/models",
+                headers=self._headers(api_key),
+                timeout=10.0
+            )
+            
+            if response.status_code != 200:
+                # Fallback to hardcoded list if API fails (e.g. older keys or API not enabled)
+                return [
+                    {"id": "anthropic:claude-3-5-sonnet-20241022", "name": "Claude 3.5 Sonnet", "provider": "Anthropic"},
+                    {"id": "anthropic:claude-3-opus-20240229", "name": "Claude 3 Opus", "provider": "Anthropic"},
+                    {"id": "anthropic:claude-3-sonnet-20240229", "name": "Claude 3 Sonnet", "provider": "Anthropic"},
+                    {"id": "anthropic:claude-3-haiku-20240307", "name": "Claude 3 Haiku", "provider": "Anthropic"},
+                ]
                 
+            data = response.json()
+            models = []
+            
+            for model in data.get("data", []):
+                if model.get("type") == "model":
+                    models.append({
+                        "id": f"anthropic:{model['id']}",
+                        "name": f"{model.get('display_name', model['id'])} [Anthropic]",
+                        "provider": "Anthropic"
+                    })
+            
+            return sorted(models, key=lambda x: x["name"])
+            
         except Exception:
             return []
 
     async def validate_key(self, api_key: str) -> Dict[str, Any]:
         try:
             # Test with a cheap call
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.post(
-                    f"{self.BASE_URL}/messages",
-                    headers={
-                        "x-api-key": api_key,
-                        "anthropic-version": "2023-06-01",
-                        "content-type": "application/json"
-                    },
-                    json={
-                        "model": "claude-3-haiku-20240307",
-                        "messages": [{"role": "user", "content": "Hi"}],
-                        "max_tokens": 1
-                    }
-                )
-                
-                if response.status_code == 200:
-                    return {"success": True, "message": "API key is valid"}
-                else:
-                    return {"success": False, "message": "Invalid API key"}
+            client = get_client(self.BASE_URL, "anthropic")
+            response = await client.post(
+                f"{self.BASE_URL}/messages",
+                headers=self._headers(api_key),
+                json={
+                    "model": "claude-3-haiku-20240307",
+                    "messages": [{"role": "user", "content": "Hi"}],
+                    "max_tokens": 1
+                },
+                timeout=10.0
+            )
+            
+            if response.status_code == 200:
+                return {"success": True, "message": "API key is valid"}
+            else:
+                return {"success": False, "message": "Invalid API key"}
         except Exception as e:
             return {"success": False, "message": str(e)}
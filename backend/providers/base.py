@@ -1,11 +1,14 @@
 """Base class for LLM providers."""
 
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, AsyncIterator
 
 class LLMProvider(ABC):
     """Abstract base class for LLM providers."""
 
+    # Whether the provider honours structured.json_output() (a JSON schema for the reply)
+    supports_json_output = False
+
     @abstractmethod
     @abstractmethod
     async def query(self, model_id: str, messages: List[Dict[str, str]], timeout: float = 120.0, temperature: float = 0.7) -> Dict[str, Any]:
@@ -22,6 +25,38 @@ class LLMProvider(ABC):
         """
         pass
 
+    def credential_id(self) -> str:
+        """
+        Identify the credentials requests are sent with (used to key rate limiting).
+
+        Defaults to the provider's API key; providers without one override this.
+        """
+        get_api_key = getattr(self, "_get_api_key", None)
+        return get_api_key() if get_api_key else ""
+
+    async def query_stream(self, model_id: str, messages: List[Dict[str, str]], timeout: float = 120.0, temperature: float = 0.7) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream a query to the LLM, yielding deltas as they arrive.
+        
+        Providers without native streaming fall back to a single chunk from query().
+        
+        Args:
+            model_id: The ID of the model to query.
+            messages: List of message dicts (role, content).
+            timeout: Request timeout in seconds.
+            
+        Yields:
+            Dicts with 'content' (str) or 'reasoning' (str) deltas. On failure the last
+            chunk is a dict with 'error' (True) and 'error_message' (str).
+        """
+        result = await self.query(model_id, messages, timeout, temperature)
+        if result is None or result.get("error"):
+            yield {"error": True, "error_message": (result or {}).get("error_message", "Unknown error")}
+            return
+        if result.get("reasoning"):
+            yield {"reasoning": result["reasoning"]}
+        yield {"content": result.get("content") or ""}
+
     @abstractmethod
     async def get_models(self) -> List[Dict[str, Any]]:
         """
@@ -1,12 +1,17 @@
 """DeepSeek provider implementation."""
 
-import httpx
-from typing import List, Dict, Any
+from typing import List, Dict, Any, AsyncIterator
 from .base import LLMProvider
+from .retry import retry_after_from_headers, exception_error
+from .streaming import stream_openai_compatible
+from .structured import with_response_format
+from ..http_client import get_client
 from ..settings import get_settings
 
 class DeepSeekProvider(LLMProvider):
     """DeepSeek API provider."""
+
+    supports_json_output = True
     
     BASE_URL = "https://api.deepseek.com"
     
@@ -22,32 +27,60 @@ class DeepSeekProvider(LLMProvider):
         model = model_id.removeprefix("deepseek:")
         
         try:
-            async with httpx.AsyncClient(timeout=timeout) as client:
-                response = await client.post(
-                    f"{self.BASE_URL}/chat/completions",
-                    headers={
-                        "Authorization": f"Bearer {api_key}",
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "model": model,
-                        "messages": messages,
-                        "temperature": temperature
-                    }
-                )
-                
-                if response.status_code != 200:
-                    return {
-                        "error": True, 
-                        "error_message": f"DeepSeek API error: {response.status_code} - {response.text}"
-                    }
-                    
-                data = response.json()
-                content = data["choices"][0]["message"]["content"]
-                return {"content": content, "error": False}
+            client = get_client(self.BASE_URL, "deepseek")
+            response = await client.post(
+                f"{self.BASE_URL}/chat/completions",
+                headers={
+                    "Authorization": f"Bearer {api_key}",
+                    "Content-Type": "application/json"
+                },
+                json=with_response_format({
+                    "model": model,
+                    "messages": messages,
+                    "temperature": temperature
+                }, strict=False),
+                timeout=timeout
+            )
+            
+            if response.status_code != 200:
+                return {
+                    "error": True, 
+                    "error_message": f"DeepSeek API error: {response.status_code} - {response.text}",
+                    "status_code": response.status_code,
+                    "retry_after": retry_after_from_headers(response.headers)
+                }
                 
+            data = response.json()
+            content = data["choices"][0]["message"]["content"]
+            return {"content": content, "error": False}
+            
         except Exception as e:
-            return {"error": True, "error_message": str(e)}
+            return exception_error(e)
+
+    async def query_stream(self, model_id: str, messages: List[Dict[str, str]], timeout: float = 120.0, temperature: float = 0.7) -> AsyncIterator[Dict[str, Any]]:
+        api_key = self._get_api_key()
+        if not api_key:
+            yield {"error": True, "error_message": "DeepSeek API key not configured"}
+            return
+
+        model = model_id.removeprefix("deepseek:")
+        
+        async for chunk in stream_openai_compatible(
+            get_client(self.BASE_URL, "deepseek"),
+            f"{self.BASE_URL}/chat/completions",
+            headers={
+                "Authorization": f"Bearer {api_key}",
+                "Content-Type": "application/json"
+            },
+            payload=with_response_format({
+                "model": model,
+                "messages": messages,
+                "temperature": temperature
+            }, strict=False),
+            timeout=timeout,
+            label="DeepSeek"
+        ):
+            yield chunk
 
     async def get_models(self) -> List[Dict[str, Any]]:
         """Fetch available models from DeepSeek API with hardcoded fallback."""
@@ -62,32 +95,33 @@ class DeepSeekProvider(LLMProvider):
         # Try dynamic fetch if API key is available
         if api_key:
             try:
-                async with httpx.AsyncClient(timeout=10.0) as client:
-                    response = await client.get(
-                        f"{self.BASE_URL}/models",
-                        headers={"Authorization": f"Bearer {api_key}"}
-                    )
-
-                    if response.status_code == 200:
-                        data = response.json()
-                        models = []
-
-                        for model in data.get("data", []):
-                            model_id = model.get("id", "")
-                            model_id_lower = model_id.lower()
-
-                            # Skip non-chat models
-                            if any(term in model_id_lower for term in excluded_terms):
-                                continue
-
-                            models.append({
-                                "id": f"deepseek:{model_id}",
-                                "name": f"{model_id} [DeepSeek]",
-                                "provider": "DeepSeek"
-                            })
-
-                        if models:
-                            return models
+                client = get_client(self.BASE_URL, "deepseek")
+                response = await client.get(
+                    f"{self.BASE_URL}/models",
+                    headers={"Authorization": f"Bearer {api_key}"},
+                    timeout=10.0
+                )
+
+                if response.status_code == 200:
+                    data = response.json()
+                    models = []
+
+                    for model in data.get("data", []):
+                        model_id = model.get("id", "")
+                        model_id_lower = model_id.lower()
+
+                        # Skip non-chat models
+                        if any(term in model_id_lower for term in excluded_terms):
+                            continue
+
+                        models.append({
+                            "id": f"deepseek:{model_id}",
+                            "name": f"{model_id} [DeepSeek]",
+                            "provider": "DeepSeek"
+                        })
+
+                    if models:
+                        return models
             except Exception:
                 pass  # Fall through to hardcoded fallback
 
@@ -99,15 +133,16 @@ class DeepSeekProvider(LLMProvider):
 
     async def validate_key(self, api_key: str) -> Dict[str, Any]:
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.get(
-                    f"{self.BASE_URL}/models",
-                    headers={"Authorization": f"Bearer {api_key}"}
-                )
-                
-                if response.status_code == 200:
-                    return {"success": True, "message": "API key is valid"}
-                else:
-                    return {"success": False, "message": "Invalid API key"}
+            client = get_client(self.BASE_URL, "deepseek")
+            response = await client.get(
+                f"{self.BASE_URL}/models",
+                headers={"Authorization": f"Bearer {api_key}"},
+                timeout=10.0
+            )
+            
+            if response.status_code == 200:
+                return {"success": True, "message": "API key is valid"}
+            else:
+                return {"success": False, "message": "Invalid API key"}
         except Exception as e:
             return {"success": False, "message": str(e)}
@@ -1,12 +1,18 @@
 """Google Gemini provider implementation."""
 
-import httpx
-from typing import List, Dict, Any
+import json
+from typing import List, Dict, Any, AsyncIterator
 from .base import LLMProvider
+from .retry import retry_after_from_headers, exception_error
+from .streaming import iter_sse_data
+from .structured import current_schema, gemini_schema
+from ..http_client import get_client
 from ..settings import get_settings
 
 class GoogleProvider(LLMProvider):
     """Google Gemini API provider."""
+
+    supports_json_output = True
     
     BASE_URL = "https://generativelanguage.googleapis.com/v1beta/models"
     
@@ -14,14 +20,8 @@ class GoogleProvider(LLMProvider):
         settings = get_settings()
         return settings.google_api_key or ""
 
-    async def query(self, model_id: str, messages: List[Dict[str, str]], timeout: float = 120.0, temperature: float = 0.7) -> Dict[str, Any]:
-        api_key = self._get_api_key()
-        if not api_key:
-            return {"error": True, "error_message": "Google API key not configured"}
-            
-        model = model_id.removeprefix("google:")
-        
-        # Convert messages to Gemini format
+    def _build_payload(self, messages: List[Dict[str, str]], temperature: float) -> Dict[str, Any]:
+        """Convert messages to Gemini format."""
         contents = []
         system_instruction = None
         
@@ -33,39 +33,104 @@ class GoogleProvider(LLMProvider):
             elif msg["role"] == "assistant":
                 contents.append({"role": "model", "parts": [{"text": msg["content"]}]})
         
+        payload = {
+            "contents": contents,
+            "generationConfig": {
+                "temperature": temperature
+            }
+        }
+        if system_instruction:
+            payload["system_instruction"] = system_instruction
+        schema = current_schema()
+        if schema is not None:
+            payload["generationConfig"]["responseMimeType"] = "application/json"
+            payload["generationConfig"]["responseSchema"] = gemini_schema(schema)
+        return payload
+
+    async def query(self, model_id: str, messages: List[Dict[str, str]], timeout: float = 120.0, temperature: float = 0.7) -> Dict[str, Any]:
+        api_key = self._get_api_key()
+        if not api_key:
+            return {"error": True, "error_message": "Google API key not configured"}
+            
+        model = model_id.removeprefix("google:")
+        payload = self._build_payload(messages, temperature)
+        
         try:
-            async with httpx.AsyncClient(timeout=timeout) as client:
-                payload = {
-                    "contents": contents,
-                    "generationConfig": {
-                        "temperature": temperature
-                    }
+            client = get_client(self.BASE_URL, "google")
+            response = await client.post(
+                f"{self.BASE_URL}/{model}:generateContent",
+                params={"key": api_key},
+                headers={"Content-Type": "application/json"},
+                json=payload,
+                timeout=timeout
+            )
+            
+            if response.status_code != 200:
+                return {
+                    "error": True, 
+                    "error_message": f"Google API error: {response.status_code} - {response.text}",
+                    "status_code": response.status_code,
+                    "retry_after": retry_after_from_headers(response.headers)
                 }
-                if system_instruction:
-                    payload["system_instruction"] = system_instruction
-                    
-                response = await client.post(
-                    f"{self.BASE_URL}/{model}:generateContent",
-                    params={"key": api_key},
-                    headers={"Content-Type": "application/json"},
-                    json=payload
-                )
                 
+            data = response.json()
+            try:
+                content = data["candidates"][0]["content"]["parts"][0]["text"]
+                return {"content": content, "error": False}
+            except (KeyError, IndexError):
+                return {"error": True, "error_message": "Unexpected response format from Google API"}
+            
+        except Exception as e:
+            return exception_error(e)
+
+    async def query_stream(self, model_id: str, messages: List[Dict[str, str]], timeout: float = 120.0, temperature: float = 0.7) -> AsyncIterator[Dict[str, Any]]:
+        api_key = self._get_api_key()
+        if not api_key:
+            yield {"error": True, "error_message": "Google API key not configured"}
+            return
+
+        model = model_id.removeprefix("google:")
+        payload = self._build_payload(messages, temperature)
+
+        try:
+            client = get_client(self.BASE_URL, "google")
+            async with client.stream(
+                "POST",
+                f"{self.BASE_URL}/{model}:streamGenerateContent",
+                params={"key": api_key, "alt": "sse"},
+                headers={"Content-Type": "application/json"},
+                json=payload,
+                timeout=timeout
+            ) as response:
                 if response.status_code != 200:
-                    return {
-                        "error": True, 
-                        "error_message": f"Google API error: {response.status_code} - {response.text}"
+                    body = (await response.aread()).decode("utf-8", errors="replace")
+                    yield {
+                        "error": True,
+                        "error_message": f"Google API error: {response.status_code} - {body}",
+                        "status_code": response.status_code,
+                        "retry_after": retry_after_from_headers(response.headers)
                     }
-                    
-                data = response.json()
-                try:
-                    content = data["candidates"][0]["content"]["parts"][0]["text"]
-                    return {"content": content, "error": False}
-                except (KeyError, IndexError):
-                    return {"error": True, "error_message": "Unexpected response format from Google API"}
-                
+                    return
+
+                async for data in iter_sse_data(response):
+                    try:
+                        event = json.loads(data)
+                    except json.JSONDecodeError:
+                        continue
+
+                    for candidate in event.get("candidates", [])[:1]:
+                        for part in candidate.get("content", {}).get("parts", []):
+                            text = part.get("text")
+                            if not text:
+                                continue
+                            # Thinking models flag their thought summaries with `thought: true`
+                            if part.get("thought"):
+                                yield {"reasoning": text}
+                            else:
+                                yield {"content": text}
+
         except Exception as e:
-            return {"error": True, "error_message": str(e)}
+            yield exception_error(e)
 
     async def get_models(self) -> List[Dict[str, Any]]:
         api_key = self._get_api_key()
@@ -73,59 +138,62 @@ class GoogleProvider(LLMProvider):
             return []
             
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.get(
-                    self.BASE_URL,
-                    params={"key": api_key, "pageSize": 100}
-                )
+            client = get_client(self.BASE_URL, "google")
+            response = await client.get(
+                self.BASE_URL,
+                params={"key": api_key, "pageSize": 100},
+                timeout=10.0
+            )
+            
+            if response.status_code != 200:
+                return []
                 
-                if response.status_code != 200:
-                    return []
+            data = response.json()
+            models = []
+            
+            for model in data.get("models", []):
+                # Filter for models that support content generation
+                if "generateContent" in model.get("supportedGenerationMethods", []):
+                    # Clean up ID (remove models/ prefix)
+                    model_id = model["name"].removeprefix("models/")
                     
-                data = response.json()
-                models = []
-                
-                for model in data.get("models", []):
-                    # Filter for models that support content generation
-                    if "generateContent" in model.get("supportedGenerationMethods", []):
-                        # Clean up ID (remove models/ prefix)
-                        model_id = model["name"].removeprefix("models/")
+                    # Extra safety check for embeddings/vision-only if they sneak in
+                    if "embed" in model_id.lower() or "vision" in model_id.lower():
+                        continue
                         
-                        # Extra safety check for embeddings/vision-only if they sneak in
-                        if "embed" in model_id.lower() or "vision" in model_id.lower():
-                            continue
-                            
-                        models.append({
-                            "id": f"google:{model_id}",
-                            "name": f"{model.get('displayName', model_id)} [Google]",
-                            "provider": "Google"
-                        })
-                
-                return sorted(models, key=lambda x: x["name"])
-                
+                    models.append({
+                        "id": f"google:{model_id}",
+                        "name": f"{model.get('displayName', model_id)} [Google]",
+                        "provider": "Google",
+                        "context_length": model.get("inputTokenLimit")
+                    })
+            
+            return sorted(models, key=lambda x: x["name"])
+            
         except Exception:
             return []
 
     async def validate_key(self, api_key: str) -> Dict[str, Any]:
         try:
             # Test by listing models (more robust than generating content with a specific model)
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.get(
-                    self.BASE_URL,
-                    params={"key": api_key, "pageSize": 1}
-                )
-                
-                if response.status_code == 200:
-                    return {"success": True, "message": "API key is valid"}
-                else:
-                    try:
-                        error_data = response.json()
-                        if "error" in error_data:
-                            message = error_data['error'].get('message', 'Unknown error')
-                            return {"success": False, "message": f"Error {response.status_code}: {message}"}
-                        else:
-                            return {"success": False, "message": f"Error {response.status_code}: {str(error_data)[:200]}"}
-                    except:
-                        return {"success": False, "message": f"Error {response.status_code}: {response.text[:200]}"}
+            client = get_client(self.BASE_URL, "google")
+            response = await client.get(
+                self.BASE_URL,
+                params={"key": api_key, "pageSize": 1},
+                timeout=10.0
+            )
+            
+            if response.status_code == 200:
+                return {"success": True, "message": "API key is valid"}
+            else:
+                try:
+                    error_data = response.json()
+                    if "error" in error_data:
+                        message = error_data['error'].get('message', 'Unknown error')
+                        return {"success": False, "message": f"Error {response.status_code}: {message}"}
+                    else:
+                        return {"success": False, "message": f"Error {response.status_code}: {str(error_data)[:200]}"}
+                except:
+                    return {"success": False, "message": f"Error {response.status_code}: {response.text[:200]}"}
         except Exception as e:
             return {"success": False, "message": str(e)}
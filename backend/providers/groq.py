@@ -1,12 +1,17 @@
 """Groq provider implementation."""
 
-import httpx
-from typing import List, Dict, Any
+from typing import List, Dict, Any, AsyncIterator
 from .base import LLMProvider
+from .retry import retry_after_from_headers, exception_error
+from .streaming import stream_openai_compatible
+from .structured import with_response_format
+from ..http_client import get_client
 from ..settings import get_settings
 
 class GroqProvider(LLMProvider):
     """Groq API provider."""
+
+    supports_json_output = True
     
     BASE_URL = "https://api.groq.com/openai/v1"
     
@@ -23,32 +28,60 @@ class GroqProvider(LLMProvider):
         model = model_id.removeprefix("groq:")
         
         try:
-            async with httpx.AsyncClient(timeout=timeout) as client:
-                response = await client.post(
-                    f"{self.BASE_URL}/chat/completions",
-                    headers={
-                        "Authorization": f"Bearer {api_key}",
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "model": model,
-                        "messages": messages,
-                        "temperature": temperature
-                    }
-                )
-                
-                if response.status_code != 200:
-                    return {
-                        "error": True, 
-                        "error_message": f"Groq API error: {response.status_code} - {response.text}"
-                    }
-                    
-                data = response.json()
-                content = data["choices"][0]["message"]["content"]
-                return {"content": content, "error": False}
+            client = get_client(self.BASE_URL, "groq")
+            response = await client.post(
+                f"{self.BASE_URL}/chat/completions",
+                headers={
+                    "Authorization": f"Bearer {api_key}",
+                    "Content-Type": "application/json"
+                },
+                json=with_response_format({
+                    "model": model,
+                    "messages": messages,
+                    "temperature": temperature
+                }, strict=False),
+                timeout=timeout
+            )
+            
+            if response.status_code != 200:
+                return {
+                    "error": True, 
+                    "error_message": f"Groq API error: {response.status_code} - {response.text}",
+                    "status_code": response.status_code,
+                    "retry_after": retry_after_from_headers(response.headers)
+                }
                 
+            data = response.json()
+            content = data["choices"][0]["message"]["content"]
+            return {"content": content, "error": False}
+            
         except Exception as e:
-            return {"error": True, "error_message": str(e)}
+            return exception_error(e)
+
+    async def query_stream(self, model_id: str, messages: List[Dict[str, str]], timeout: float = 120.0, temperature: float = 0.7) -> AsyncIterator[Dict[str, Any]]:
+        api_key = self._get_api_key()
+        if not api_key:
+            yield {"error": True, "error_message": "Groq API key not configured"}
+            return
+
+        model = model_id.removeprefix("groq:")
+        
+        async for chunk in stream_openai_compatible(
+            get_client(self.BASE_URL, "groq"),
+            f"{self.BASE_URL}/chat/completions",
+            headers={
+                "Authorization": f"Bearer {api_key}",
+                "Content-Type": "application/json"
+            },
+            payload=with_response_format({
+                "model": model,
+                "messages": messages,
+                "temperature": temperature
+            }, strict=False),
+            timeout=timeout,
+            label="Groq"
+        ):
+            yield chunk
 
     async def get_models(self) -> List[Dict[str, Any]]:
         api_key = self._get_api_key()
@@ -56,48 +89,50 @@ class GroqProvider(LLMProvider):
             return []
             
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.get(
-                    f"{self.BASE_URL}/models",
-                    headers={"Authorization": f"Bearer {api_key}"}
-                )
+            client = get_client(self.BASE_URL, "groq")
+            response = await client.get(
+                f"{self.BASE_URL}/models",
+                headers={"Authorization": f"Bearer {api_key}"},
+                timeout=10.0
+            )
+            
+            if response.status_code != 200:
+                return []
                 
-                if response.status_code != 200:
-                    return []
+            data = response.json()
+            models = []
+            for model in data.get("data", []):
+                model_id = model["id"]
+                # Filter out non-chat models (Audio, TTS, etc.)
+                if "whisper" in model_id.lower() or "tts" in model_id.lower():
+                    continue
                     
-                data = response.json()
-                models = []
-                for model in data.get("data", []):
-                    model_id = model["id"]
-                    # Filter out non-chat models (Audio, TTS, etc.)
-                    if "whisper" in model_id.lower() or "tts" in model_id.lower():
-                        continue
-                        
-                    # Groq models usually have clean IDs like "llama3-70b-8192"
-                    models.append({
-                        "id": f"groq:{model['id']}",
-                        "name": f"{model['id']} [Groq]",
-                        "provider": "Groq",
-                        "context_length": model.get("context_window", 8192) # Fallback if missing
-                    })
-                return sorted(models, key=lambda x: x["name"])
-                
+                # Groq models usually have clean IDs like "llama3-70b-8192"
+                models.append({
+                    "id": f"groq:{model['id']}",
+                    "name": f"{model['id']} [Groq]",
+                    "provider": "Groq",
+                    "context_length": model.get("context_window", 8192) # Fallback if missing
+                })
+            return sorted(models, key=lambda x: x["name"])
+            
         except Exception:
             return []
 
     async def validate_key(self, api_key: str) -> Dict[str, Any]:
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.get(
-                    f"{self.BASE_URL}/models",
-                    headers={"Authorization": f"Bearer {api_key}"}
-                )
-                
-                if response.status_code == 200:
-                    return {"success": True, "message": "API key is valid"}
-                elif response.status_code == 401:
-                    return {"success": False, "message": "Invalid API key"}
-                else:
-                    return {"success": False, "message": f"Groq API error: {response.status_code}"}
+            client = get_client(self.BASE_URL, "groq")
+            response = await client.get(
+                f"{self.BASE_URL}/models",
+                headers={"Authorization": f"Bearer {api_key}"},
+                timeout=10.0
+            )
+            
+            if response.status_code == 200:
+                return {"success": True, "message": "API key is valid"}
+            elif response.status_code == 401:
+                return {"success": False, "message": "Invalid API key"}
+            else:
+                return {"success": False, "message": f"Groq API error: {response.status_code}"}
         except Exception as e:
             return {"success": False, "message": str(e)}
@@ -1,8 +1,10 @@
 """Mistral provider implementation."""
 
-import httpx
-from typing import List, Dict, Any
+from typing import List, Dict, Any, AsyncIterator
 from .base import LLMProvider
+from .retry import retry_after_from_headers, exception_error
+from .streaming import stream_openai_compatible
+from ..http_client import get_client
 from ..settings import get_settings
 
 class MistralProvider(LLMProvider):
@@ -22,32 +24,60 @@ class MistralProvider(LLMProvider):
         model = model_id.removeprefix("mistral:")
         
         try:
-            async with httpx.AsyncClient(timeout=timeout) as client:
-                response = await client.post(
-                    f"{self.BASE_URL}/chat/completions",
-                    headers={
-                        "Authorization": f"Bearer {api_key}",
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "model": model,
-                        "messages": messages,
-                        "temperature": temperature
-                    }
-                )
-                
-                if response.status_code != 200:
-                    return {
-                        "error": True, 
-                        "error_message": f"Mistral API error: {response.status_code} - {response.text}"
-                    }
-                    
-                data = response.json()
-                content = data["choices"][0]["message"]["content"]
-                return {"content": content, "error": False}
+            client = get_client(self.BASE_URL, "mistral")
+            response = await client.post(
+                f"{self.BASE_URL}/chat/completions",
+                headers={
+                    "Authorization": f"Bearer {api_key}",
+                    "Content-Type": "application/json"
+                },
+                json={
+                    "model": model,
+                    "messages": messages,
+                    "temperature": temperature
+                },
+                timeout=timeout
+            )
+            
+            if response.status_code != 200:
+                return {
+                    "error": True, 
+                    "error_message": f"Mistral API error: {response.status_code} - {response.text}",
+                    "status_code": response.status_code,
+                    "retry_after": retry_after_from_headers(response.headers)
+                }
                 
+            data = response.json()
+            content = data["choices"][0]["message"]["content"]
+            return {"content": content, "error": False}
+            
         except Exception as e:
-            return {"error": True, "error_message": str(e)}
+            return exception_error(e)
+
+    async def query_stream(self, model_id: str, messages: List[Dict[str, str]], timeout: float = 120.0, temperature: float = 0.7) -> AsyncIterator[Dict[str, Any]]:
+        api_key = self._get_api_key()
+        if not api_key:
+            yield {"error": True, "error_message": "Mistral API key not configured"}
+            return
+
+        model = model_id.removeprefix("mistral:")
+        
+        async for chunk in stream_openai_compatible(
+            get_client(self.BASE_URL, "mistral"),
+            f"{self.BASE_URL}/chat/completions",
+            headers={
+                "Authorization": f"Bearer {api_key}",
+                "Content-Type": "application/json"
+            },
+            payload={
+                "model": model,
+                "messages": messages,
+                "temperature": temperature
+            },
+            timeout=timeout,
+            label="Mistral"
+        ):
+            yield chunk
 
     async def get_models(self) -> List[Dict[str, Any]]:
         api_key = self._get_api_key()
@@ -55,44 +85,47 @@ class MistralProvider(LLMProvider):
             return []
             
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.get(
-                    f"{self.BASE_URL}/models",
-                    headers={"Authorization": f"Bearer {api_key}"}
-                )
+            client = get_client(self.BASE_URL, "mistral")
+            response = await client.get(
+                f"{self.BASE_URL}/models",
+                headers={"Authorization": f"Bearer {api_key}"},
+                timeout=10.0
+            )
+            
+            if response.status_code != 200:
+                return []
                 
-                if response.status_code != 200:
-                    return []
-                    
-                data = response.json()
-                models = []
-                for model in data.get("data", []):
-                    mid = model.get("id", "").lower()
-                    # Filter out embeddings, voxtral, ocr, and internal/deprecated models
-                    if "embed" in mid or "voxtral" in mid or "ocr" in mid or mid.startswith("open-"):
-                         continue
+            data = response.json()
+            models = []
+            for model in data.get("data", []):
+                mid = model.get("id", "").lower()
+                # Filter out embeddings, voxtral, ocr, and internal/deprecated models
+                if "embed" in mid or "voxtral" in mid or "ocr" in mid or mid.startswith("open-"):
+                     continue
 
-                    models.append({
-                        "id": f"mistral:{model['id']}",
-                        "name": f"{model['id']} [Mistral]",
-                        "provider": "Mistral"
-                    })
-                return sorted(models, key=lambda x: x["name"])
-                
+                models.append({
+                    "id": f"mistral:{model['id']}",
+                    "name": f"{model['id']} [Mistral]",
+                    "provider": "Mistral",
+                    "context_length": model.get("max_context_length")
+                })
+            return sorted(models, key=lambda x: x["name"])
+            
         except Exception:
             return []
 
     async def validate_key(self, api_key: str) -> Dict[str, Any]:
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.get(
-                    f"{self.BASE_URL}/models",
-                    headers={"Authorization": f"Bearer {api_key}"}
-                )
-                
-                if response.status_code == 200:
-                    return {"success": True, "message": "API key is valid"}
-                else:
-                    return {"success": False, "message": "Invalid API key"}
+            client = get_client(self.BASE_URL, "mistral")
+            response = await client.get(
+                f"{self.BASE_URL}/models",
+                headers={"Authorization": f"Bearer {api_key}"},
+                timeout=10.0
+            )
+            
+            if response.status_code == 200:
+                return {"success": True, "message": "API key is valid"}
+            else:
+                return {"success": False, "message": "Invalid API key"}
         except Exception as e:
             return {"success": False, "message": str(e)}
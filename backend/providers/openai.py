@@ -1,12 +1,17 @@
 """OpenAI provider implementation."""
 
-import httpx
-from typing import List, Dict, Any
+from typing import List, Dict, Any, AsyncIterator
 from .base import LLMProvider
+from .retry import retry_after_from_headers, exception_error
+from .streaming import stream_openai_compatible
+from .structured import with_response_format
+from ..http_client import get_client
 from ..settings import get_settings
 
 class OpenAIProvider(LLMProvider):
     """OpenAI API provider."""
+
+    supports_json_output = True
     
     BASE_URL = "https://api.openai.com/v1"
     
@@ -23,32 +28,60 @@ class OpenAIProvider(LLMProvider):
         model = model_id.removeprefix("openai:")
         
         try:
-            async with httpx.AsyncClient(timeout=timeout) as client:
-                response = await client.post(
-                    f"{self.BASE_URL}/chat/completions",
-                    headers={
-                        "Authorization": f"Bearer {api_key}",
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "model": model,
-                        "messages": messages,
-                        "temperature": 1.0 if any(x in model for x in ["gpt-5.1", "o1-", "o3-"]) else temperature
-                    }
-                )
+            client = get_client(self.BASE_URL, "openai")
+            response = await client.post(
+                f"{self.BASE_URL}/chat/completions",
+                headers={
+                    "Authorization": f"Bearer {api_key}",
+                    "Content-Type": "application/json"
+                },
+                json=with_response_format({
+                    "model": model,
+                    "messages": messages,
+                    "temperature": 1.0 if any(x in model for x in ["gpt-5.1", "o1-", "o3-"]) else temperature
+                }),
+                timeout=timeout
+            )
+            
+            if response.status_code != 200:
+                return {
+                    "error": True, 
+                    "error_message": f"OpenAI API error: {response.status_code} - {response.text}",
+                    "status_code": response.status_code,
+                    "retry_after": retry_after_from_headers(response.headers)
+                }
                 
-                if response.status_code != 200:
-                    return {
-                        "error": True, 
-                        "error_message": f"OpenAI API error: {response.status_code} - {response.text}"
-                    }
-                    
-                data = response.json()
-                content = data["choices"][0]["message"]["content"]
-                return {"content": content, "error": False}
+            data = response.json()
+            content = data["choices"][0]["message"]["content"]
+            return {"content": content, "error": False}
                 
         except Exception as e:
-            return {"error": True, "error_message": str(e)}
+            return exception_error(e)
+
+    async def query_stream(self, model_id: str, messages: List[Dict[str, str]], timeout: float = 120.0, temperature: float = 0.7) -> AsyncIterator[Dict[str, Any]]:
+        api_key = self._get_api_key()
+        if not api_key:
+            yield {"error": True, "error_message": "OpenAI API key not configured"}
+            return
+
+        model = model_id.removeprefix("openai:")
+        
+        async for chunk in stream_openai_compatible(
+            get_client(self.BASE_URL, "openai"),
+            f"{self.BASE_URL}/chat/completions",
+            headers={
+                "Authorization": f"Bearer {api_key}",
+                "Content-Type": "application/json"
+            },
+            payload=with_response_format({
+                "model": model,
+                "messages": messages,
+                "temperature": 1.0 if any(x in model for x in ["gpt-5.1", "o1-", "o3-"]) else temperature
+            }),
+            timeout=timeout,
+            label="OpenAI"
+        ):
+            yield chunk
 
     async def get_models(self) -> List[Dict[str, Any]]:
         api_key = self._get_api_key()
@@ -56,46 +89,48 @@ class OpenAIProvider(LLMProvider):
             return []
             
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.get(
-                    f"{self.BASE_URL}/models",
-                    headers={"Authorization": f"Bearer {api_key}"}
-                )
+            client = get_client(self.BASE_URL, "openai")
+            response = await client.get(
+                f"{self.BASE_URL}/models",
+                headers={"Authorization": f"Bearer {api_key}"},
+                timeout=10.0
+            )
+            
+            if response.status_code != 200:
+                return []
                 
-                if response.status_code != 200:
-                    return []
+            data = response.json()
+            models = []
+            # Filter for chat models
+            for model in data.get("data", []):
+                mid = model["id"].lower()
+                # Filter out non-chat models
+                if any(x in mid for x in ["audio", "realtime", "voice", "tts", "dall-e", "whisper", "embed", "transcribe", "sora"]):
+                    continue
                     
-                data = response.json()
-                models = []
-                # Filter for chat models
-                for model in data.get("data", []):
-                    mid = model["id"].lower()
-                    # Filter out non-chat models
-                    if any(x in mid for x in ["audio", "realtime", "voice", "tts", "dall-e", "whisper", "embed", "transcribe", "sora"]):
-                        continue
-                        
-                    if "gpt" in mid or "o1" in mid or "o3" in mid:
-                        models.append({
-                            "id": f"openai:{model['id']}",
-                            "name": f"{model['id']} [OpenAI]",
-                            "provider": "OpenAI"
-                        })
-                return sorted(models, key=lambda x: x["name"])
+                if "gpt" in mid or "o1" in mid or "o3" in mid:
+                    models.append({
+                        "id": f"openai:{model['id']}",
+                        "name": f"{model['id']} [OpenAI]",
+                        "provider": "OpenAI"
+                    })
+            return sorted(models, key=lambda x: x["name"])
                 
         except Exception:
             return []
 
     async def validate_key(self, api_key: str) -> Dict[str, Any]:
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.get(
-                    f"{self.BASE_URL}/models",
-                    headers={"Authorization": f"Bearer {api_key}"}
-                )
-                
-                if response.status_code == 200:
-                    return {"success": True, "message": "API key is valid"}
-                else:
-                    return {"success": False, "message": "Invalid API key"}
+            client = get_client(self.BASE_URL, "openai")
+            response = await client.get(
+                f"{self.BASE_URL}/models",
+                headers={"Authorization": f"Bearer {api_key}"},
+                timeout=10.0
+            )
+            
+            if response.status_code == 200:
+                return {"success": True, "message": "API key is valid"}
+            else:
+                return {"success": False, "message": "Invalid API key"}
         except Exception as e:
             return {"success": False, "message": str(e)}
@@ -0,0 +1,180 @@
+"""Retry policy shared by all providers.
+
+Providers report failures as result dicts rather than exceptions. The helpers
+here attach what the retry engine needs to those dicts ('status_code',
+'retry_after', 'retryable'), and RetryPolicy decides whether and when to try
+again: retryable errors only, server-requested delays honoured, decorrelated
+jitter otherwise, and never past the call's time budget or stage deadline.
+"""
+
+import random
+import re
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Mapping, Optional
+
+import httpx
+
+# Statuses worth retrying: timeouts, conflicts, rate limits, server/overload errors
+RETRYABLE_STATUSES = {408, 409, 425, 429, 500, 502, 503, 504, 520, 522, 524, 529}
+
+# Error codes used by the legacy OpenRouter/Ollama clients
+RETRYABLE_ERROR_CODES = {"rate_limited", "timeout", "protocol_error"}
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def _parse_delay(value: str) -> Optional[float]:
+    """Parse a delay header value: seconds, an epoch timestamp (s or ms), a duration like '1m30s', or an HTTP date."""
+    value = value.strip()
+    if not value:
+        return None
+    try:
+        number = float(value)
+    except ValueError:
+        number = None
+
+    if number is not None:
+        # Large values are absolute epoch timestamps (some APIs send reset times
+        # that way); OpenRouter's x-ratelimit-reset is in milliseconds
+        if number > 1_000_000_000_000:
+            number /= 1000.0
+        if number > 1_000_000_000:
+            return max(0.0, number - time.time())
+        return max(0.0, number)
+
+    parts = _DURATION_PART.findall(value)
+    if parts and "".join(n + u for n, u in parts) == value.replace(" ", ""):
+        return sum(float(n) * _DURATION_UNITS[u] for n, u in parts)
+
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+def retry_after_from_headers(headers: Mapping[str, str]) -> Optional[float]:
+    """
+    Seconds the server asked us to wait, from Retry-After and the common
+    x-ratelimit-reset variants (OpenAI/Groq/OpenRouter/Anthropic style).
+    """
+    if "retry-after-ms" in headers:
+        try:
+            return max(0.0, float(headers["retry-after-ms"]) / 1000.0)
+        except ValueError:
+            pass
+
+    for name in ("retry-after", "x-ratelimit-reset"):
+        if name in headers:
+            delay = _parse_delay(headers[name])
+            if delay is not None:
+                return delay
+
+    # Separate request/token resets: the request can go once both have reset
+    delays = [
+        _parse_delay(headers[name])
+        for name in ("x-ratelimit-reset-requests", "x-ratelimit-reset-tokens",
+                     "anthropic-ratelimit-requests-reset", "anthropic-ratelimit-tokens-reset")
+        if name in headers
+    ]
+    delays = [d for d in delays if d is not None]
+    return max(delays) if delays else None
+
+
+def exception_error(e: Exception) -> Dict[str, Any]:
+    """Error result for an exception raised while talking to a provider."""
+    return {
+        "error": True,
+        "error_message": str(e) or type(e).__name__,
+        # Connection resets, timeouts and protocol errors are transient
+        "retryable": isinstance(e, httpx.TransportError),
+        "timed_out": isinstance(e, httpx.TimeoutException),
+    }
+
+
+def is_timeout(result: Optional[Dict[str, Any]]) -> bool:
+    """Whether a failed result means the request timed out."""
+    if not result or not result.get("error"):
+        return False
+    return bool(result.get("timed_out")) or result.get("error") == "timeout"
+
+
+def is_retryable(result: Optional[Dict[str, Any]]) -> bool:
+    """Whether a failed result is worth another attempt."""
+    if not result or not result.get("error"):
+        return False
+    if result.get("retryable") is not None:
+        return bool(result["retryable"])
+    if result.get("status_code") is not None:
+        return result["status_code"] in RETRYABLE_STATUSES
+    error = result.get("error")
+    if isinstance(error, str):
+        if error in RETRYABLE_ERROR_CODES:
+            return True
+        if error.startswith("http_"):
+            return error[5:].isdigit() and int(error[5:]) in RETRYABLE_STATUSES
+    return False
+
+
+class RetryPolicy:
+    """
+    Per-call retry state.
+
+    Backoff uses decorrelated jitter: each delay is drawn from
+    [base, 3 * previous delay], capped at max_delay. A server-provided
+    Retry-After overrides it. Either is shortened to fit the budget, leaving
+    a second to run the attempt.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        budget: float = 30.0,
+        deadline: Optional[float] = None,
+        base_delay: float = 0.5,
+        max_delay: float = 20.0
+    ):
+        """
+        Args:
+            max_attempts: Total attempts including the first
+            budget: Seconds from the first attempt after which no retry is started
+            deadline: Optional absolute time.monotonic() the caller must be done by
+            base_delay: Smallest backoff delay
+            max_delay: Largest jittered backoff delay
+        """
+        self.max_attempts = max(1, max_attempts)
+        self.started = time.monotonic()
+        self.deadline = self.started + budget
+        if deadline is not None:
+            self.deadline = min(self.deadline, deadline)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.attempts = 0
+        self._previous_delay = base_delay
+
+    def remaining(self) -> float:
+        """Seconds left before the budget/deadline."""
+        return self.deadline - time.monotonic()
+
+    def next_delay(self, result: Optional[Dict[str, Any]]) -> Optional[float]:
+        """
+        Record a finished attempt and decide on the next one.
+
+        Returns:
+            Seconds to sleep before retrying, or None to give up with this result
+        """
+        self.attempts += 1
+        if self.attempts >= self.max_attempts or not is_retryable(result):
+            return None
+
+        jittered = min(self.max_delay, random.uniform(self.base_delay, self._previous_delay * 3))
+        self._previous_delay = jittered
+        retry_after = (result or {}).get("retry_after")
+        delay = retry_after if retry_after is not None else jittered
+
+        # Wait at most until the budget runs out, leaving at least a second to run the attempt
+        available = self.remaining() - 1.0
+        if available <= 0:
+            return None
+        return min(delay, available)
@@ -0,0 +1,106 @@
+"""Helpers for parsing streamed (SSE / NDJSON) provider responses."""
+
+import json
+import httpx
+from typing import AsyncIterator, Dict, Any
+from .retry import retry_after_from_headers, exception_error
+
+
+async def iter_sse_data(response: httpx.Response) -> AsyncIterator[str]:
+    """
+    Yield the payload of each `data:` line of a Server-Sent Events response.
+
+    Stops at the OpenAI-style `[DONE]` sentinel.
+    """
+    async for line in response.aiter_lines():
+        if not line.startswith("data:"):
+            continue
+        data = line[5:].strip()
+        if data == "[DONE]":
+            return
+        if data:
+            yield data
+
+
+def openai_delta_to_chunks(event: Dict[str, Any]) -> list:
+    """Convert one OpenAI-compatible stream event into content/reasoning chunks."""
+    chunks = []
+    for choice in event.get("choices", [])[:1]:
+        delta = choice.get("delta") or {}
+        # DeepSeek uses `reasoning_content`, OpenRouter uses `reasoning`
+        reasoning = delta.get("reasoning_content") or delta.get("reasoning")
+        if reasoning:
+            chunks.append({"reasoning": reasoning})
+        content = delta.get("content")
+        if content:
+            chunks.append({"content": content})
+    return chunks
+
+
+async def stream_openai_compatible(
+    client: httpx.AsyncClient,
+    url: str,
+    headers: Dict[str, str],
+    payload: Dict[str, Any],
+    timeout: float,
+    label: str
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Stream a chat completion from any OpenAI-compatible `/chat/completions` endpoint.
+
+    Args:
+        client: Pooled HTTP client for the provider
+        url: Full chat completions URL
+        headers: Request headers (auth etc.)
+        payload: Request body (`stream` is forced on)
+        timeout: Request timeout in seconds
+        label: Provider name used in error messages
+
+    Yields:
+        {'content': str} / {'reasoning': str} deltas, or a final
+        {'error': True, 'error_message': str} on failure.
+    """
+    try:
+        async with client.stream(
+            "POST",
+            url,
+            headers=headers,
+            json={**payload, "stream": True},
+            timeout=timeout
+        ) as response:
+            if response.status_code != 200:
+                body = (await response.aread()).decode("utf-8", errors="replace")
+                yield {
+                    "error": True,
+                    "error_message": f"{label} API error: {response.status_code} - {body}",
+                    "status_code": response.status_code,
+                    "retry_after": retry_after_from_headers(response.headers)
+                }
+                return
+
+            # Some OpenAI-compatible servers ignore `stream` and answer in one JSON body
+            if response.headers.get("content-type", "").startswith("application/json"):
+                data = json.loads(await response.aread())
+                message = data["choices"][0]["message"]
+                reasoning = message.get("reasoning_content") or message.get("reasoning")
+                if reasoning:
+                    yield {"reasoning": reasoning}
+                yield {"content": message.get("content") or ""}
+                return
+
+            async for data in iter_sse_data(response):
+                try:
+                    event = json.loads(data)
+                except json.JSONDecodeError:
+                    continue
+                if event.get("error"):
+                    error = event["error"]
+                    message = error.get("message") if isinstance(error, dict) else str(error)
+                    yield {"error": True, "error_message": f"{label} API error: {message}"}
+                    return
+                for chunk in openai_delta_to_chunks(event):
+                    yield chunk
+
+    except Exception as e:
+        yield exception_error(e)
+
@@ -0,0 +1,104 @@
+"""Structured (JSON) output for providers that can enforce a schema.
+
+Callers wrap a query in `json_output(schema)`. Providers with
+supports_json_output read `current_schema()` and translate it to their own
+parameter (OpenAI-style `response_format`, Gemini `responseSchema`, Ollama
+`format`); the others ignore it, so callers must still validate the reply.
+
+Keywords a provider's schema dialect lacks are dropped before sending, and a
+400/422 answer to a structured request may mean the model rejected the schema
+(see rejects_structured_output), so callers should retry it as free text.
+"""
+
+import contextvars
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+# JSON schema the current query's output should follow (None: free text)
+_schema: contextvars.ContextVar[Optional[Dict[str, Any]]] = contextvars.ContextVar("structured_output_schema", default=None)
+
+# Statuses an API answers with when it rejects a request parameter
+REJECTED_STATUSES = {400, 422}
+
+# Schema keywords each dialect does not accept
+_OPENAI_UNSUPPORTED = {"uniqueItems"}
+_GEMINI_UNSUPPORTED = {"additionalProperties", "uniqueItems"}
+
+
+@contextmanager
+def json_output(schema: Optional[Dict[str, Any]]) -> Iterator[None]:
+    """Ask for output matching `schema` from provider requests made inside this block."""
+    token = _schema.set(schema)
+    try:
+        yield
+    finally:
+        _schema.reset(token)
+
+
+def current_schema() -> Optional[Dict[str, Any]]:
+    """Schema requested for the current query, if any."""
+    return _schema.get()
+
+
+def rejects_structured_output(result: Optional[Dict[str, Any]]) -> bool:
+    """Whether a failed structured request may have failed on the schema itself (not the model's health)."""
+    return bool(result and result.get("error") and result.get("status_code") in REJECTED_STATUSES)
+
+
+def _without(schema: Dict[str, Any], unsupported: set) -> Dict[str, Any]:
+    """Copy of a schema with the given keywords removed at every level."""
+    converted: Dict[str, Any] = {}
+    for key, value in schema.items():
+        if key in unsupported:
+            continue
+        if key == "properties":
+            converted[key] = {name: _without(prop, unsupported) for name, prop in value.items()}
+        elif key == "items":
+            converted[key] = _without(value, unsupported)
+        else:
+            converted[key] = value
+    return converted
+
+
+def openai_response_format(strict: bool = True) -> Optional[Dict[str, Any]]:
+    """
+    `response_format` for OpenAI-compatible APIs.
+
+    Args:
+        strict: Send the schema itself (json_schema mode); otherwise ask for
+            any JSON object, for APIs that only support json_object mode
+
+    Returns:
+        The parameter value, or None when no structured output was requested
+    """
+    schema = current_schema()
+    if schema is None:
+        return None
+    if not strict:
+        return {"type": "json_object"}
+    return {"type": "json_schema", "json_schema": {"name": "response", "schema": _without(schema, _OPENAI_UNSUPPORTED), "strict": True}}
+
+
+def with_response_format(payload: Dict[str, Any], strict: bool = True) -> Dict[str, Any]:
+    """Add `response_format` to an OpenAI-compatible request payload when structured output was requested."""
+    response_format = openai_response_format(strict)
+    if response_format is not None:
+        payload["response_format"] = response_format
+    return payload
+
+
+def gemini_schema(schema: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert a JSON schema to Gemini's responseSchema subset (upper-case types, no additionalProperties)."""
+    converted: Dict[str, Any] = {}
+    for key, value in _without(schema, _GEMINI_UNSUPPORTED).items():
+        if key == "type":
+            converted[key] = value.upper()
+        elif key == "properties":
+            converted[key] = {name: gemini_schema(prop) for name, prop in value.items()}
+        elif key == "items":
+            converted[key] = gemini_schema(value)
+        else:
+            converted[key] = value
+    if "enum" in converted and converted.get("type") == "STRING":
+        converted["format"] = "enum"
+    return converted
@@ -0,0 +1,120 @@
+"""Structured Stage 2 rankings.
+
+Judges whose provider can enforce a JSON schema are asked for
+{"evaluation": "...", "ranking": ["Response C", "Response A", ...]} instead
+of a free-text FINAL RANKING section. The reply is validated here; anything
+that doesn't parse falls back to the regex parser in council.py.
+
+How each judge's rankings were parsed is counted per model, so models that
+keep going off-format show up in /api/admin/rankings. Models that reject the
+schema outright are remembered and asked for the text format from then on.
+"""
+
+import json
+import re
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+# How a judge's ranking was obtained
+OUTCOMES = ("json", "fallback", "text", "failed")
+
+_LABEL = re.compile(r"^(?:response\s+)?([a-z]{1,3})$", re.IGNORECASE)
+_CODE_FENCE = re.compile(r"^```(?:json)?\s*(.*?)\s*```$", re.DOTALL)
+
+# Model -> outcome -> count
+_outcomes: Dict[str, Dict[str, int]] = defaultdict(lambda: dict.fromkeys(OUTCOMES, 0))
+# Models whose API rejected the ranking schema
+_unsupported: Set[str] = set()
+
+
+def ranking_schema(labels: Sequence[str]) -> Dict[str, Any]:
+    """JSON schema for a ranking of the given labels (e.g. 'Response A')."""
+    return {
+        "type": "object",
+        "properties": {
+            "evaluation": {"type": "string"},
+            "ranking": {
+                "type": "array",
+                "items": {"type": "string", "enum": list(labels)},
+                "minItems": len(labels),
+                "maxItems": len(labels),
+                "uniqueItems": True,
+            },
+        },
+        "required": ["evaluation", "ranking"],
+        "additionalProperties": False,
+    }
+
+
+def parse_json_ranking(text: str, labels: Sequence[str]) -> Optional[Tuple[str, List[str]]]:
+    """
+    Validate a structured ranking reply.
+
+    Args:
+        text: The judge's reply
+        labels: Labels the judge was asked to rank
+
+    Returns:
+        (evaluation, labels best to worst), or None unless the reply ranks
+        every label exactly once
+    """
+    if not isinstance(text, str):
+        return None
+    text = text.strip()
+    fenced = _CODE_FENCE.match(text)
+    if fenced:
+        text = fenced.group(1)
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return None
+    if not isinstance(data, dict) or not isinstance(data.get("ranking"), list):
+        return None
+
+    ranking = []
+    for item in data["ranking"]:
+        match = _LABEL.match(item.strip()) if isinstance(item, str) else None
+        if not match:
+            return None
+        ranking.append(f"Response {match.group(1).upper()}")
+    # A partial, padded or repeated ranking is not valid output
+    if len(ranking) != len(labels) or set(ranking) != set(labels):
+        return None
+
+    evaluation = data.get("evaluation")
+    return (evaluation if isinstance(evaluation, str) else ""), ranking
+
+
+def format_ranking_text(evaluation: str, ranking: Sequence[str]) -> str:
+    """Render a structured ranking in the free-text format the UI and Stage 3 prompt expect."""
+    lines = [f"{position}. {label}" for position, label in enumerate(ranking, start=1)]
+    return f"{evaluation.strip()}\n\nFINAL RANKING:\n" + "\n".join(lines)
+
+
+def json_supported(model: str) -> bool:
+    """False once the model's API has rejected the ranking schema."""
+    return model not in _unsupported
+
+
+def mark_unsupported(model: str):
+    """Ask this model for the text format from now on."""
+    _unsupported.add(model)
+
+
+def record(model: str, outcome: str):
+    """Count how a judge's ranking was parsed (one of OUTCOMES)."""
+    _outcomes[model][outcome] += 1
+
+
+def get_stats() -> Dict[str, Dict[str, Any]]:
+    """Per-model parse outcomes and failure rate."""
+    stats = {}
+    for model, counts in _outcomes.items():
+        total = sum(counts.values())
+        stats[model] = {
+            **counts,
+            "total": total,
+            "failure_rate": round(counts["failed"] / total, 3) if total else 0.0,
+            "json_supported": model not in _unsupported,
+        }
+    return stats
@@ -0,0 +1,151 @@
+"""Token-bucket RPM/TPM limits per provider or model, configured in Settings.
+
+settings.rate_limits maps a provider name ("groq") or a full model id
+("groq:llama-3.1-8b-instant") to {"rpm": ..., "tpm": ...}; 0 or a missing
+entry means unlimited. A request must fit every bucket that applies to it
+(its provider's and its model's) and waits for the slowest one. Buckets are
+kept per API key, since that is what the upstream limits are attached to.
+"""
+
+import asyncio
+import time
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from .adaptive_limiter import key_fingerprint
+from .run_events import emit
+from .tokens import count_messages
+
+logger = logging.getLogger(__name__)
+
+# Completion tokens are unknown before the call; TPM limits count them too
+EXPECTED_COMPLETION_TOKENS = 256
+
+
+def estimate_tokens(messages: List[Dict[str, Any]], model: str = "") -> int:
+    """Estimate the tokens a request will consume (prompt + expected completion)."""
+    return count_messages(messages, model) + EXPECTED_COMPLETION_TOKENS
+
+
+class TokenBucket:
+    """
+    Bucket refilled continuously at capacity-per-minute.
+
+    Reservations may drive the level negative; the caller then sleeps until the
+    level would have recovered. That keeps waiters in FIFO order without a queue.
+    """
+
+    def __init__(self, per_minute: float):
+        self.per_minute = per_minute
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0
+        self.level = per_minute
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount: float) -> float:
+        """
+        Take amount from the bucket.
+
+        Returns:
+            Seconds to wait before the reservation is covered (0 if immediate)
+        """
+        self._refill()
+        # A single request larger than the whole bucket can never fit; cap it
+        self.level -= min(amount, self.capacity)
+        return 0.0 if self.level >= 0 else -self.level / self.rate
+
+    def refund(self, amount: float):
+        self._refill()
+        self.level = min(self.capacity, self.level + min(amount, self.capacity))
+
+
+# (config key, limit kind, key fingerprint) -> bucket
+_buckets: Dict[Tuple[str, str, str], TokenBucket] = {}
+
+
+def _bucket(config_key: str, kind: str, credential: str, per_minute: float) -> TokenBucket:
+    key = (config_key, kind, key_fingerprint(credential))
+    bucket = _buckets.get(key)
+    if bucket is None or bucket.per_minute != per_minute:
+        bucket = TokenBucket(per_minute)
+        _buckets[key] = bucket
+    return bucket
+
+
+async def wait_for_capacity(
+    rate_limits: Dict[str, Dict[str, float]],
+    provider: str,
+    model: str,
+    credential: str,
+    messages: List[Dict[str, Any]]
+) -> float:
+    """
+    Wait until a request fits the configured RPM/TPM limits.
+
+    Emits a 'queued' run event before waiting so the client can show it.
+
+    Args:
+        rate_limits: settings.rate_limits
+        provider: Provider name (e.g. "groq")
+        model: Full model id as configured
+        credential: API key (or other credential id) the request is sent with
+        messages: The request's messages, for the TPM estimate
+
+    Returns:
+        Seconds waited
+    """
+    if not rate_limits:
+        return 0.0
+
+    tokens: Optional[int] = None
+    reservations: List[Tuple[TokenBucket, float]] = []
+    wait = 0.0
+    reason = None
+    for config_key in (provider, model):
+        limits = rate_limits.get(config_key)
+        if not limits:
+            continue
+        for kind in ("rpm", "tpm"):
+            per_minute = limits.get(kind) or 0
+            if per_minute <= 0:
+                continue
+            if kind == "tpm" and tokens is None:
+                tokens = estimate_tokens(messages, model)
+            amount = 1 if kind == "rpm" else tokens
+            bucket = _bucket(config_key, kind, credential, per_minute)
+            delay = bucket.reserve(amount)
+            reservations.append((bucket, amount))
+            if delay > wait:
+                wait, reason = delay, kind
+
+    if wait <= 0:
+        return 0.0
+
+    logger.info(f"{model}: waiting {wait:.1f}s for {reason.upper()} limit")
+    emit({"type": "queued", "model": model, "provider": provider, "reason": reason, "wait": round(wait, 2)})
+    try:
+        await asyncio.sleep(wait)
+    except asyncio.CancelledError:
+        # Give the unused reservations back to the requests behind us
+        for bucket, amount in reservations:
+            bucket.refund(amount)
+        raise
+    return wait
+
+
+def validate_rate_limits(rate_limits: Dict[str, Dict[str, float]]) -> Optional[str]:
+    """Return an error message if a rate limit config is malformed, else None."""
+    for config_key, limits in rate_limits.items():
+        if not isinstance(limits, dict):
+            return f"rate_limits[{config_key!r}] must be an object with 'rpm' and/or 'tpm'"
+        for kind, value in limits.items():
+            if kind not in ("rpm", "tpm"):
+                return f"rate_limits[{config_key!r}] has unknown limit {kind!r} (use 'rpm' or 'tpm')"
+            if value is None or value < 0:
+                return f"rate_limits[{config_key!r}][{kind!r}] must be 0 (unlimited) or positive"
+    return None
@@ -0,0 +1,182 @@
+"""Opt-in cache of provider responses, keyed by model, messages and temperature."""
+
+import hashlib
+import json
+import os
+import time
+import threading
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from .atomic_io import atomic_write_json
+from .config import RESPONSE_CACHE_DIR
+
+logger = logging.getLogger(__name__)
+
+# Stage names query_model callers pass in; settings.response_cache_stages picks from these
+CACHE_STAGES = ["stage1", "stage2", "stage3"]
+
+_lock = threading.Lock()
+# key -> (stored_at, response); most recently used last
+_memory: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+_stats: Dict[str, Dict[str, int]] = {}
+
+
+def make_key(model: str, messages: List[Dict[str, Any]], temperature: float) -> str:
+    """Hash (model, messages, temperature) into a cache key."""
+    payload = json.dumps([model, messages, round(float(temperature), 4)], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _count(stage: str, field: str):
+    with _lock:
+        counters = _stats.setdefault(stage, {"hits": 0, "misses": 0, "memory_hits": 0, "disk_hits": 0, "stores": 0})
+        counters[field] += 1
+
+
+def _disk_path(key: str) -> str:
+    return os.path.join(RESPONSE_CACHE_DIR, key[:2], f"{key}.json")
+
+
+def _read_disk(key: str, ttl: float) -> Optional[Tuple[float, Dict[str, Any]]]:
+    path = _disk_path(key)
+    try:
+        with open(path, "r") as f:
+            entry = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning(f"Dropping unreadable cache entry {path}: {e}")
+        _remove_disk(key)
+        return None
+
+    stored_at = entry.get("stored_at", 0)
+    if ttl > 0 and time.time() - stored_at > ttl:
+        _remove_disk(key)
+        return None
+    return stored_at, entry["response"]
+
+
+def _write_disk(key: str, stored_at: float, model: str, response: Dict[str, Any]):
+    # A lost cache entry is just a miss, so skip the fsync
+    atomic_write_json(_disk_path(key), {"stored_at": stored_at, "model": model, "response": response}, durable=False)
+
+
+def _remove_disk(key: str):
+    try:
+        os.remove(_disk_path(key))
+    except OSError:
+        pass
+
+
+def lookup_memory(key: str, ttl: float, stage: str) -> Optional[Dict[str, Any]]:
+    """
+    Look a key up in the in-memory tier.
+
+    Returns:
+        The cached response, or None (a miss is not counted here so the
+        caller can still try the disk tier)
+    """
+    with _lock:
+        entry = _memory.get(key)
+        if entry is not None:
+            stored_at, response = entry
+            if ttl > 0 and time.time() - stored_at > ttl:
+                del _memory[key]
+                entry = None
+            else:
+                _memory.move_to_end(key)
+    if entry is None:
+        return None
+    _count(stage, "hits")
+    _count(stage, "memory_hits")
+    return dict(entry[1])
+
+
+def lookup_disk(key: str, ttl: float, stage: str, max_entries: int) -> Optional[Dict[str, Any]]:
+    """
+    Look a key up on disk (blocking; run it off the event loop). A hit is
+    promoted to the memory tier. A miss is counted here.
+    """
+    entry = _read_disk(key, ttl)
+    if entry is None:
+        _count(stage, "misses")
+        return None
+    _store_memory(key, entry[0], entry[1], max_entries)
+    _count(stage, "hits")
+    _count(stage, "disk_hits")
+    return dict(entry[1])
+
+
+def record_miss(stage: str):
+    """Count a miss when there is no disk tier to consult."""
+    _count(stage, "misses")
+
+
+def _store_memory(key: str, stored_at: float, response: Dict[str, Any], max_entries: int):
+    with _lock:
+        _memory[key] = (stored_at, response)
+        _memory.move_to_end(key)
+        while len(_memory) > max(1, max_entries):
+            _memory.popitem(last=False)
+
+
+def store(
+    key: str,
+    model: str,
+    response: Dict[str, Any],
+    stage: str,
+    max_entries: int,
+    disk: bool = False
+):
+    """
+    Cache a successful response. Errors are never cached.
+
+    With disk=True the entry is also written to disk, which blocks; run it off
+    the event loop.
+    """
+    if response.get("error"):
+        return
+    stored_at = time.time()
+    _store_memory(key, stored_at, dict(response), max_entries)
+    _count(stage, "stores")
+    if disk:
+        try:
+            _write_disk(key, stored_at, model, response)
+        except OSError as e:
+            logger.warning(f"Could not write response cache entry: {e}")
+
+
+def get_stats() -> Dict[str, Any]:
+    """Hit/miss counters per stage, plus totals and the memory tier size."""
+    with _lock:
+        per_stage = {stage: dict(counters) for stage, counters in _stats.items()}
+        entries = len(_memory)
+
+    totals = {"hits": 0, "misses": 0, "memory_hits": 0, "disk_hits": 0, "stores": 0}
+    for counters in per_stage.values():
+        for field, value in counters.items():
+            totals[field] += value
+    lookups = totals["hits"] + totals["misses"]
+
+    return {
+        **totals,
+        "hit_rate": round(totals["hits"] / lookups, 4) if lookups else 0.0,
+        "memory_entries": entries,
+        "stages": per_stage,
+    }
+
+
+def clear(disk: bool = True):
+    """Drop every cached response (and the disk tier unless disk=False). Counters are kept."""
+    with _lock:
+        _memory.clear()
+    if disk and os.path.isdir(RESPONSE_CACHE_DIR):
+        for root, _dirs, files in os.walk(RESPONSE_CACHE_DIR):
+            for name in files:
+                if name.endswith(".json"):
+                    try:
+                        os.remove(os.path.join(root, name))
+                    except OSError:
+                        pass
@@ -0,0 +1,35 @@
+"""Failover routing: one logical model, several routes to reach it.
+
+settings.model_routes maps a logical model id (as used in the council
+config) to the routes that can serve it, in priority order, e.g.
+
+    {"openai:gpt-4o": ["openai:gpt-4o", "openrouter:openai/gpt-4o"]}
+
+A route is itself a provider-prefixed model id. Models without an entry have
+a single route: themselves.
+"""
+
+from typing import Dict, Iterable, List, Optional
+
+
+def get_routes(model: str, model_routes: Dict[str, List[str]]) -> List[str]:
+    """Routes for a logical model, highest priority first (never empty)."""
+    routes = [route for route in model_routes.get(model) or [] if route]
+    if not routes:
+        return [model]
+    # Drop duplicates, keeping the first (highest priority) occurrence
+    return list(dict.fromkeys(routes))
+
+
+def validate_model_routes(model_routes: Dict[str, List[str]], providers: Iterable[str]) -> Optional[str]:
+    """Return an error message if a routing table is malformed, else None."""
+    providers = set(providers)
+    for model, routes in model_routes.items():
+        if not isinstance(routes, list) or not routes:
+            return f"model_routes[{model!r}] must be a non-empty list of model ids"
+        for route in routes:
+            if not isinstance(route, str) or ":" not in route:
+                return f"model_routes[{model!r}] route {route!r} must be a provider-prefixed model id"
+            if route.split(":", 1)[0] not in providers:
+                return f"model_routes[{model!r}] route {route!r} uses an unknown provider"
+    return None
@@ -0,0 +1,34 @@
+"""Side-channel for events raised deep inside a council run (e.g. rate-limit waits).
+
+Stage functions install a sink that feeds their own event queue; lower layers
+call emit() without knowing who, if anyone, is listening.
+"""
+
+import contextvars
+from typing import Any, Callable, Dict, Optional
+
+EventSink = Callable[[Dict[str, Any]], None]
+
+_sink: contextvars.ContextVar[Optional[EventSink]] = contextvars.ContextVar("run_event_sink", default=None)
+
+
+def set_event_sink(sink: Optional[EventSink]):
+    """
+    Route emitted events to sink for the current context.
+
+    Meant to be called at the top of a task created per request, whose context
+    is private to it, so no reset is needed.
+    """
+    _sink.set(sink)
+
+
+def current_sink() -> Optional[EventSink]:
+    """The sink events emitted in the current context go to, if any."""
+    return _sink.get()
+
+
+def emit(event: Dict[str, Any]):
+    """Send an event to the current sink, if any."""
+    sink = _sink.get()
+    if sink is not None:
+        sink(event)
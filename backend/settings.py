@@ -2,9 +2,12 @@
 
 import json
 import os
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
 from pathlib import Path
-from typing import Optional, List, Dict
-from pydantic import BaseModel
+from typing import Optional, List, Dict, Tuple, Iterator
+from pydantic import BaseModel, ConfigDict
 from .search import SearchProvider
 
 # Settings file path
@@ -68,6 +71,9 @@ from .prompts import (
 
 class Settings(BaseModel):
     """Application settings."""
+    # Instances are shared through the settings cache, so they must not be mutated
+    model_config = ConfigDict(frozen=True)
+
     search_provider: SearchProvider = SearchProvider.DUCKDUCKGO
     search_keyword_extraction: str = "direct"  # "direct" or "yake"
 
@@ -104,6 +110,69 @@ class Settings(BaseModel):
     council_temperature: float = 0.5
     chairman_temperature: float = 0.4
     stage2_temperature: float = 0.3  # Lower for consistent ranking output
+
+    # Stage 1 quorum/deadline (0 disables each check)
+    stage1_quorum: int = 0  # Proceed once this many models have answered successfully
+    stage1_deadline: float = 0.0  # Seconds before Stage 1 proceeds with whatever has arrived
+    stage1_straggler_policy: str = "cancel"  # "cancel" or "late" (keep running, record as late)
+
+    # Provider response cache (opt-in), keyed on model + messages + temperature
+    response_cache_enabled: bool = False
+    response_cache_stages: List[str] = ["stage2"]  # Any of "stage1", "stage2", "stage3"
+    response_cache_ttl: float = 3600.0  # Seconds (0 = never expire)
+    response_cache_max_entries: int = 512  # In-memory LRU size
+    response_cache_disk: bool = False  # Also persist entries under data/response_cache
+
+    # Requests/tokens per minute, keyed by provider name ("groq") or full model id
+    # ("groq:llama-3.1-8b-instant"), e.g. {"groq": {"rpm": 30, "tpm": 6000}}. 0 = unlimited.
+    rate_limits: Dict[str, Dict[str, float]] = {}
+
+    # Failover routes per logical model, highest priority first, e.g.
+    # {"openai:gpt-4o": ["openai:gpt-4o", "openrouter:openai/gpt-4o"]}
+    model_routes: Dict[str, List[str]] = {}
+
+    # Retries of transient provider errors (429/5xx, resets, timeouts)
+    retry_max_attempts: int = 3  # Total attempts per call, including the first
+    retry_budget: float = 30.0  # Seconds after the first attempt in which retries may start
+
+    # Per-model circuit breaker
+    breaker_failure_threshold: int = 3  # Consecutive failed calls that open the circuit (0 disables)
+    breaker_cooldown: float = 60.0  # Seconds before a probe request is let through
+
+    # Stage 2 strategy: "full" (every judge ranks every response) or "tournament"
+    # (each judge ranks stage2_shard_size other responses; for large councils)
+    stage2_strategy: str = "full"
+    stage2_shard_size: int = 4
+
+    # Stage 2 judge panel: only stage2_panel_size members rank (0 = all of them),
+    # picked by "fixed" (stage2_panel_models first), "round_robin", "fastest" or "agreement"
+    stage2_panel_size: int = 0
+    stage2_panel_strategy: str = "fixed"
+    stage2_panel_models: List[str] = []
+
+    # Ask judges for a JSON ranking where the provider can enforce a schema
+    # (OpenAI, Groq, DeepSeek, Gemini, Ollama); others use the FINAL RANKING text format
+    stage2_structured_output: bool = True
+
+    # Prompt budgeting: trim Stage 2/3 prompt sections to fit each model's context window
+    prompt_budget_enabled: bool = True
+    prompt_budget_output_reserve: int = 2048  # Tokens left free for the model's answer
+    prompt_budget_default_context: int = 0  # Context length assumed for models the catalog doesn't know (0 = don't trim)
+
+    # Connection warmup: open provider/search connections at startup, keep them alive while in use
+    connection_warmup_enabled: bool = True
+    keepalive_interval: float = 60.0  # Seconds between keepalive pings (below the pools' 90s expiry; 0 = off)
+    keepalive_idle_timeout: float = 1800.0  # Stop pinging after this long without a council turn
+
+    # Adaptive timeouts: each call's timeout follows the model's recent latency
+    adaptive_timeout_enabled: bool = True
+    timeout_floor: float = 15.0  # Never time out sooner than this (seconds)
+    timeout_ceiling: float = 300.0  # Never wait longer; also used until a model has history
+
+    # Hedged requests: duplicate a call still unanswered at the model's latency quantile
+    hedge_enabled: bool = False
+    hedge_quantile: float = 0.9  # Latency quantile (of recent calls) that triggers a hedge
+    hedge_max_extra_load: float = 0.1  # Hedges may add at most this fraction of extra requests
     
     # Remote/Local filters
     council_member_filters: Optional[Dict[int, str]] = None
@@ -122,7 +191,25 @@ class Settings(BaseModel):
     execution_mode: str = "full"  # Default execution mode: 'chat_only', 'chat_ranking', 'full'
 
 
-def get_settings() -> Settings:
+# Process-wide cache of the parsed settings file, keyed by its (mtime, size)
+_cache_lock = threading.Lock()
+_cached_settings: Optional[Settings] = None
+_cached_signature: Optional[Tuple[int, int]] = None
+
+# Settings pinned for the current council run (see settings_snapshot)
+_snapshot: ContextVar[Optional[Settings]] = ContextVar("settings_snapshot", default=None)
+
+
+def _file_signature() -> Optional[Tuple[int, int]]:
+    """Cheap change detector for the settings file (None if it doesn't exist)."""
+    try:
+        stat = SETTINGS_FILE.stat()
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def _load_settings() -> Settings:
     """Load settings from file, or return defaults."""
     if SETTINGS_FILE.exists():
         try:
@@ -134,14 +221,63 @@ def get_settings() -> Settings:
     return Settings()
 
 
+def get_settings() -> Settings:
+    """
+    Get the current settings.
+
+    Inside a settings_snapshot() block this returns the pinned snapshot. Otherwise
+    it returns a cached copy that is reloaded only when the file changes on disk.
+    """
+    snapshot = _snapshot.get()
+    if snapshot is not None:
+        return snapshot
+
+    global _cached_settings, _cached_signature
+    signature = _file_signature()
+    with _cache_lock:
+        if _cached_settings is not None and signature == _cached_signature:
+            return _cached_settings
+
+    settings = _load_settings()
+    with _cache_lock:
+        _cached_settings = settings
+        _cached_signature = signature
+    return settings
+
+
+@contextmanager
+def settings_snapshot(settings: Optional[Settings] = None) -> Iterator[Settings]:
+    """
+    Pin one immutable Settings instance for the duration of a council run.
+
+    Every get_settings() call in this context (including asyncio tasks created
+    inside it) sees the same snapshot, so a settings change mid-run cannot mix
+    configurations across stages.
+    """
+    token = _snapshot.set(settings or get_settings())
+    try:
+        yield _snapshot.get()
+    finally:
+        try:
+            _snapshot.reset(token)
+        except ValueError:
+            # Async generators may be finalized from a different context
+            pass
+
+
 def save_settings(settings: Settings) -> None:
     """Save settings to file."""
+    global _cached_settings, _cached_signature
     # Ensure data directory exists
     SETTINGS_FILE.parent.mkdir(parents=True, exist_ok=True)
 
     with open(SETTINGS_FILE, "w") as f:
         json.dump(settings.model_dump(), f, indent=2)
 
+    with _cache_lock:
+        _cached_settings = settings
+        _cached_signature = _file_signature()
+
 
 def update_settings(**kwargs) -> Settings:
     """Update specific settings and save."""
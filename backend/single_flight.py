@@ -0,0 +1,127 @@
+"""Single-flight coalescing: concurrent identical requests share one in-flight call.
+
+The shared call runs in the context of the caller that started it, so its
+settings snapshot and limiter attribution are that caller's. Callers that must
+not share those (e.g. different conversations) have to use different keys.
+Run events the call emits are forwarded to every waiting caller's event sink.
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from .run_events import EventSink, current_sink, set_event_sink
+
+logger = logging.getLogger(__name__)
+
+# Callback receiving streamed deltas: on_token(kind, delta)
+TokenCallback = Callable[[str, str], None]
+
+
+class _Flight:
+    """One shared in-flight call and the callers waiting on it."""
+
+    def __init__(self, streaming: bool):
+        self.streaming = streaming
+        self.task: Optional[asyncio.Task] = None
+        self.waiters = 0
+        self.callbacks: List[TokenCallback] = []
+        # Deltas seen so far, replayed to callers that join mid-stream
+        self.deltas: List[Tuple[str, str]] = []
+        # Event sinks of the callers still waiting
+        self.sinks: List[EventSink] = []
+
+    def fan_out(self, kind: str, delta: str):
+        self.deltas.append((kind, delta))
+        for callback in list(self.callbacks):
+            try:
+                callback(kind, delta)
+            except Exception as e:
+                logger.warning(f"Token callback failed: {e}")
+
+    def emit(self, event: Dict[str, Any]):
+        for sink in list(self.sinks):
+            try:
+                sink(event)
+            except Exception as e:
+                logger.warning(f"Event sink failed: {e}")
+
+    async def run(self, call: Callable[[Optional[TokenCallback]], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        # Runs as the shared task, whose context is its own copy
+        set_event_sink(self.emit)
+        return await call(self.fan_out if self.streaming else None)
+
+
+_flights: Dict[str, _Flight] = {}
+
+
+def in_flight() -> int:
+    """Number of distinct calls currently in flight."""
+    return len(_flights)
+
+
+async def run(
+    key: str,
+    call: Callable[[Optional[TokenCallback]], Awaitable[Dict[str, Any]]],
+    on_token: Optional[TokenCallback] = None
+) -> Dict[str, Any]:
+    """
+    Run call(on_token) once per key, sharing the result with every concurrent caller.
+
+    The shared call runs in its own task. Cancelling one caller only detaches it;
+    the call is cancelled when its last caller goes away. Streaming callers that
+    join late first receive the deltas already produced; a streaming caller that
+    joins a non-streaming call gets the final content as one delta. Run events
+    the call emits reach the event sinks of all callers waiting at the time.
+
+    Args:
+        key: Identity of the request, including whatever context the call
+            depends on (callers with equal keys are coalesced)
+        call: Starts the request; receives a token callback when streaming
+        on_token: This caller's token callback, if it wants streamed deltas
+
+    Returns:
+        A copy of the shared result dict
+    """
+    flight = _flights.get(key)
+    if flight is None:
+        flight = _Flight(streaming=on_token is not None)
+        flight.task = asyncio.create_task(flight.run(call))
+        _flights[key] = flight
+
+        def _forget(_task, flight=flight):
+            if _flights.get(key) is flight:
+                del _flights[key]
+
+        flight.task.add_done_callback(_forget)
+    elif on_token is not None and flight.streaming:
+        for kind, delta in flight.deltas:
+            on_token(kind, delta)
+
+    if on_token is not None and flight.streaming:
+        flight.callbacks.append(on_token)
+    sink = current_sink()
+    if sink is not None:
+        flight.sinks.append(sink)
+    flight.waiters += 1
+
+    try:
+        result = await asyncio.shield(flight.task)
+    except asyncio.CancelledError:
+        if flight.waiters == 1 and not flight.task.done():
+            flight.task.cancel()
+        raise
+    finally:
+        flight.waiters -= 1
+        if on_token in flight.callbacks:
+            flight.callbacks.remove(on_token)
+        if sink in flight.sinks:
+            flight.sinks.remove(sink)
+
+    if on_token is not None and not flight.streaming and not result.get("error"):
+        if result.get("reasoning"):
+            on_token("reasoning", result["reasoning"])
+        if result.get("content"):
+            on_token("content", result["content"])
+
+    return dict(result)
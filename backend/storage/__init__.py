@@ -0,0 +1,23 @@
+"""
+Conversation storage.
+
+The engine is selected by STORAGE_BACKEND in config: "sqlite" (default, a WAL-mode
+database) or "json" (one JSON file per conversation). Both expose the same functions.
+"""
+
+from ..config import STORAGE_BACKEND
+
+if STORAGE_BACKEND == "json":
+    from . import json_store as _engine
+else:
+    from . import sqlite_store as _engine
+
+create_conversation = _engine.create_conversation
+get_conversation = _engine.get_conversation
+save_conversation = _engine.save_conversation
+list_conversations = _engine.list_conversations
+add_user_message = _engine.add_user_message
+add_assistant_message = _engine.add_assistant_message
+add_error_message = _engine.add_error_message
+update_conversation_title = _engine.update_conversation_title
+delete_conversation = _engine.delete_conversation
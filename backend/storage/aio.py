@@ -0,0 +1,73 @@
+"""
+Async facade over the storage engine.
+
+Same functions as backend.storage, but each call runs on the bounded I/O
+thread pool so disk access never blocks the event loop (and with it every
+other SSE stream in the process).
+"""
+
+from typing import List, Dict, Any, Optional
+
+from . import (
+    create_conversation as _create_conversation,
+    get_conversation as _get_conversation,
+    save_conversation as _save_conversation,
+    list_conversations as _list_conversations,
+    add_user_message as _add_user_message,
+    add_assistant_message as _add_assistant_message,
+    add_error_message as _add_error_message,
+    update_conversation_title as _update_conversation_title,
+    delete_conversation as _delete_conversation,
+)
+from ..io_pool import run_blocking
+
+
+async def create_conversation(conversation_id: str) -> Dict[str, Any]:
+    """Create a new conversation."""
+    return await run_blocking(_create_conversation, conversation_id)
+
+
+async def get_conversation(conversation_id: str) -> Optional[Dict[str, Any]]:
+    """Load a conversation, or None if not found."""
+    return await run_blocking(_get_conversation, conversation_id)
+
+
+async def save_conversation(conversation: Dict[str, Any]):
+    """Save a whole conversation."""
+    await run_blocking(_save_conversation, conversation)
+
+
+async def list_conversations(limit: Optional[int] = None, offset: int = 0) -> List[Dict[str, Any]]:
+    """List conversations (metadata only), newest first."""
+    return await run_blocking(_list_conversations, limit=limit, offset=offset)
+
+
+async def add_user_message(conversation_id: str, content: str):
+    """Add a user message to a conversation."""
+    await run_blocking(_add_user_message, conversation_id, content)
+
+
+async def add_assistant_message(
+    conversation_id: str,
+    stage1: List[Dict[str, Any]],
+    stage2: Optional[List[Dict[str, Any]]] = None,
+    stage3: Optional[Dict[str, Any]] = None,
+    metadata: Optional[Dict[str, Any]] = None
+):
+    """Add an assistant message to a conversation."""
+    await run_blocking(_add_assistant_message, conversation_id, stage1, stage2, stage3, metadata)
+
+
+async def add_error_message(conversation_id: str, error_text: str):
+    """Add an error message to a conversation."""
+    await run_blocking(_add_error_message, conversation_id, error_text)
+
+
+async def update_conversation_title(conversation_id: str, title: str):
+    """Update the title of a conversation."""
+    await run_blocking(_update_conversation_title, conversation_id, title)
+
+
+async def delete_conversation(conversation_id: str) -> bool:
+    """Delete a conversation. Returns False if not found."""
+    return await run_blocking(_delete_conversation, conversation_id)
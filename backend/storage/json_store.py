@@ -0,0 +1,611 @@
+"""JSON-based storage for conversations.
+
+Each conversation is an append-only JSONL log (<id>.jsonl). Every write is one
+record appended to the end of the file:
+
+    {"op": "create", "id": ..., "created_at": ..., "title": ...}
+    {"op": "message", "message": {...}}
+    {"op": "title", "title": ...}
+
+Reading replays the log. A torn last line (crash mid-write) is ignored, and
+the log is compacted (rewritten atomically as create + messages) once enough
+superseded records pile up. Older <id>.json files are still read and are
+converted to a log on their next write.
+
+The listing index is kept in memory and written out in batches (see
+INDEX_FLUSH_DELAY), so an append costs the same however many conversations
+there are.
+"""
+
+import atexit
+import json
+import os
+import threading
+import logging
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Tuple
+from pathlib import Path
+from ..atomic_io import atomic_write, atomic_write_json
+from ..config import DATA_DIR
+
+logger = logging.getLogger(__name__)
+
+# Metadata index (id, created_at, title, message_count per conversation) so
+# listing conversations reads one small file instead of every conversation.
+# Files starting with "_" are storage internals, not conversations.
+INDEX_FILENAME = "_index.json"
+INDEX_VERSION = 2
+
+# Seconds index changes are batched for before the index file is rewritten.
+# The index records each conversation file's size, so files that changed after
+# the last write (e.g. a crash before the flush) are re-read when it is loaded.
+INDEX_FLUSH_DELAY = 2.0
+
+LOG_SUFFIX = ".jsonl"
+LEGACY_SUFFIX = ".json"
+
+# Compact a log once it holds this many records that a compacted log would not
+# (title changes, torn lines)
+COMPACT_THRESHOLD = 20
+
+# Lock order: _log_lock before _index_lock
+_index_lock = threading.RLock()
+# Serializes appends/compaction so a compaction never drops a concurrent append
+_log_lock = threading.RLock()
+
+# In-memory index: entries and file sizes by conversation id, and the index
+# file they were loaded from (None until first use)
+_index: Optional[Dict[str, Dict[str, Any]]] = None
+_index_sizes: Dict[str, int] = {}
+_index_path: Optional[str] = None
+# Pending batched write of the index file
+_index_flush: Optional[threading.Timer] = None
+
+
+def ensure_data_dir():
+    """Ensure the data directory exists."""
+    Path(DATA_DIR).mkdir(parents=True, exist_ok=True)
+
+
+def get_conversation_path(conversation_id: str) -> str:
+    """Get the log file path for a conversation."""
+    return os.path.join(DATA_DIR, f"{conversation_id}{LOG_SUFFIX}")
+
+
+def get_legacy_path(conversation_id: str) -> str:
+    """Get the pre-log single-JSON file path for a conversation."""
+    return os.path.join(DATA_DIR, f"{conversation_id}{LEGACY_SUFFIX}")
+
+
+def get_index_path() -> str:
+    """Get the file path for the metadata index."""
+    return os.path.join(DATA_DIR, INDEX_FILENAME)
+
+
+def _conversation_metadata(conversation: Dict[str, Any]) -> Dict[str, Any]:
+    """Extract the listing metadata for a conversation."""
+    return {
+        "id": conversation["id"],
+        "created_at": conversation["created_at"],
+        "title": conversation.get("title", "New Conversation"),
+        "message_count": len(conversation.get("messages", []))
+    }
+
+
+def _is_conversation_file(filename: str) -> bool:
+    if filename.startswith(('_', '.')):
+        return False
+    return filename.endswith(LOG_SUFFIX) or filename.endswith(LEGACY_SUFFIX)
+
+
+def _file_size(conversation_id: str) -> Optional[int]:
+    """Size of the file a conversation is read from (its log, else its legacy file)."""
+    for path in (get_conversation_path(conversation_id), get_legacy_path(conversation_id)):
+        try:
+            return os.path.getsize(path)
+        except OSError:
+            continue
+    return None
+
+
+def _replay(path: str) -> Tuple[Optional[Dict[str, Any]], int]:
+    """
+    Rebuild a conversation from its log.
+
+    Returns:
+        (conversation or None if the log has no create record, number of
+        records a compacted log would not contain)
+    """
+    conversation = None
+    superseded = 0
+
+    with open(path, 'r') as f:
+        lines = f.readlines()
+
+    for line_number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            # Only the last line can be torn by a crash; anything else is corruption
+            level = logging.INFO if line_number == len(lines) else logging.WARNING
+            logger.log(level, f"Skipping unreadable record {path}:{line_number}")
+            superseded += 1
+            continue
+
+        op = record.get("op")
+        if op == "create":
+            conversation = {
+                "id": record["id"],
+                "created_at": record["created_at"],
+                "title": record.get("title", "New Conversation"),
+                "messages": []
+            }
+        elif conversation is None:
+            superseded += 1
+        elif op == "message":
+            conversation["messages"].append(record["message"])
+        elif op == "title":
+            conversation["title"] = record["title"]
+            superseded += 1
+        else:
+            logger.warning(f"Unknown record type {op!r} in {path}:{line_number}")
+            superseded += 1
+
+    return conversation, superseded
+
+
+def read_conversation_file(path: str) -> Optional[Dict[str, Any]]:
+    """
+    Read a conversation from a log (.jsonl) or legacy (.json) file.
+
+    Args:
+        path: Path to the conversation file
+
+    Returns:
+        Conversation dict or None if the file holds no conversation
+    """
+    if path.endswith(LOG_SUFFIX):
+        return _replay(path)[0]
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def _write_log(conversation: Dict[str, Any]):
+    """Write a compacted log for a conversation and drop any legacy file."""
+    def write(f):
+        f.write(json.dumps({
+            "op": "create",
+            "id": conversation["id"],
+            "created_at": conversation["created_at"],
+            "title": conversation.get("title", "New Conversation")
+        }) + "\n")
+        for message in conversation.get("messages", []):
+            f.write(json.dumps({"op": "message", "message": message}) + "\n")
+
+    atomic_write(get_conversation_path(conversation["id"]), write)
+
+    legacy_path = get_legacy_path(conversation["id"])
+    if os.path.exists(legacy_path):
+        os.remove(legacy_path)
+
+    # The entry is unchanged, but its recorded size must follow the new file
+    with _index_lock:
+        if conversation["id"] in _load_index():
+            _index_sizes[conversation["id"]] = _file_size(conversation["id"])
+            _schedule_index_write()
+
+
+def _append_record(conversation_id: str, record: Dict[str, Any]):
+    """
+    Append one record to a conversation's log and apply it to the index.
+
+    Raises:
+        ValueError: If the conversation does not exist
+    """
+    with _log_lock:
+        path = get_conversation_path(conversation_id)
+        if not os.path.exists(path):
+            # Convert a legacy conversation to a log on its first write
+            legacy_path = get_legacy_path(conversation_id)
+            if not os.path.exists(legacy_path):
+                raise ValueError(f"Conversation {conversation_id} not found")
+            with open(legacy_path, 'r') as f:
+                _write_log(json.load(f))
+
+        line = json.dumps(record).encode() + b"\n"
+        with open(path, 'ab+') as f:
+            # Terminate a torn last line so this record starts on its own line
+            end = f.seek(0, os.SEEK_END)
+            if end > 0:
+                f.seek(end - 1)
+                if f.read(1) != b"\n":
+                    line = b"\n" + line
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+
+        if record["op"] == "message":
+            _touch_index(conversation_id, added_messages=1)
+        elif record["op"] == "title":
+            _touch_index(conversation_id, title=record["title"])
+
+
+def compact_conversation(conversation_id: str) -> bool:
+    """
+    Rewrite a conversation's log as just its create and message records.
+
+    Args:
+        conversation_id: Conversation identifier
+
+    Returns:
+        True if compacted, False if not found
+    """
+    with _log_lock:
+        conversation = get_conversation(conversation_id)
+        if conversation is None:
+            return False
+        _write_log(conversation)
+        return True
+
+
+def _scan(entries: Dict[str, Dict[str, Any]], sizes: Dict[str, int]) -> bool:
+    """
+    Bring index entries in line with the conversation files on disk.
+
+    Only files that are new or whose size differs from the recorded one are read.
+
+    Returns:
+        True if any entry changed
+    """
+    ensure_data_dir()
+    paths = {}
+    # Sorted so a .jsonl log wins over a leftover legacy .json of the same id
+    for filename in sorted(os.listdir(DATA_DIR)):
+        if _is_conversation_file(filename):
+            paths[filename.rsplit('.', 1)[0]] = os.path.join(DATA_DIR, filename)
+
+    changed = False
+    for conversation_id in set(entries) - set(paths):
+        entries.pop(conversation_id)
+        sizes.pop(conversation_id, None)
+        changed = True
+
+    for conversation_id, path in paths.items():
+        try:
+            size = os.path.getsize(path)
+            if conversation_id in entries and sizes.get(conversation_id) == size:
+                continue
+            data = read_conversation_file(path)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Skipping unreadable conversation file {path}: {e}")
+            continue
+        changed = True
+        if data is None:
+            entries.pop(conversation_id, None)
+            sizes.pop(conversation_id, None)
+        else:
+            entries[data["id"]] = _conversation_metadata(data)
+            sizes[data["id"]] = size
+    return changed
+
+
+def _write_index():
+    """Write the in-memory index to its file now."""
+    global _index_flush
+    with _index_lock:
+        if _index_flush is not None:
+            _index_flush.cancel()
+            _index_flush = None
+        if _index is None:
+            return
+        atomic_write_json(
+            _index_path,
+            {"version": INDEX_VERSION, "conversations": _index, "sizes": _index_sizes},
+            indent=None
+        )
+
+
+def _schedule_index_write():
+    """Write the index file once INDEX_FLUSH_DELAY has passed (batching changes until then)."""
+    global _index_flush
+    with _index_lock:
+        if _index_flush is None:
+            _index_flush = threading.Timer(INDEX_FLUSH_DELAY, flush_index)
+            _index_flush.daemon = True
+            _index_flush.start()
+
+
+def flush_index():
+    """Write pending index changes to disk now (also runs at exit)."""
+    with _index_lock:
+        if _index_flush is not None:
+            _write_index()
+
+
+atexit.register(flush_index)
+
+
+def rebuild_index() -> Dict[str, Dict[str, Any]]:
+    """
+    Rebuild the metadata index by reading every conversation file.
+
+    Returns:
+        The rebuilt index entries, keyed by conversation id
+    """
+    global _index, _index_sizes, _index_path
+    with _index_lock:
+        flush_index()
+        entries: Dict[str, Dict[str, Any]] = {}
+        sizes: Dict[str, int] = {}
+        _scan(entries, sizes)
+        _index, _index_sizes, _index_path = entries, sizes, get_index_path()
+        _write_index()
+        return entries
+
+
+def _load_index() -> Dict[str, Dict[str, Any]]:
+    """
+    The in-memory index entries, loaded on first use.
+
+    The index file is checked against the conversation files when loaded and
+    rebuilt if it is missing or unreadable.
+    """
+    global _index, _index_sizes, _index_path
+    with _index_lock:
+        path = get_index_path()
+        if _index is not None and _index_path == path:
+            return _index
+        # The data directory changed: finish writing the old index first
+        flush_index()
+
+        try:
+            with open(path, 'r') as f:
+                index = json.load(f)
+            if index.get("version") == INDEX_VERSION:
+                entries, sizes = index["conversations"], index["sizes"]
+                changed = _scan(entries, sizes)
+                _index, _index_sizes, _index_path = entries, sizes, path
+                if changed:
+                    _schedule_index_write()
+                return _index
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError, AttributeError) as e:
+            logger.warning(f"Conversation index unreadable, rebuilding: {e}")
+        return rebuild_index()
+
+
+def _update_index(conversation_id: str, metadata: Optional[Dict[str, Any]]):
+    """Set (or with metadata=None, remove) one index entry; the file is written by the next flush."""
+    with _index_lock:
+        entries = _load_index()
+        if metadata is None:
+            entries.pop(conversation_id, None)
+            _index_sizes.pop(conversation_id, None)
+        else:
+            entries[conversation_id] = metadata
+            _index_sizes[conversation_id] = _file_size(conversation_id)
+        _schedule_index_write()
+
+
+def _touch_index(conversation_id: str, added_messages: int = 0, title: Optional[str] = None):
+    """Apply an append to the index entry without reading the conversation (call under _log_lock)."""
+    with _index_lock:
+        entry = _load_index().get(conversation_id)
+        if entry is not None:
+            entry = dict(entry)
+            entry["message_count"] += added_messages
+            if title is not None:
+                entry["title"] = title
+    if entry is None:
+        conversation = get_conversation(conversation_id)
+        if conversation is None:
+            return
+        entry = _conversation_metadata(conversation)
+    _update_index(conversation_id, entry)
+
+
+def create_conversation(conversation_id: str) -> Dict[str, Any]:
+    """
+    Create a new conversation.
+
+    Args:
+        conversation_id: Unique identifier for the conversation
+
+    Returns:
+        New conversation dict
+    """
+    ensure_data_dir()
+
+    conversation = {
+        "id": conversation_id,
+        "created_at": datetime.utcnow().isoformat(),
+        "title": "New Conversation",
+        "messages": []
+    }
+
+    save_conversation(conversation)
+
+    return conversation
+
+
+def get_conversation(conversation_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Load a conversation from storage.
+
+    Args:
+        conversation_id: Unique identifier for the conversation
+
+    Returns:
+        Conversation dict or None if not found
+    """
+    path = get_conversation_path(conversation_id)
+
+    if not os.path.exists(path):
+        legacy_path = get_legacy_path(conversation_id)
+        if not os.path.exists(legacy_path):
+            return None
+        with open(legacy_path, 'r') as f:
+            return json.load(f)
+
+    conversation, superseded = _replay(path)
+    if conversation is not None and superseded >= COMPACT_THRESHOLD:
+        with _log_lock:
+            # Replay again under the lock: an append may have landed since the first read
+            conversation, superseded = _replay(path)
+            if conversation is not None and superseded >= COMPACT_THRESHOLD:
+                _write_log(conversation)
+    return conversation
+
+
+def save_conversation(conversation: Dict[str, Any]):
+    """
+    Save a conversation to storage, replacing its log with a compacted one.
+
+    Args:
+        conversation: Conversation dict to save
+    """
+    ensure_data_dir()
+
+    with _log_lock:
+        _write_log(conversation)
+        _update_index(conversation['id'], _conversation_metadata(conversation))
+
+
+def list_conversations(limit: Optional[int] = None, offset: int = 0) -> List[Dict[str, Any]]:
+    """
+    List conversations (metadata only), newest first.
+
+    Reads the metadata index rather than the conversation files.
+
+    Args:
+        limit: Maximum number of conversations to return (None for all)
+        offset: Number of conversations to skip
+
+    Returns:
+        List of conversation metadata dicts
+    """
+    ensure_data_dir()
+
+    with _index_lock:
+        conversations = [dict(entry) for entry in _load_index().values()]
+
+    # Sort by creation time, newest first
+    conversations.sort(key=lambda x: x["created_at"], reverse=True)
+
+    if limit is None:
+        return conversations[offset:]
+    return conversations[offset:offset + limit]
+
+
+def add_user_message(conversation_id: str, content: str):
+    """
+    Add a user message to a conversation.
+
+    Args:
+        conversation_id: Conversation identifier
+        content: User message content
+    """
+    _append_record(conversation_id, {
+        "op": "message",
+        "message": {
+            "role": "user",
+            "content": content
+        }
+    })
+
+
+def add_assistant_message(
+    conversation_id: str,
+    stage1: List[Dict[str, Any]],
+    stage2: Optional[List[Dict[str, Any]]] = None,
+    stage3: Optional[Dict[str,Any]] = None,
+    metadata: Optional[Dict[str, Any]] = None
+):
+    """
+    Add an assistant message to a conversation.
+
+    Supports partial execution modes where stage2 and/or stage3 may be None.
+
+    Args:
+        conversation_id: Conversation identifier
+        stage1: List of individual model responses (always present)
+        stage2: List of model rankings (None if execution_mode was 'chat_only')
+        stage3: Final synthesized response (None if execution_mode was not 'full')
+        metadata: Optional metadata including execution_mode, label_to_model, etc.
+    """
+    message = {
+        "role": "assistant",
+        "stage1": stage1,
+    }
+
+    # Only include stage2 and stage3 if they were executed
+    if stage2 is not None:
+        message["stage2"] = stage2
+    if stage3 is not None:
+        message["stage3"] = stage3
+
+    if metadata:
+        message["metadata"] = metadata
+
+    _append_record(conversation_id, {"op": "message", "message": message})
+
+
+def add_error_message(conversation_id: str, error_text: str):
+    """
+    Add an error message to a conversation to record a failed turn.
+
+    Args:
+        conversation_id: Conversation identifier
+        error_text: The error description
+    """
+    message = {
+        "role": "assistant",
+        "content": None,
+        "error": error_text,
+        "stage1": [],
+        "stage2": [],
+        "stage3": None
+    }
+
+    _append_record(conversation_id, {"op": "message", "message": message})
+
+
+def update_conversation_title(conversation_id: str, title: str):
+    """
+    Update the title of a conversation.
+
+    Args:
+        conversation_id: Conversation identifier
+        title: New title for the conversation
+    """
+    _append_record(conversation_id, {"op": "title", "title": title})
+
+
+def delete_conversation(conversation_id: str) -> bool:
+    """
+    Delete a conversation.
+
+    Args:
+        conversation_id: Conversation identifier
+
+    Returns:
+        True if deleted, False if not found
+    """
+    deleted = False
+    with _log_lock:
+        for path in (get_conversation_path(conversation_id), get_legacy_path(conversation_id)):
+            if os.path.exists(path):
+                os.remove(path)
+                deleted = True
+        if deleted:
+            _update_index(conversation_id, None)
+    return deleted
+
+
+if __name__ == "__main__":
+    # Rebuild the index after editing conversation files by hand:
+    # python -m backend.storage.json_store
+    print(f"Indexed {len(rebuild_index())} conversation(s) in {get_index_path()}")
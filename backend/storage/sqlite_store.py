@@ -0,0 +1,450 @@
+"""SQLite-based storage for conversations (WAL mode)."""
+
+import json
+import os
+import sqlite3
+import threading
+import logging
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+from pathlib import Path
+from ..config import DATA_DIR, DATABASE_PATH
+from . import json_store
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS conversations (
+    id TEXT PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    title TEXT NOT NULL DEFAULT 'New Conversation',
+    message_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_conversations_created_at ON conversations(created_at);
+
+CREATE TABLE IF NOT EXISTS messages (
+    conversation_id TEXT NOT NULL REFERENCES conversations(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    kind TEXT NOT NULL,         -- 'user', 'assistant' or 'error'
+    content TEXT,               -- user message text
+    error TEXT,                 -- error text for failed turns
+    metadata TEXT,              -- JSON metadata for assistant messages
+    PRIMARY KEY (conversation_id, position)
+);
+
+CREATE TABLE IF NOT EXISTS stage_results (
+    conversation_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    stage INTEGER NOT NULL,     -- 1, 2 or 3
+    data TEXT NOT NULL,         -- JSON (list for stages 1/2, object for stage 3)
+    PRIMARY KEY (conversation_id, position, stage),
+    FOREIGN KEY (conversation_id, position)
+        REFERENCES messages(conversation_id, position) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# One connection per thread; sqlite3 connections must not be shared across threads
+_local = threading.local()
+_init_lock = threading.Lock()
+_initialized = False
+
+
+def _connect() -> sqlite3.Connection:
+    """Open a connection with the pragmas every engine connection needs."""
+    Path(DATABASE_PATH).parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(DATABASE_PATH, timeout=30.0, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA foreign_keys=ON")
+    return conn
+
+
+def get_connection() -> sqlite3.Connection:
+    """Get this thread's connection, creating the schema on first use."""
+    global _initialized
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = _connect()
+        _local.conn = conn
+
+    if not _initialized:
+        with _init_lock:
+            if not _initialized:
+                conn.executescript(SCHEMA)
+                # Only mark initialized once the import has committed, so a failed one is retried
+                _import_json_once(conn)
+                _initialized = True
+    return conn
+
+
+class _transaction:
+    """BEGIN IMMEDIATE ... COMMIT/ROLLBACK around a block (serializes writers)."""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def __enter__(self) -> sqlite3.Connection:
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.conn.execute("COMMIT")
+        else:
+            self.conn.execute("ROLLBACK")
+        return False
+
+
+def _append_message(
+    conn: sqlite3.Connection,
+    conversation_id: str,
+    kind: str,
+    content: Optional[str] = None,
+    error: Optional[str] = None,
+    metadata: Optional[Dict[str, Any]] = None,
+    stages: Optional[Dict[int, Any]] = None
+):
+    """Append one message (and its stage results) at the end of a conversation."""
+    row = conn.execute(
+        "SELECT message_count FROM conversations WHERE id = ?", (conversation_id,)
+    ).fetchone()
+    if row is None:
+        raise ValueError(f"Conversation {conversation_id} not found")
+
+    position = row["message_count"]
+    conn.execute(
+        "INSERT INTO messages (conversation_id, position, kind, content, error, metadata) VALUES (?, ?, ?, ?, ?, ?)",
+        (conversation_id, position, kind, content, error, json.dumps(metadata) if metadata else None)
+    )
+    for stage, data in (stages or {}).items():
+        conn.execute(
+            "INSERT INTO stage_results (conversation_id, position, stage, data) VALUES (?, ?, ?, ?)",
+            (conversation_id, position, stage, json.dumps(data))
+        )
+    conn.execute(
+        "UPDATE conversations SET message_count = message_count + 1 WHERE id = ?", (conversation_id,)
+    )
+
+
+def _insert_message_dict(conn: sqlite3.Connection, conversation_id: str, message: Dict[str, Any]):
+    """Append a message given in the JSON storage format."""
+    if message.get("role") == "user":
+        _append_message(conn, conversation_id, "user", content=message.get("content"))
+    elif message.get("error") is not None:
+        _append_message(conn, conversation_id, "error", error=message["error"])
+    else:
+        stages = {1: message.get("stage1", [])}
+        if "stage2" in message:
+            stages[2] = message["stage2"]
+        if "stage3" in message:
+            stages[3] = message["stage3"]
+        _append_message(
+            conn, conversation_id, "assistant",
+            metadata=message.get("metadata"),
+            stages=stages
+        )
+
+
+def _build_message(row: sqlite3.Row, stages: Dict[int, Any]) -> Dict[str, Any]:
+    """Rebuild a message dict in the same shape the JSON storage uses."""
+    if row["kind"] == "user":
+        return {"role": "user", "content": row["content"]}
+
+    if row["kind"] == "error":
+        return {
+            "role": "assistant",
+            "content": None,
+            "error": row["error"],
+            "stage1": [],
+            "stage2": [],
+            "stage3": None
+        }
+
+    message = {"role": "assistant", "stage1": stages.get(1, [])}
+    if 2 in stages:
+        message["stage2"] = stages[2]
+    if 3 in stages:
+        message["stage3"] = stages[3]
+    if row["metadata"]:
+        message["metadata"] = json.loads(row["metadata"])
+    return message
+
+
+def create_conversation(conversation_id: str) -> Dict[str, Any]:
+    """
+    Create a new conversation.
+
+    Args:
+        conversation_id: Unique identifier for the conversation
+
+    Returns:
+        New conversation dict
+    """
+    conversation = {
+        "id": conversation_id,
+        "created_at": datetime.utcnow().isoformat(),
+        "title": "New Conversation",
+        "messages": []
+    }
+
+    conn = get_connection()
+    with _transaction(conn):
+        conn.execute(
+            "INSERT INTO conversations (id, created_at, title, message_count) VALUES (?, ?, ?, 0)",
+            (conversation["id"], conversation["created_at"], conversation["title"])
+        )
+
+    return conversation
+
+
+def get_conversation(conversation_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Load a conversation from storage.
+
+    Args:
+        conversation_id: Unique identifier for the conversation
+
+    Returns:
+        Conversation dict or None if not found
+    """
+    conn = get_connection()
+    row = conn.execute(
+        "SELECT id, created_at, title FROM conversations WHERE id = ?", (conversation_id,)
+    ).fetchone()
+    if row is None:
+        return None
+
+    stages: Dict[int, Dict[int, Any]] = {}
+    for stage_row in conn.execute(
+        "SELECT position, stage, data FROM stage_results WHERE conversation_id = ?", (conversation_id,)
+    ):
+        stages.setdefault(stage_row["position"], {})[stage_row["stage"]] = json.loads(stage_row["data"])
+
+    messages = [
+        _build_message(message_row, stages.get(message_row["position"], {}))
+        for message_row in conn.execute(
+            "SELECT position, kind, content, error, metadata FROM messages WHERE conversation_id = ? ORDER BY position",
+            (conversation_id,)
+        )
+    ]
+
+    return {
+        "id": row["id"],
+        "created_at": row["created_at"],
+        "title": row["title"],
+        "messages": messages
+    }
+
+
+def save_conversation(conversation: Dict[str, Any]):
+    """
+    Save a conversation to storage, replacing any existing copy.
+
+    Args:
+        conversation: Conversation dict to save
+    """
+    conn = get_connection()
+    with _transaction(conn):
+        conn.execute("DELETE FROM conversations WHERE id = ?", (conversation["id"],))
+        conn.execute(
+            "INSERT INTO conversations (id, created_at, title, message_count) VALUES (?, ?, ?, 0)",
+            (conversation["id"], conversation["created_at"], conversation.get("title", "New Conversation"))
+        )
+        for message in conversation.get("messages", []):
+            _insert_message_dict(conn, conversation["id"], message)
+
+
+def list_conversations(limit: Optional[int] = None, offset: int = 0) -> List[Dict[str, Any]]:
+    """
+    List conversations (metadata only), newest first.
+
+    Args:
+        limit: Maximum number of conversations to return (None for all)
+        offset: Number of conversations to skip
+
+    Returns:
+        List of conversation metadata dicts
+    """
+    conn = get_connection()
+    rows = conn.execute(
+        "SELECT id, created_at, title, message_count FROM conversations ORDER BY created_at DESC LIMIT ? OFFSET ?",
+        (-1 if limit is None else limit, offset)
+    ).fetchall()
+    return [dict(row) for row in rows]
+
+
+def add_user_message(conversation_id: str, content: str):
+    """
+    Add a user message to a conversation.
+
+    Args:
+        conversation_id: Conversation identifier
+        content: User message content
+    """
+    conn = get_connection()
+    with _transaction(conn):
+        _append_message(conn, conversation_id, "user", content=content)
+
+
+def add_assistant_message(
+    conversation_id: str,
+    stage1: List[Dict[str, Any]],
+    stage2: Optional[List[Dict[str, Any]]] = None,
+    stage3: Optional[Dict[str,Any]] = None,
+    metadata: Optional[Dict[str, Any]] = None
+):
+    """
+    Add an assistant message to a conversation.
+
+    Supports partial execution modes where stage2 and/or stage3 may be None.
+
+    Args:
+        conversation_id: Conversation identifier
+        stage1: List of individual model responses (always present)
+        stage2: List of model rankings (None if execution_mode was 'chat_only')
+        stage3: Final synthesized response (None if execution_mode was not 'full')
+        metadata: Optional metadata including execution_mode, label_to_model, etc.
+    """
+    stages = {1: stage1}
+    # Only include stage2 and stage3 if they were executed
+    if stage2 is not None:
+        stages[2] = stage2
+    if stage3 is not None:
+        stages[3] = stage3
+
+    conn = get_connection()
+    with _transaction(conn):
+        _append_message(conn, conversation_id, "assistant", metadata=metadata, stages=stages)
+
+
+def add_error_message(conversation_id: str, error_text: str):
+    """
+    Add an error message to a conversation to record a failed turn.
+
+    Args:
+        conversation_id: Conversation identifier
+        error_text: The error description
+    """
+    conn = get_connection()
+    with _transaction(conn):
+        _append_message(conn, conversation_id, "error", error=error_text)
+
+
+def update_conversation_title(conversation_id: str, title: str):
+    """
+    Update the title of a conversation.
+
+    Args:
+        conversation_id: Conversation identifier
+        title: New title for the conversation
+    """
+    conn = get_connection()
+    with _transaction(conn):
+        cursor = conn.execute("UPDATE conversations SET title = ? WHERE id = ?", (title, conversation_id))
+        if cursor.rowcount == 0:
+            raise ValueError(f"Conversation {conversation_id} not found")
+
+
+def delete_conversation(conversation_id: str) -> bool:
+    """
+    Delete a conversation.
+
+    Args:
+        conversation_id: Conversation identifier
+
+    Returns:
+        True if deleted, False if not found
+    """
+    conn = get_connection()
+    with _transaction(conn):
+        cursor = conn.execute("DELETE FROM conversations WHERE id = ?", (conversation_id,))
+    return cursor.rowcount > 0
+
+
+def import_json_conversations(json_dir: str = DATA_DIR) -> int:
+    """
+    Import conversations from the JSON file storage (.jsonl logs or legacy
+    .json files) into the database.
+
+    Conversations that already exist in the database are skipped, so this is
+    safe to run more than once.
+
+    Args:
+        json_dir: Directory containing the conversation files
+
+    Returns:
+        Number of conversations imported
+    """
+    conn = get_connection()
+    imported = 0
+    for data in _read_json_conversations(json_dir):
+        with _transaction(conn):
+            imported += _import_conversation(conn, data)
+    return imported
+
+
+def _read_json_conversations(json_dir: str):
+    """Yield the conversations stored in a JSON storage directory, skipping unreadable files."""
+    if not os.path.isdir(json_dir):
+        return
+
+    for filename in sorted(os.listdir(json_dir)):
+        if not json_store._is_conversation_file(filename):
+            continue
+        path = os.path.join(json_dir, filename)
+        try:
+            data = json_store.read_conversation_file(path)
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Skipping unreadable conversation file {path}: {e}")
+            continue
+        if data is not None:
+            yield data
+
+
+def _import_conversation(conn: sqlite3.Connection, data: Dict[str, Any]) -> bool:
+    """Insert a conversation unless it already exists (call inside a transaction)."""
+    exists = conn.execute("SELECT 1 FROM conversations WHERE id = ?", (data["id"],)).fetchone()
+    if exists:
+        return False
+
+    conn.execute(
+        "INSERT INTO conversations (id, created_at, title, message_count) VALUES (?, ?, ?, 0)",
+        (data["id"], data["created_at"], data.get("title", "New Conversation"))
+    )
+    for message in data.get("messages", []):
+        _insert_message_dict(conn, data["id"], message)
+    return True
+
+
+def _import_json_once(conn: sqlite3.Connection):
+    """
+    Import legacy JSON conversations the first time the database is opened.
+
+    The import and its completion marker commit in one transaction: a failed
+    import leaves nothing behind and is tried again on the next connection.
+    """
+    with _transaction(conn):
+        done = conn.execute("SELECT value FROM meta WHERE key = 'json_import_done'").fetchone()
+        if done:
+            return
+
+        imported = sum(_import_conversation(conn, data) for data in _read_json_conversations(DATA_DIR))
+        conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('json_import_done', ?)",
+            (datetime.utcnow().isoformat(),)
+        )
+    if imported:
+        logger.info(f"Imported {imported} conversation(s) from {DATA_DIR} into {DATABASE_PATH}")
+
+
+if __name__ == "__main__":
+    # One-shot import: python -m backend.storage.sqlite_store [json_dir]
+    import sys
+    count = import_json_conversations(sys.argv[1] if len(sys.argv) > 1 else DATA_DIR)
+    print(f"Imported {count} conversation(s) into {DATABASE_PATH}")
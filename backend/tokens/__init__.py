@@ -0,0 +1,24 @@
+"""Token counting for prompts: rate-limit accounting, prompt budgeting, cost estimates.
+
+    from backend.tokens import count_tokens, count_messages
+    count_messages(messages, "openrouter:anthropic/claude-3.5-sonnet")
+
+Models are mapped to a tokenizer family (openai, anthropic, gemini, llama,
+mistral, generic). OpenAI models are counted exactly when `tiktoken` is
+installed (pip install tiktoken); everything else uses a fast heuristic.
+`python -m backend.tokens.benchmark` measures speed and accuracy.
+"""
+
+from .families import FAMILIES, family_for
+from .counter import count_tokens, count_messages, get_cache_stats, clear_cache
+from .bpe import TIKTOKEN_AVAILABLE
+
+__all__ = [
+    "FAMILIES",
+    "family_for",
+    "count_tokens",
+    "count_messages",
+    "get_cache_stats",
+    "clear_cache",
+    "TIKTOKEN_AVAILABLE",
+]
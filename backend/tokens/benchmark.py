@@ -0,0 +1,226 @@
+"""Speed and accuracy benchmark for the token estimators.
+
+    python -m backend.tokens.benchmark [--references counts.json] [--fit]
+
+Speed is measured on every run. Accuracy is measured against reference counts
+of SAMPLES from real tokenizers. reference_counts.json ships with the package:
+- openai: tiktoken o200k_base
+- anthropic: the Claude tokenizer.json bundled with anthropic-sdk-python 0.25
+  (the last one Anthropic published; Claude 3+ counts run a little higher)
+- llama: the Llama 3 tokenizer.model from llama-models
+- mistral: tekken_240911.json from mistral-common (Nemo, Large 2 and later)
+There is no offline Gemini tokenizer, so the gemini family has no reference.
+
+Other references override the shipped ones:
+- OpenAI: `tiktoken`, if installed
+- Any family: a HuggingFace tokenizer.json named by TOKENS_REFERENCE_<FAMILY>
+  (e.g. TOKENS_REFERENCE_LLAMA=~/models/llama-3/tokenizer.json; needs `tokenizers`)
+- Any family: --references, a JSON file {family: {sample: count}} of counts
+  obtained elsewhere (e.g. Anthropic's count_tokens endpoint)
+
+The accuracy table lists each sample's reference and estimated counts. --fit
+searches the family parameters that minimise the worst per-sample error; the
+values in families.py come from it.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from . import bpe
+from .counter import clear_cache, count_tokens
+from .families import FAMILIES, FamilyParams
+from .heuristic import estimate
+
+# Reference counts of SAMPLES shipped with the package (see the module docstring)
+REFERENCE_COUNTS_PATH = os.path.join(os.path.dirname(__file__), "reference_counts.json")
+
+_PROSE = (
+    "The council gathers several language models, asks each the same question, "
+    "and has them review one another anonymously before a chairman writes the final "
+    "answer. Disagreements are surfaced rather than averaged away, which makes the "
+    "result easier to trust and to audit. "
+)
+_CODE = '''def calculate_aggregate_rankings(stage2_results, label_to_model):
+    """Average each model's position across all rankings."""
+    positions = defaultdict(list)
+    for ranking in stage2_results:
+        for position, label in enumerate(ranking["parsed_ranking"], start=1):
+            if label in label_to_model:
+                positions[label_to_model[label]].append(position)
+    return sorted(
+        ({"model": m, "average_rank": round(sum(p) / len(p), 2)} for m, p in positions.items()),
+        key=lambda x: x["average_rank"],
+    )
+'''
+_JSON = json.dumps({
+    "id": "gen-1724512345-abcdef", "model": "anthropic/claude-3.5-sonnet",
+    "choices": [{"index": 0, "message": {"role": "assistant", "content": "Hello!"}, "finish_reason": "stop"}],
+    "usage": {"prompt_tokens": 1234, "completion_tokens": 56, "total_tokens": 1290},
+}, indent=2)
+_NUMBERS = "Q3 revenue was $12,345,678.90, up 17.5% from 10,522,004.12; EBITDA margin 23.41% (2024-09-30)."
+_CJK = "大型语言模型委员会会分别回答同一个问题，然后匿名互评，最后由主席模型综合出最终答案。"
+_MARKDOWN = (
+    "## Ranking\n\n| Response | Accuracy | Insight |\n|---|---|---|\n| A | 9/10 | High |\n"
+    "| B | 7/10 | Medium |\n\n**FINAL RANKING:**\n1. Response A\n2. Response C\n3. Response B\n"
+)
+
+SAMPLES: Dict[str, str] = {
+    "prose": _PROSE * 4,
+    "code": _CODE,
+    "json": _JSON,
+    "numbers": _NUMBERS,
+    "cjk": _CJK,
+    "markdown": _MARKDOWN,
+    # A Stage 2 style prompt: several answers embedded verbatim
+    "stage2_prompt": "\n\n".join(f"Response {c}:\n{_PROSE * 3}\n{_CODE}" for c in "ABCDEFGH"),
+}
+
+
+def load_reference_counts(path: str = REFERENCE_COUNTS_PATH) -> Dict[str, Dict[str, int]]:
+    """Known counts as {family: {sample name: count}}."""
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def relative_errors(params: FamilyParams, counts: Dict[str, int]) -> Dict[str, float]:
+    """Per-sample (estimate - reference) / reference."""
+    return {name: estimate(SAMPLES[name], params) / count - 1 for name, count in counts.items() if name in SAMPLES}
+
+
+def fit_family(base: FamilyParams, counts: Dict[str, int]) -> Tuple[FamilyParams, float]:
+    """
+    Search word/CJK costs and scale for the smallest worst-case relative error.
+
+    Args:
+        base: Current parameters (digit grouping and message overhead are kept)
+        counts: Reference counts by sample name
+
+    Returns:
+        (fitted parameters, worst absolute relative error over the samples)
+    """
+    best: Optional[Tuple[float, FamilyParams]] = None
+    for word_single, word_chars, cjk_per_char in itertools.product(
+        range(5, 12), (2.0, 3.0, 4.0, 5.0), [x / 10 for x in range(5, 13)]
+    ):
+        params = base._replace(word_single=word_single, word_chars=word_chars, cjk_per_char=cjk_per_char, scale=1.0)
+        ratios = [error + 1 for error in relative_errors(params, counts).values()]
+        # The scale that centres the ratios minimises the worst error for these costs
+        error = (max(ratios) - min(ratios)) / (max(ratios) + min(ratios))
+        if best is None or error < best[0]:
+            best = (error, params._replace(scale=round(2 / (max(ratios) + min(ratios)), 2)))
+    params = best[1]
+    return params, max(abs(e) for e in relative_errors(params, counts).values())
+
+
+def _reference_counters(references_path: Optional[str]) -> Dict[str, Callable[[str, str], Optional[int]]]:
+    """family -> counter(sample_name, text) returning a reference count or None."""
+    counters: Dict[str, Callable[[str, str], Optional[int]]] = {}
+
+    explicit = load_reference_counts(references_path) if references_path else {}
+    for family, counts in {**load_reference_counts(), **explicit}.items():
+        counters[family] = lambda name, text, counts=counts: counts.get(name)
+
+    if bpe.TIKTOKEN_AVAILABLE and "openai" not in explicit:
+        encoding = bpe._encoding("o200k_base")
+        if encoding is not None:
+            counters["openai"] = lambda name, text: len(encoding.encode(text, disallowed_special=()))
+
+    for family in FAMILIES:
+        path = os.environ.get(f"TOKENS_REFERENCE_{family.upper()}")
+        if not path or family in explicit:
+            continue
+        try:
+            from tokenizers import Tokenizer
+        except ImportError:
+            print(f"TOKENS_REFERENCE_{family.upper()} is set but `tokenizers` is not installed")
+            continue
+        tokenizer = Tokenizer.from_file(os.path.expanduser(path))
+        counters[family] = lambda name, text, t=tokenizer: len(t.encode(text, add_special_tokens=False).ids)
+
+    return counters
+
+
+def benchmark_speed(rounds: int = 20) -> List[str]:
+    lines = ["## Speed", "", "| Sample | Chars | Heuristic (us) | Cached (us) | MB/s |", "|---|---:|---:|---:|---:|"]
+    params = FAMILIES["generic"]
+    for name, text in SAMPLES.items():
+        started = time.perf_counter()
+        for _ in range(rounds):
+            estimate(text, params)
+        heuristic_us = (time.perf_counter() - started) / rounds * 1e6
+
+        clear_cache()
+        count_tokens(text, "generic")
+        started = time.perf_counter()
+        for _ in range(rounds):
+            count_tokens(text, "generic")
+        cached_us = (time.perf_counter() - started) / rounds * 1e6
+
+        mb_per_s = len(text.encode("utf-8")) / (heuristic_us / 1e6) / 1e6
+        lines.append(f"| {name} | {len(text)} | {heuristic_us:.0f} | {cached_us:.1f} | {mb_per_s:.1f} |")
+    return lines
+
+
+def benchmark_accuracy(references_path: Optional[str]) -> List[str]:
+    counters = _reference_counters(references_path)
+    lines = ["## Accuracy", ""]
+    if not counters:
+        lines.append("No reference tokenizer available (install tiktoken, set TOKENS_REFERENCE_<FAMILY>, or pass --references).")
+        return lines
+
+    lines += ["| Family | Sample | Reference | Estimate | Error |", "|---|---|---:|---:|---:|"]
+    for family, counter in counters.items():
+        params = FAMILIES.get(family)
+        if params is None:
+            continue
+        total_reference = total_estimate = 0
+        for name, text in SAMPLES.items():
+            reference = counter(name, text)
+            if not reference:
+                continue
+            guess = estimate(text, params)
+            total_reference += reference
+            total_estimate += guess
+            lines.append(f"| {family} | {name} | {reference} | {guess} | {(guess - reference) / reference:+.1%} |")
+        if total_estimate:
+            lines.append(f"| {family} | **total** | {total_reference} | {total_estimate} | "
+                         f"{(total_estimate - total_reference) / total_reference:+.1%} |")
+    return lines
+
+
+def benchmark_fit(references_path: Optional[str]) -> List[str]:
+    explicit = load_reference_counts(references_path) if references_path else {}
+    lines = ["## Fitted parameters", ""]
+    for family, counts in {**load_reference_counts(), **explicit}.items():
+        if family not in FAMILIES:
+            continue
+        params, worst = fit_family(FAMILIES[family], counts)
+        lines.append(f'"{family}": {params!r},  # worst error {worst:.1%}')
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--references", help="JSON file of known counts: {family: {sample: count}}")
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--dump-samples", action="store_true", help="Print the samples as JSON (to count them elsewhere)")
+    parser.add_argument("--fit", action="store_true", help="Fit the family parameters to the reference counts")
+    args = parser.parse_args()
+
+    if args.dump_samples:
+        print(json.dumps(SAMPLES, indent=2, ensure_ascii=False))
+        return
+    if args.fit:
+        print("\n".join(benchmark_fit(args.references)))
+        return
+    print("\n".join(benchmark_speed(args.rounds)))
+    print()
+    print("\n".join(benchmark_accuracy(args.references)))
+
+
+if __name__ == "__main__":
+    main()
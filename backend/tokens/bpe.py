@@ -0,0 +1,49 @@
+"""Exact counts from a real BPE when the optional `tiktoken` package is installed.
+
+Only OpenAI's encodings are public; other families always use the heuristic.
+tiktoken fetches an encoding's vocabulary on first use (then caches it under
+TIKTOKEN_CACHE_DIR); if that fails the estimate falls back to the heuristic.
+"""
+
+import logging
+import re
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    tiktoken = None
+    TIKTOKEN_AVAILABLE = False
+
+# Older models use cl100k_base; everything from gpt-4o on uses o200k_base
+_CL100K_MODELS = re.compile(r"gpt-4(?!o|\.\d)|gpt-3\.5")
+
+# Encoding name -> encoding, or None if it could not be loaded
+_encodings: Dict[str, Optional[Any]] = {}
+
+
+def _encoding(name: str) -> Optional[Any]:
+    if name not in _encodings:
+        try:
+            _encodings[name] = tiktoken.get_encoding(name)
+        except Exception as e:
+            logger.warning(f"tiktoken encoding {name} unavailable, using estimates: {e}")
+            _encodings[name] = None
+    return _encodings[name]
+
+
+def encoding_name(model: str) -> str:
+    return "cl100k_base" if _CL100K_MODELS.search(model.lower()) else "o200k_base"
+
+
+def count(text: str, family: str, model: str) -> Optional[int]:
+    """Exact token count, or None when no BPE is available for this family."""
+    if not TIKTOKEN_AVAILABLE or family != "openai":
+        return None
+    encoding = _encoding(encoding_name(model))
+    if encoding is None:
+        return None
+    return len(encoding.encode(text, disallowed_special=()))
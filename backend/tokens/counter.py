@@ -0,0 +1,76 @@
+"""Token counting with a content-hash cache."""
+
+import hashlib
+from collections import OrderedDict
+from typing import Any, Dict, List, Tuple
+
+from . import bpe
+from .families import FAMILIES, family_for
+from .heuristic import estimate
+
+# Texts shorter than this are cheaper to count than to hash
+CACHE_MIN_CHARS = 256
+CACHE_MAX_ENTRIES = 4096
+# Reply priming added once per request (OpenAI's chat format; close enough for others)
+REPLY_PRIMING_TOKENS = 3
+
+# (family/encoding, blake2b digest) -> token count
+_cache: "OrderedDict[Tuple[str, bytes], int]" = OrderedDict()
+_stats = {"hits": 0, "misses": 0}
+
+
+def _count(text: str, family: str, model: str) -> int:
+    exact = bpe.count(text, family, model)
+    if exact is not None:
+        return exact
+    return estimate(text, FAMILIES[family])
+
+
+def count_tokens(text: str, model: str = "") -> int:
+    """
+    Token count of text for a model: exact for OpenAI models when tiktoken is
+    installed, otherwise the family heuristic.
+
+    Args:
+        text: Text to count
+        model: Model id (any provider prefix); unknown models get a conservative estimate
+
+    Returns:
+        Token count
+    """
+    if not text:
+        return 0
+    family = family_for(model)
+    if len(text) < CACHE_MIN_CHARS:
+        return _count(text, family, model)
+
+    # OpenAI models may use different encodings; other families share parameters
+    cache_family = f"{family}:{bpe.encoding_name(model)}" if family == "openai" else family
+    key = (cache_family, hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest())
+    tokens = _cache.get(key)
+    if tokens is not None:
+        _cache.move_to_end(key)
+        _stats["hits"] += 1
+        return tokens
+
+    _stats["misses"] += 1
+    tokens = _count(text, family, model)
+    _cache[key] = tokens
+    if len(_cache) > CACHE_MAX_ENTRIES:
+        _cache.popitem(last=False)
+    return tokens
+
+
+def count_messages(messages: List[Dict[str, Any]], model: str = "") -> int:
+    """Prompt tokens of a chat request: message contents plus per-message overhead."""
+    overhead = FAMILIES[family_for(model)].message_overhead
+    return sum(count_tokens(str(m.get("content") or ""), model) + overhead for m in messages) + REPLY_PRIMING_TOKENS
+
+
+def get_cache_stats() -> Dict[str, int]:
+    return {"entries": len(_cache), **_stats}
+
+
+def clear_cache():
+    _cache.clear()
+    _stats["hits"] = _stats["misses"] = 0
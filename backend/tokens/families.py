@@ -0,0 +1,72 @@
+"""Tokenizer families and the parameters of their heuristic estimates."""
+
+import re
+from typing import Dict, NamedTuple
+
+
+class FamilyParams(NamedTuple):
+    # Letters a word (with its leading space) can have and still be one token
+    word_single: int
+    # Letters per additional token in longer words
+    word_chars: float
+    # Digits merged into one token (SentencePiece vocabularies split every digit)
+    digit_group: int
+    # Tokens per character of CJK and other non-Latin scripts
+    cjk_per_char: float
+    # Tokens per message for role markers and separators
+    message_overhead: int
+    # Correction factor applied to the whole estimate
+    scale: float
+
+
+# Fit with `python -m backend.tokens.benchmark --fit` against reference_counts.json;
+# the worst per-sample error over those samples is noted per family. Gemini has
+# no offline tokenizer to fit against: it takes the fitted word costs with
+# SentencePiece digit splitting and a margin on top.
+FAMILIES: Dict[str, FamilyParams] = {
+    # Worst error 10.7%
+    "openai": FamilyParams(word_single=9, word_chars=2.0, digit_group=3, cjk_per_char=0.6, message_overhead=4, scale=1.02),
+    # Worst error 3.5%
+    "anthropic": FamilyParams(word_single=8, word_chars=5.0, digit_group=3, cjk_per_char=0.9, message_overhead=5, scale=1.07),
+    # Not fitted
+    "gemini": FamilyParams(word_single=9, word_chars=3.0, digit_group=1, cjk_per_char=0.7, message_overhead=5, scale=1.05),
+    # Worst error 11.6%
+    "llama": FamilyParams(word_single=9, word_chars=2.0, digit_group=3, cjk_per_char=0.6, message_overhead=5, scale=1.03),
+    # Worst error 10.3%
+    "mistral": FamilyParams(word_single=9, word_chars=2.0, digit_group=1, cjk_per_char=0.8, message_overhead=4, scale=1.06),
+    # Unknown models: err on the high side (never below any reference count above)
+    "generic": FamilyParams(word_single=8, word_chars=3.0, digit_group=1, cjk_per_char=1.0, message_overhead=5, scale=1.15),
+}
+
+# Checked in order against the model id with its provider prefix removed
+_FAMILY_PATTERNS = [
+    ("anthropic", re.compile(r"claude|anthropic")),
+    ("gemini", re.compile(r"gemini|gemma|google/")),
+    ("llama", re.compile(r"llama|meta-llama")),
+    ("mistral", re.compile(r"mistral|mixtral|codestral|ministral|pixtral|magistral|devstral")),
+    ("openai", re.compile(r"gpt|\bo[1-9]\b|\bo[1-9]-|openai/|chatgpt")),
+]
+
+# Provider prefixes that pin the family regardless of the model name
+_PROVIDER_FAMILIES = {
+    "openai": "openai",
+    "anthropic": "anthropic",
+    "google": "gemini",
+    "mistral": "mistral",
+}
+
+
+def family_for(model: str) -> str:
+    """Tokenizer family of a model id (e.g. 'openrouter:anthropic/claude-3.5-sonnet' -> 'anthropic')."""
+    if not model:
+        return "generic"
+    model = model.lower()
+    provider, _, name = model.partition(":")
+    if not name:
+        provider, name = "", model
+    if provider in _PROVIDER_FAMILIES:
+        return _PROVIDER_FAMILIES[provider]
+    for family, pattern in _FAMILY_PATTERNS:
+        if pattern.search(name):
+            return family
+    return "generic"
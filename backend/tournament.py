@@ -0,0 +1,102 @@
+"""Sharded ("tournament") Stage 2 for large councils.
+
+Instead of every judge ranking every response (O(N^2) prompt tokens), each
+judge ranks a shard of k responses. Shards come from a cyclic incomplete
+block design: judge i gets the responses at fixed, evenly spread offsets
+from its own, so every response is ranked by exactly k judges, pairs of
+responses meet about equally often, no judge ranks its own answer, and every
+two responses are linked by a chain of comparisons.
+
+Partial rankings are merged into a global order with a Bradley-Terry model
+fitted to the pairwise outcomes they imply.
+"""
+
+import math
+from collections import defaultdict
+from typing import Dict, List, Sequence
+
+# Minorization-maximization iterations for Bradley-Terry (converges quickly at council sizes)
+BT_ITERATIONS = 100
+# Virtual wins/losses against an average opponent, so unbeaten responses keep a finite strength
+BT_PRIOR = 0.5
+
+
+def response_label(index: int) -> str:
+    """Spreadsheet-style label for the index-th response: A..Z, AA..AZ, BA..."""
+    letters = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def assign_shards(count: int, shard_size: int) -> List[List[int]]:
+    """
+    Response indices each judge ranks (judge i wrote response i).
+
+    Args:
+        count: Number of responses (= number of judges)
+        shard_size: Responses per judge; must be below count
+
+    Returns:
+        One sorted index list per judge
+    """
+    # Offsets 1..count-1 spread evenly; 0 would be the judge's own response
+    step = count / (shard_size + 1)
+    offsets = sorted({max(1, min(count - 1, round(step * (i + 1)))) for i in range(shard_size)})
+    # Rounding can collide for small counts; top up with the nearest unused offsets
+    candidate = 1
+    while len(offsets) < shard_size:
+        if candidate not in offsets:
+            offsets.append(candidate)
+        candidate += 1
+    # A shard compares responses that are (offset difference) apart, so if all
+    # differences share a factor with count, the responses split into groups
+    # that are never compared. Move the last offset to the nearest one that
+    # differs from the first by a step coprime to count.
+    offsets.sort()
+    if len(offsets) > 1 and math.gcd(count, *(o - offsets[0] for o in offsets[1:])) > 1:
+        offsets[-1] = min(
+            (o for o in range(1, count) if o not in offsets and math.gcd(count, o - offsets[0]) == 1),
+            key=lambda o: abs(o - offsets[-1])
+        )
+    return [sorted((judge + offset) % count for offset in offsets) for judge in range(count)]
+
+
+def merge_rankings(rankings: Sequence[Sequence[str]], items: Sequence[str]) -> Dict[str, float]:
+    """
+    Bradley-Terry strengths from partial rankings.
+
+    Args:
+        rankings: Each a best-to-worst list of labels (any subset of items)
+        items: All labels
+
+    Returns:
+        label -> strength (higher is better; strengths average to 1)
+    """
+    wins: Dict[str, float] = defaultdict(float)
+    # games[(a, b)] with a < b: times a and b were ranked by the same judge
+    games: Dict[tuple, float] = defaultdict(float)
+    for ranking in rankings:
+        for i, winner in enumerate(ranking):
+            for loser in ranking[i + 1:]:
+                wins[winner] += 1
+                games[tuple(sorted((winner, loser)))] += 1
+
+    opponents: Dict[str, List[tuple]] = defaultdict(list)
+    for (a, b), n in games.items():
+        opponents[a].append((b, n))
+        opponents[b].append((a, n))
+
+    strength = {item: 1.0 for item in items}
+    for _ in range(BT_ITERATIONS):
+        updated = {}
+        for item in items:
+            # The prior is one virtual game (half won) against a strength-1 opponent
+            denominator = 2 * BT_PRIOR / (strength[item] + 1.0)
+            denominator += sum(n / (strength[item] + strength[other]) for other, n in opponents[item])
+            updated[item] = (wins[item] + BT_PRIOR) / denominator
+        mean = sum(updated.values()) / len(updated)
+        strength = {item: value / mean for item, value in updated.items()}
+    return strength
@@ -0,0 +1,197 @@
+"""Connection prewarming and keepalive for provider and search hosts.
+
+The first council turn after startup (or after the pools went idle) would
+otherwise pay DNS, TCP and TLS setup to every provider it touches. warm_up()
+opens pooled connections to each enabled provider ahead of time by sending
+a cheap HEAD request; the keepalive loop repeats that often enough that idle
+connections never reach the pools' keepalive expiry. After a long idle
+period the loop stops pinging and the next council turn warms up again.
+"""
+
+import asyncio
+import logging
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from .config import OPENROUTER_API_URL
+from .http_client import HTTP2_AVAILABLE, LOCAL_PROVIDERS, PROVIDER_LIMITS, DEFAULT_LIMITS, get_client
+from .search import SearchProvider, get_async_client, get_sync_client
+from .settings import Settings, get_settings
+from .io_pool import run_blocking
+
+logger = logging.getLogger(__name__)
+
+# Timeout for a single warmup request
+WARMUP_TIMEOUT = 10.0
+
+# Direct providers and their API hosts
+DIRECT_PROVIDERS = ("openai", "anthropic", "google", "mistral", "deepseek")
+
+JINA_READER_URL = "https://r.jina.ai/"
+SEARCH_URLS = {
+    SearchProvider.TAVILY: "https://api.tavily.com/",
+    SearchProvider.BRAVE: "https://api.search.brave.com/",
+}
+
+
+class Target(NamedTuple):
+    name: str
+    url: str
+    # Connections to open (concurrent requests each get their own HTTP/1.1 connection)
+    connections: int
+    # Async client to ping with, or None for the sync search client
+    client: Optional[Any]
+
+
+_status: Dict[str, Any] = {
+    "state": "idle",  # idle, warming, warm, partial (some hosts failed), failed or disabled
+    "last_warmup": None,
+    "last_keepalive": None,
+    "targets": {},
+}
+_last_activity = time.monotonic()
+_warming: Optional[asyncio.Task] = None
+
+
+def _enabled_providers(settings: Settings) -> List[str]:
+    enabled = settings.enabled_providers
+    toggles = settings.direct_provider_toggles
+    providers = [name for name in ("openrouter", "ollama", "custom") if enabled.get(name)]
+    if enabled.get("groq") or (enabled.get("direct") and toggles.get("groq")):
+        providers.append("groq")
+    if enabled.get("direct"):
+        providers.extend(name for name in DIRECT_PROVIDERS if toggles.get(name))
+    return providers
+
+
+def _connections_needed(provider: str, model_counts: Counter) -> int:
+    """One connection per council model on the provider, within its keepalive pool."""
+    if HTTP2_AVAILABLE and provider not in LOCAL_PROVIDERS:
+        # A single HTTP/2 connection multiplexes all requests
+        return 1
+    limits = PROVIDER_LIMITS.get(provider, DEFAULT_LIMITS)
+    return max(1, min(model_counts.get(provider, 1), limits.max_keepalive_connections or 1))
+
+
+def get_targets(settings: Settings, providers: Dict[str, Any], provider_of: Callable[[str], str]) -> List[Target]:
+    """
+    Hosts to keep warm for the current settings.
+
+    Args:
+        settings: Current settings
+        providers: Provider name -> provider instance (council.PROVIDERS)
+        provider_of: Maps a model id to its provider name
+    """
+    models = list(settings.council_models) + [settings.chairman_model]
+    model_counts = Counter(provider_of(m) for m in models if m)
+
+    targets = []
+    for name in _enabled_providers(settings):
+        if name == "openrouter":
+            url = OPENROUTER_API_URL
+        elif name == "ollama":
+            url = settings.ollama_base_url
+        elif name == "custom":
+            url = settings.custom_endpoint_url
+        else:
+            url = getattr(providers.get(name), "BASE_URL", None)
+        if not url:
+            continue
+        targets.append(Target(name, url, _connections_needed(name, model_counts), get_client(url, name)))
+
+    if settings.search_provider in SEARCH_URLS:
+        targets.append(Target(f"search:{settings.search_provider.value}", SEARCH_URLS[settings.search_provider], 1, get_async_client()))
+    # Full-content fetches go through Jina Reader (Brave uses the async client, DuckDuckGo the sync one)
+    if settings.search_provider == SearchProvider.BRAVE:
+        targets.append(Target("search:jina", JINA_READER_URL, 1, get_async_client()))
+    elif settings.search_provider == SearchProvider.DUCKDUCKGO:
+        targets.append(Target("search:jina", JINA_READER_URL, 1, None))
+    return targets
+
+
+async def _ping(target: Target) -> Dict[str, Any]:
+    """Open (or reuse) connections to a target. Any HTTP response counts as warm."""
+    started = time.monotonic()
+    try:
+        if target.client is None:
+            await run_blocking(get_sync_client().head, target.url, timeout=WARMUP_TIMEOUT)
+        else:
+            await asyncio.gather(*(
+                target.client.head(target.url, timeout=WARMUP_TIMEOUT)
+                for _ in range(target.connections)
+            ))
+        return {"ok": True, "connections": target.connections, "ms": round((time.monotonic() - started) * 1000)}
+    except Exception as e:
+        return {"ok": False, "error": str(e) or type(e).__name__}
+
+
+async def warm_up(providers: Dict[str, Any], provider_of: Callable[[str], str], keepalive: bool = False) -> Dict[str, Any]:
+    """
+    Warm every enabled provider and search host concurrently.
+
+    Args:
+        providers: Provider name -> provider instance (council.PROVIDERS)
+        provider_of: Maps a model id to its provider name
+        keepalive: Whether this is a scheduled keepalive rather than a warmup
+
+    Returns:
+        The updated warmup status
+    """
+    settings = get_settings()
+    if not settings.connection_warmup_enabled:
+        _status["state"] = "disabled"
+        return _status
+
+    targets = get_targets(settings, providers, provider_of)
+    if not keepalive:
+        _status["state"] = "warming"
+    results = await asyncio.gather(*(_ping(t) for t in targets))
+    _status["targets"] = {t.name: result for t, result in zip(targets, results)}
+    _status["last_keepalive" if keepalive else "last_warmup"] = time.time()
+
+    failed = [t.name for t, result in zip(targets, results) if not result["ok"]]
+    if not failed:
+        _status["state"] = "warm"
+    else:
+        _status["state"] = "partial" if len(failed) < len(targets) else "failed"
+        logger.info(f"Connection warmup failed for: {', '.join(failed)}")
+    return _status
+
+
+def note_activity(providers: Dict[str, Any], provider_of: Callable[[str], str]):
+    """
+    Record a council turn. If the pools went cold in an idle period, start
+    warming them in the background (overlapping title/search work).
+    """
+    global _last_activity, _warming
+    _last_activity = time.monotonic()
+    if _status["state"] == "idle" and (_warming is None or _warming.done()):
+        _warming = asyncio.create_task(warm_up(providers, provider_of))
+
+
+async def keepalive_loop(providers: Dict[str, Any], provider_of: Callable[[str], str]):
+    """Warm up at startup, then ping on the keepalive schedule until the app has been idle too long."""
+    await warm_up(providers, provider_of)
+    while True:
+        settings = get_settings()
+        interval = settings.keepalive_interval
+        await asyncio.sleep(interval if interval > 0 else 60.0)
+        settings = get_settings()
+        if not settings.connection_warmup_enabled:
+            _status["state"] = "disabled"
+            continue
+        if settings.keepalive_interval <= 0:
+            continue
+        if time.monotonic() - _last_activity > settings.keepalive_idle_timeout:
+            if _status["state"] != "idle":
+                logger.info("No council activity; letting provider connections go idle")
+                _status["state"] = "idle"
+            continue
+        if _status["state"] not in ("idle", "warming"):
+            await warm_up(providers, provider_of, keepalive=True)
+
+
+def get_status() -> Dict[str, Any]:
+    """Warmup state, per-target results and when the last warmup/keepalive ran."""
+    return _status
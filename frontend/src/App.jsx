@@ -388,7 +388,8 @@ function App() {
                     stage1: {
                       count: 0,
                       total: event.total,
-                      currentModel: null
+                      currentModel: null,
+                      breakers: event.breakers || {}
                     }
                   }
                 };
@@ -398,13 +399,38 @@ function App() {
               });
               break;
 
+            case 'stage1_token':
+              setCurrentConversation((prev) => {
+                const messages = [...prev.messages];
+                const lastMsg = messages[messages.length - 1];
+
+                // Only answer text is shown while streaming; reasoning arrives in the final result
+                if (event.kind !== 'content') return prev;
+
+                // Append the delta to this model's in-progress response
+                const stage1 = lastMsg.stage1 ? [...lastMsg.stage1] : [];
+                const index = stage1.findIndex((r) => r.model === event.model);
+                if (index === -1) {
+                  stage1.push({ model: event.model, response: event.delta, error: null, streaming: true });
+                } else {
+                  stage1[index] = { ...stage1[index], response: (stage1[index].response || '') + event.delta };
+                }
+
+                messages[messages.length - 1] = { ...lastMsg, stage1 };
+                return { ...prev, messages };
+              });
+              break;
+
             case 'stage1_progress':
               setCurrentConversation((prev) => {
                 const messages = [...prev.messages];
                 const lastMsg = messages[messages.length - 1];
 
-                // Immutable update for stage1
-                const updatedStage1 = lastMsg.stage1 ? [...lastMsg.stage1, event.data] : [event.data];
+                // Immutable update for stage1 (replaces the model's streaming entry if present)
+                const existingStage1 = lastMsg.stage1 || [];
+                const updatedStage1 = existingStage1.some((r) => r.model === event.data.model)
+                  ? existingStage1.map((r) => (r.model === event.data.model ? event.data : r))
+                  : [...existingStage1, event.data];
                 const updatedLastMsg = {
                   ...lastMsg,
                   progress: {
@@ -448,6 +474,29 @@ function App() {
               });
               break;
 
+            case 'stage1_quorum':
+              // Stage 1 proceeded early; stragglers are reported via stage1_progress or stage1_late
+              console.log(`Stage 1 ${event.reason} reached, pending:`, event.pending);
+              break;
+
+            case 'queued':
+              // A request is waiting for its provider's RPM/TPM budget before it is sent
+              console.log(`${event.model} queued for ${event.wait}s (${event.reason} limit)`);
+              break;
+
+            case 'stage1_late':
+              setCurrentConversation((prev) => {
+                const messages = [...prev.messages];
+                const lastMsg = messages[messages.length - 1];
+
+                // Replace any partial streaming entries with the late results
+                const lateModels = new Set(event.data.map((r) => r.model));
+                const stage1 = (lastMsg.stage1 || []).filter((r) => !lateModels.has(r.model));
+                messages[messages.length - 1] = { ...lastMsg, stage1: [...stage1, ...event.data] };
+                return { ...prev, messages };
+              });
+              break;
+
             case 'stage2_start':
               setCurrentConversation((prev) => {
                 const messages = [...prev.messages];
@@ -568,6 +617,25 @@ function App() {
               });
               break;
 
+            case 'stage3_delta':
+            case 'stage3_reasoning_delta':
+              setCurrentConversation((prev) => {
+                const messages = [...prev.messages];
+                const lastMsg = messages[messages.length - 1];
+
+                // Build up the chairman's answer (and reasoning) as it streams in
+                const field = eventType === 'stage3_delta' ? 'response' : 'reasoning';
+                const stage3 = lastMsg.stage3 || { model: event.model, response: '', streaming: true };
+                const updatedLastMsg = {
+                  ...lastMsg,
+                  stage3: { ...stage3, [field]: (stage3[field] || '') + event.delta }
+                };
+
+                messages[messages.length - 1] = updatedLastMsg;
+                return { ...prev, messages };
+              });
+              break;
+
             case 'stage3_complete':
               setCurrentConversation((prev) => {
                 const messages = [...prev.messages];
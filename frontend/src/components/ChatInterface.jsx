@@ -154,7 +154,7 @@ export default function ChatInterface({
                                                     status={msg.loading?.stage1 ? 'thinking' : 'complete'}
                                                     progress={{
                                                         currentModel: msg.progress?.stage1?.currentModel,
-                                                        completed: msg.stage1?.map(r => r.model) || []
+                                                        completed: msg.stage1?.filter(r => !r.streaming).map(r => r.model) || []
                                                     }}
                                                 />
                                             </div>
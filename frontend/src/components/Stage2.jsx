@@ -9,9 +9,10 @@ function deAnonymizeText(text, labelToModel) {
 
     let result = text;
     // Replace each "Response X" with the actual model name
+    // (whole labels only, so "Response A" doesn't match inside "Response AB")
     Object.entries(labelToModel).forEach(([label, model]) => {
         const modelShortName = getShortModelName(model);
-        result = result.replace(new RegExp(label, 'g'), `**${modelShortName}**`);
+        result = result.replace(new RegExp(`${label}\\b`, 'g'), `**${modelShortName}**`);
     });
     return result;
 }
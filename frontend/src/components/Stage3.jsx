@@ -9,6 +9,13 @@ export default function Stage3({ finalResponse, startTime, endTime }) {
     }
 
     const visuals = getModelVisuals(finalResponse?.model);
+    const responseText = typeof finalResponse?.response === 'string'
+        ? finalResponse.response
+        : String(finalResponse?.response || 'No response');
+    // Reasoning is delivered separately; show it in the collapsible think block
+    const content = finalResponse?.reasoning
+        ? `<think>\n${finalResponse.reasoning}\n</think>\n\n${responseText}`
+        : responseText;
     const shortName = getShortModelName(finalResponse?.model);
 
     return (
@@ -36,13 +43,7 @@ export default function Stage3({ finalResponse, startTime, endTime }) {
                     </div>
                 </div>
                 <div className="final-text markdown-content">
-                    <ThinkBlockRenderer
-                        content={
-                            typeof finalResponse?.response === 'string'
-                                ? finalResponse.response
-                                : String(finalResponse?.response || 'No response')
-                        }
-                    />
+                    <ThinkBlockRenderer content={content} />
                 </div>
             </div>
         </div>
@@ -46,6 +46,9 @@ export default function CouncilConfig({
     setActivePromptTab
 }) {
 
+    // Council size limit enforced by the backend (MAX_COUNCIL_MODELS)
+    const maxCouncilMembers = settings?.max_council_models ?? 8;
+
     // Helper: Filter models by remote/local for specific use case
     const filterByRemoteLocal = (models, filter) => {
         if (filter === 'local') {
@@ -286,12 +289,12 @@ export default function CouncilConfig({
                         type="button"
                         className="add-member-button"
                         onClick={handleAddCouncilMember}
-                        disabled={filteredModels.length === 0 || councilModels.length >= 8}
+                        disabled={filteredModels.length === 0 || councilModels.length >= maxCouncilMembers}
                     >
                         + Add Council Member
                     </button>
                     <p className="section-description" style={{ marginTop: '8px', marginBottom: '0' }}>
-                        Max 8 members. With 6+ members, requests are processed in batches.
+                        Max {maxCouncilMembers} members. With 6+ members, requests are processed in batches.
                     </p>
                     {councilModels.length >= 6 && (
                         <div className="council-size-warning">
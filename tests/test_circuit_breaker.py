@@ -0,0 +1,153 @@
+"""Circuit breaker state transitions and failover past open circuits."""
+
+import asyncio
+import unittest
+from unittest import mock
+
+from backend import circuit_breaker, council
+from backend.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from backend.providers.base import LLMProvider
+from backend.settings import get_settings, settings_snapshot
+
+THRESHOLD = 3
+COOLDOWN = 10.0
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class BreakerTransitionTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = mock.patch.object(circuit_breaker.time, "monotonic", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.breaker = CircuitBreaker("p:m", "p")
+
+    def fail(self, times=1):
+        for _ in range(times):
+            self.breaker.record_failure("boom", THRESHOLD, COOLDOWN)
+
+    def test_opens_after_threshold_consecutive_failures(self):
+        self.fail(THRESHOLD - 1)
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.assertTrue(self.breaker.allow(COOLDOWN))
+        self.fail()
+        self.assertEqual(self.breaker.state, OPEN)
+        self.assertFalse(self.breaker.allow(COOLDOWN))
+
+    def test_success_resets_the_count(self):
+        self.fail(THRESHOLD - 1)
+        self.breaker.record_success()
+        self.fail(THRESHOLD - 1)
+        self.assertEqual(self.breaker.state, CLOSED)
+
+    def test_half_open_probe_closes_on_success(self):
+        self.fail(THRESHOLD)
+        self.clock.now += COOLDOWN
+        self.assertTrue(self.breaker.allow(COOLDOWN))
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+        # Only one probe at a time
+        self.assertFalse(self.breaker.allow(COOLDOWN))
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.assertTrue(self.breaker.allow(COOLDOWN))
+
+    def test_failed_probe_reopens_with_longer_cooldown(self):
+        self.fail(THRESHOLD)
+        self.clock.now += COOLDOWN
+        self.assertTrue(self.breaker.allow(COOLDOWN))
+        self.fail()
+        self.assertEqual(self.breaker.state, OPEN)
+        self.assertEqual(self.breaker.cooldown, COOLDOWN * 2)
+        self.clock.now += COOLDOWN
+        self.assertFalse(self.breaker.allow(COOLDOWN))
+        self.clock.now += COOLDOWN
+        self.assertTrue(self.breaker.allow(COOLDOWN))
+
+    def test_cooldown_growth_is_capped(self):
+        self.fail(THRESHOLD)
+        for _ in range(10):
+            self.clock.now += self.breaker.cooldown
+            self.assertTrue(self.breaker.allow(COOLDOWN))
+            self.fail()
+        self.assertEqual(self.breaker.cooldown, COOLDOWN * circuit_breaker.MAX_COOLDOWN_MULTIPLIER)
+
+    def test_released_probe_lets_another_through(self):
+        self.fail(THRESHOLD)
+        self.clock.now += COOLDOWN
+        self.assertTrue(self.breaker.allow(COOLDOWN))
+        self.breaker.release_probe()
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+        self.assertTrue(self.breaker.allow(COOLDOWN))
+
+
+class FakeProvider(LLMProvider):
+    def __init__(self, fail: bool):
+        self.fail = fail
+        self.calls = []
+
+    async def query(self, model, messages, timeout, temperature):
+        self.calls.append(model)
+        if self.fail:
+            return {"content": None, "error": True, "status_code": 503, "error_message": "unavailable"}
+        return {"content": f"answer from {model}", "error": False}
+
+    async def get_models(self):
+        return []
+
+    async def validate_key(self, api_key):
+        return True
+
+
+class FailoverTest(unittest.TestCase):
+    def setUp(self):
+        self.primary = FakeProvider(fail=True)
+        self.backup = FakeProvider(fail=False)
+        patcher = mock.patch.dict(council.PROVIDERS, {"primary": self.primary, "backup": self.backup})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        breakers = mock.patch.dict(circuit_breaker._breakers, clear=True)
+        breakers.start()
+        self.addCleanup(breakers.stop)
+        self.settings = get_settings().model_copy(update={
+            "model_routes": {"primary:m": ["primary:m", "backup:m"]},
+            "breaker_failure_threshold": 1,
+            "breaker_cooldown": 60.0,
+            "retry_max_attempts": 1,
+        })
+
+    def query(self):
+        async def main():
+            with settings_snapshot(self.settings):
+                return await council._query_routed("primary:m", [{"role": "user", "content": "hi"}], 5.0, 0.5, None)
+        return asyncio.run(main())
+
+    def test_fails_over_and_skips_open_circuit(self):
+        first = self.query()
+        self.assertEqual(first["route"], "backup:m")
+        self.assertEqual(first["content"], "answer from backup:m")
+        self.assertEqual(circuit_breaker.get_states(["primary:m"])["primary:m"]["state"], OPEN)
+
+        # With the primary's circuit open, it is not called at all
+        second = self.query()
+        self.assertEqual(second["route"], "backup:m")
+        self.assertEqual(self.primary.calls, ["primary:m"])
+        self.assertEqual(self.backup.calls, ["backup:m", "backup:m"])
+
+    def test_last_route_reports_open_circuit(self):
+        self.backup.fail = True
+        self.query()
+        result = self.query()
+        self.assertTrue(result["error"])
+        self.assertTrue(result.get("circuit_open"))
+        self.assertEqual(self.backup.calls, ["backup:m"])
+
+
+if __name__ == "__main__":
+    unittest.main()
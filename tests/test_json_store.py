@@ -0,0 +1,217 @@
+"""JSONL conversation logs: replay, compaction, the batched index, and concurrent access."""
+
+import json
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from backend.storage import json_store
+
+
+class JsonStoreTestCase(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.data_dir = self._tmp.name
+        patcher = mock.patch.object(json_store, "DATA_DIR", self.data_dir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self._tmp.cleanup)
+        self.addCleanup(self.drop_index)
+
+    def drop_index(self):
+        """Forget the in-memory index without writing it, as a crash would."""
+        with json_store._index_lock:
+            if json_store._index_flush is not None:
+                json_store._index_flush.cancel()
+                json_store._index_flush = None
+            json_store._index = None
+            json_store._index_sizes = {}
+            json_store._index_path = None
+
+    def log_records(self, conversation_id):
+        with open(json_store.get_conversation_path(conversation_id)) as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+
+class ReplayTest(JsonStoreTestCase):
+    def test_replay_after_appends(self):
+        json_store.create_conversation("c1")
+        json_store.add_user_message("c1", "hello")
+        json_store.add_assistant_message("c1", [{"model": "m", "response": "hi"}], stage2=[], stage3={"response": "hi"})
+        json_store.add_error_message("c1", "boom")
+        json_store.update_conversation_title("c1", "Greeting")
+
+        conversation = json_store.get_conversation("c1")
+        self.assertEqual(conversation["title"], "Greeting")
+        self.assertEqual([m["role"] for m in conversation["messages"]], ["user", "assistant", "assistant"])
+        self.assertEqual(conversation["messages"][0]["content"], "hello")
+        self.assertEqual(conversation["messages"][1]["stage3"], {"response": "hi"})
+        self.assertEqual(conversation["messages"][2]["error"], "boom")
+        # One create record, then one record per write
+        self.assertEqual([r["op"] for r in self.log_records("c1")], ["create", "message", "message", "message", "title"])
+
+    def test_torn_last_line_is_ignored(self):
+        json_store.create_conversation("c1")
+        json_store.add_user_message("c1", "first")
+        with open(json_store.get_conversation_path("c1"), "a") as f:
+            f.write('{"op": "message", "mess')
+
+        self.assertEqual(len(json_store.get_conversation("c1")["messages"]), 1)
+        json_store.add_user_message("c1", "second")
+        # The torn record is no longer last, so it is reported as corruption
+        with self.assertLogs(json_store.logger, "WARNING"):
+            contents = [m["content"] for m in json_store.get_conversation("c1")["messages"]]
+        self.assertEqual(contents, ["first", "second"])
+
+    def test_missing_conversation(self):
+        self.assertIsNone(json_store.get_conversation("nope"))
+        with self.assertRaises(ValueError):
+            json_store.add_user_message("nope", "hello")
+
+    def test_legacy_file_is_converted_on_write(self):
+        legacy = {"id": "old", "created_at": "2024-01-01T00:00:00", "title": "Old",
+                  "messages": [{"role": "user", "content": "a"}]}
+        with open(json_store.get_legacy_path("old"), "w") as f:
+            json.dump(legacy, f)
+
+        self.assertEqual(json_store.get_conversation("old"), legacy)
+        json_store.add_user_message("old", "b")
+        self.assertFalse(os.path.exists(json_store.get_legacy_path("old")))
+        self.assertEqual([m["content"] for m in json_store.get_conversation("old")["messages"]], ["a", "b"])
+
+
+class CompactionTest(JsonStoreTestCase):
+    def test_compacts_at_threshold(self):
+        json_store.create_conversation("c1")
+        json_store.add_user_message("c1", "hello")
+        for i in range(json_store.COMPACT_THRESHOLD - 1):
+            json_store.update_conversation_title("c1", f"Title {i}")
+
+        json_store.get_conversation("c1")
+        self.assertEqual(len(self.log_records("c1")), json_store.COMPACT_THRESHOLD + 1)
+
+        json_store.update_conversation_title("c1", "Final")
+        conversation = json_store.get_conversation("c1")
+        self.assertEqual(conversation["title"], "Final")
+        self.assertEqual([r["op"] for r in self.log_records("c1")], ["create", "message"])
+        self.assertEqual(self.log_records("c1")[0]["title"], "Final")
+        self.assertEqual(json_store.get_conversation("c1"), conversation)
+
+    def test_compact_conversation(self):
+        json_store.create_conversation("c1")
+        json_store.update_conversation_title("c1", "Renamed")
+        self.assertTrue(json_store.compact_conversation("c1"))
+        self.assertEqual(self.log_records("c1"), [
+            {"op": "create", "id": "c1", "created_at": self.log_records("c1")[0]["created_at"], "title": "Renamed"}
+        ])
+        self.assertFalse(json_store.compact_conversation("nope"))
+
+
+class IndexTest(JsonStoreTestCase):
+    def listing(self):
+        return {c["id"]: c for c in json_store.list_conversations()}
+
+    def test_listing_follows_writes(self):
+        json_store.create_conversation("c1")
+        json_store.create_conversation("c2")
+        json_store.add_user_message("c1", "hello")
+        json_store.update_conversation_title("c2", "Second")
+
+        listing = self.listing()
+        self.assertEqual(listing["c1"]["message_count"], 1)
+        self.assertEqual(listing["c2"]["title"], "Second")
+
+        json_store.delete_conversation("c2")
+        self.assertEqual(set(self.listing()), {"c1"})
+
+    def test_appends_do_not_rewrite_index(self):
+        json_store.create_conversation("c1")
+        json_store.flush_index()
+        index_path = json_store.get_index_path()
+        with open(index_path) as f:
+            written = f.read()
+
+        for i in range(5):
+            json_store.add_user_message("c1", f"message {i}")
+        with open(index_path) as f:
+            self.assertEqual(f.read(), written)
+
+        json_store.flush_index()
+        with open(index_path) as f:
+            self.assertEqual(json.load(f)["conversations"]["c1"]["message_count"], 5)
+
+    def test_unflushed_changes_are_recovered_on_load(self):
+        json_store.create_conversation("c1")
+        json_store.flush_index()
+        json_store.add_user_message("c1", "hello")
+        json_store.update_conversation_title("c1", "Renamed")
+        json_store.create_conversation("c2")
+        self.drop_index()
+
+        listing = self.listing()
+        self.assertEqual(set(listing), {"c1", "c2"})
+        self.assertEqual(listing["c1"]["message_count"], 1)
+        self.assertEqual(listing["c1"]["title"], "Renamed")
+
+    def test_deleted_files_leave_the_index_on_load(self):
+        json_store.create_conversation("c1")
+        json_store.flush_index()
+        os.remove(json_store.get_conversation_path("c1"))
+        self.drop_index()
+        self.assertEqual(self.listing(), {})
+
+    def test_compaction_keeps_index_in_step(self):
+        json_store.create_conversation("c1")
+        for i in range(json_store.COMPACT_THRESHOLD):
+            json_store.update_conversation_title("c1", f"Title {i}")
+        json_store.get_conversation("c1")
+        json_store.flush_index()
+
+        with mock.patch.object(json_store, "read_conversation_file", wraps=json_store.read_conversation_file) as reads:
+            self.drop_index()
+            self.assertEqual(self.listing()["c1"]["title"], f"Title {json_store.COMPACT_THRESHOLD - 1}")
+        reads.assert_not_called()
+
+
+class ConcurrencyTest(JsonStoreTestCase):
+    def test_interleaved_reads_and_writes(self):
+        json_store.create_conversation("c1")
+        writers, per_writer = 4, 25
+        errors = []
+
+        def write(n):
+            try:
+                for i in range(per_writer):
+                    json_store.add_user_message("c1", f"{n}:{i}")
+                    # Title records pile up so reads keep compacting the log
+                    json_store.update_conversation_title("c1", f"{n}:{i}")
+            except Exception as e:
+                errors.append(e)
+
+        def read():
+            try:
+                for _ in range(50):
+                    json_store.get_conversation("c1")
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=write, args=(n,)) for n in range(writers)]
+        threads += [threading.Thread(target=read) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        messages = [m["content"] for m in json_store.get_conversation("c1")["messages"]]
+        self.assertEqual(len(messages), writers * per_writer)
+        for n in range(writers):
+            # Each writer's messages are all there, in the order it wrote them
+            self.assertEqual([m for m in messages if m.startswith(f"{n}:")], [f"{n}:{i}" for i in range(per_writer)])
+        self.assertEqual(json_store.list_conversations()[0]["message_count"], writers * per_writer)
+
+
+if __name__ == "__main__":
+    unittest.main()
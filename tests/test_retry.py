@@ -0,0 +1,76 @@
+"""Retry delays parsed from rate-limit headers and capped by the retry budget."""
+
+import time
+import unittest
+from email.utils import formatdate
+
+from backend.providers.retry import RetryPolicy, retry_after_from_headers
+
+# Slack for time passing between building a header and parsing it
+TOLERANCE = 2.0
+
+
+class RetryAfterHeaderTest(unittest.TestCase):
+    def assertDelay(self, headers, expected):
+        delay = retry_after_from_headers(headers)
+        self.assertIsNotNone(delay)
+        self.assertAlmostEqual(delay, expected, delta=TOLERANCE)
+
+    def test_retry_after_ms(self):
+        self.assertAlmostEqual(retry_after_from_headers({"retry-after-ms": "1500"}), 1.5)
+
+    def test_retry_after_seconds(self):
+        self.assertEqual(retry_after_from_headers({"retry-after": "7"}), 7.0)
+
+    def test_retry_after_http_date(self):
+        self.assertDelay({"retry-after": formatdate(time.time() + 30, usegmt=True)}, 30.0)
+
+    def test_ratelimit_reset_epoch_seconds(self):
+        self.assertDelay({"x-ratelimit-reset": str(int(time.time() + 12))}, 12.0)
+
+    def test_ratelimit_reset_epoch_milliseconds(self):
+        # OpenRouter sends the reset time in epoch milliseconds
+        self.assertDelay({"x-ratelimit-reset": str(int((time.time() + 12) * 1000))}, 12.0)
+
+    def test_reset_in_the_past_is_no_wait(self):
+        self.assertEqual(retry_after_from_headers({"x-ratelimit-reset": str(int(time.time() * 1000) - 5000)}), 0.0)
+
+    def test_separate_resets_wait_for_both(self):
+        headers = {"x-ratelimit-reset-requests": "1s", "x-ratelimit-reset-tokens": "1m30s"}
+        self.assertEqual(retry_after_from_headers(headers), 90.0)
+
+
+class RetryPolicyTest(unittest.TestCase):
+    def test_server_delay_is_honoured(self):
+        policy = RetryPolicy(3, 30)
+        self.assertEqual(policy.next_delay({"error": True, "status_code": 429, "retry_after": 2.0}), 2.0)
+
+    def test_long_server_delay_is_capped_at_budget(self):
+        policy = RetryPolicy(3, 30)
+        delay = policy.next_delay({"error": True, "status_code": 429, "retry_after": 3600.0})
+        self.assertIsNotNone(delay)
+        self.assertLessEqual(delay, 29.0)
+        self.assertGreater(delay, 28.0)
+
+    def test_openrouter_reset_is_retried(self):
+        reset = str(int((time.time() + 5) * 1000))
+        retry_after = retry_after_from_headers({"x-ratelimit-reset": reset})
+        delay = RetryPolicy(3, 30).next_delay({"error": True, "status_code": 429, "retry_after": retry_after})
+        self.assertIsNotNone(delay)
+        self.assertLessEqual(delay, 5.0 + TOLERANCE)
+
+    def test_no_retry_without_budget(self):
+        policy = RetryPolicy(3, 0.5)
+        self.assertIsNone(policy.next_delay({"error": True, "status_code": 429, "retry_after": 0.1}))
+
+    def test_non_retryable_error_is_not_retried(self):
+        self.assertIsNone(RetryPolicy(3, 30).next_delay({"error": True, "status_code": 400}))
+
+    def test_attempts_are_limited(self):
+        policy = RetryPolicy(2, 30)
+        self.assertIsNotNone(policy.next_delay({"error": True, "status_code": 503}))
+        self.assertIsNone(policy.next_delay({"error": True, "status_code": 503}))
+
+
+if __name__ == "__main__":
+    unittest.main()
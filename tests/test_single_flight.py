@@ -0,0 +1,89 @@
+"""Single-flight coalescing: shared calls, event forwarding, and what is never shared."""
+
+import asyncio
+import unittest
+from unittest import mock
+
+from backend import council, single_flight
+from backend.adaptive_limiter import conversation_scope, current_conversation
+from backend.run_events import emit, set_event_sink
+from backend.settings import get_settings, settings_snapshot
+
+
+class SingleFlightTest(unittest.TestCase):
+    def test_concurrent_callers_share_one_call(self):
+        calls = []
+
+        async def call(on_token):
+            calls.append(on_token)
+            await asyncio.sleep(0.01)
+            return {"content": "answer"}
+
+        async def main():
+            return await asyncio.gather(*(single_flight.run("k", call) for _ in range(3)))
+
+        results = asyncio.run(main())
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [{"content": "answer"}] * 3)
+        self.assertEqual(single_flight.in_flight(), 0)
+
+    def test_events_reach_every_waiter(self):
+        async def main():
+            release = asyncio.Event()
+
+            async def call(on_token):
+                await release.wait()
+                emit({"type": "queued"})
+                return {"content": "answer"}
+
+            async def caller(received):
+                set_event_sink(received.append)
+                return await single_flight.run("k", call)
+
+            first, second = [], []
+            tasks = [asyncio.create_task(caller(first)), asyncio.create_task(caller(second))]
+            await asyncio.sleep(0)
+            release.set()
+            await asyncio.gather(*tasks)
+            return first, second
+
+        first, second = asyncio.run(main())
+        self.assertEqual(first, [{"type": "queued"}])
+        self.assertEqual(second, [{"type": "queued"}])
+
+
+class QueryCoalescingTest(unittest.TestCase):
+    def run_pair(self, first_scope, second_scope, second_settings=None):
+        """Issue the same query from two contexts at once; returns the conversations the calls ran for."""
+        seen = []
+
+        async def routed(*args, **kwargs):
+            seen.append(current_conversation())
+            await asyncio.sleep(0.01)
+            return {"content": "answer"}
+
+        async def caller(scope, settings):
+            with settings_snapshot(settings), conversation_scope(scope):
+                return await council._query_coalesced("key", "m", [], None, 0.5, None)
+
+        async def main():
+            settings = get_settings()
+            await asyncio.gather(caller(first_scope, settings), caller(second_scope, second_settings or settings))
+
+        with mock.patch.object(council, "_query_routed", routed):
+            asyncio.run(main())
+        return seen
+
+    def test_same_conversation_is_coalesced(self):
+        self.assertEqual(self.run_pair("c1", "c1"), ["c1"])
+
+    def test_conversations_are_not_coalesced(self):
+        self.assertEqual(sorted(self.run_pair("c1", "c2")), ["c1", "c2"])
+
+    def test_settings_snapshots_are_not_coalesced(self):
+        other = get_settings().model_copy()
+        self.assertEqual(self.run_pair("c1", "c1", other), ["c1", "c1"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,142 @@
+"""SQLite conversation storage: round trips and the one-shot JSON import."""
+
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from backend.storage import sqlite_store
+
+
+class SqliteStoreTestCase(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.json_dir = os.path.join(self._tmp.name, "conversations")
+        os.makedirs(self.json_dir)
+        for name, value in (("DATA_DIR", self.json_dir),
+                            ("DATABASE_PATH", os.path.join(self._tmp.name, "council.db"))):
+            patcher = mock.patch.object(sqlite_store, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.reopen()
+        self.addCleanup(self.reopen)
+
+    def reopen(self):
+        """Drop this thread's connection and initialization, as a process restart would."""
+        conn = getattr(sqlite_store._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            sqlite_store._local.conn = None
+        sqlite_store._initialized = False
+
+    def write_json_conversation(self, conversation_id, messages=(), title="Imported"):
+        with open(os.path.join(self.json_dir, f"{conversation_id}.json"), "w") as f:
+            json.dump({"id": conversation_id, "created_at": "2024-01-01T00:00:00",
+                       "title": title, "messages": list(messages)}, f)
+
+
+class RoundTripTest(SqliteStoreTestCase):
+    def test_create_and_read_back(self):
+        created = sqlite_store.create_conversation("c1")
+        self.assertEqual(sqlite_store.get_conversation("c1"), created)
+        self.assertEqual(created["messages"], [])
+        self.assertIsNone(sqlite_store.get_conversation("nope"))
+
+    def test_messages_and_stage_results(self):
+        sqlite_store.create_conversation("c1")
+        stage1 = [{"model": "a", "response": "one"}, {"model": "b", "response": "two"}]
+        stage2 = [{"model": "a", "ranking": "FINAL RANKING:\n1. Response B", "parsed_ranking": ["Response B"]}]
+        stage3 = {"model": "chair", "response": "final"}
+        metadata = {"label_to_model": {"Response A": "a", "Response B": "b"}, "execution_mode": "full"}
+
+        sqlite_store.add_user_message("c1", "question")
+        sqlite_store.add_assistant_message("c1", stage1, stage2, stage3, metadata)
+        sqlite_store.add_assistant_message("c1", stage1)
+        sqlite_store.add_error_message("c1", "boom")
+        sqlite_store.update_conversation_title("c1", "Asked")
+
+        self.reopen()
+        conversation = sqlite_store.get_conversation("c1")
+        self.assertEqual(conversation["title"], "Asked")
+        self.assertEqual(conversation["messages"], [
+            {"role": "user", "content": "question"},
+            {"role": "assistant", "stage1": stage1, "stage2": stage2, "stage3": stage3, "metadata": metadata},
+            {"role": "assistant", "stage1": stage1},
+            {"role": "assistant", "content": None, "error": "boom", "stage1": [], "stage2": [], "stage3": None},
+        ])
+        listing = sqlite_store.list_conversations()
+        self.assertEqual(listing, [{"id": "c1", "created_at": conversation["created_at"], "title": "Asked", "message_count": 4}])
+
+    def test_save_replaces_conversation(self):
+        sqlite_store.create_conversation("c1")
+        sqlite_store.add_user_message("c1", "old")
+        conversation = sqlite_store.get_conversation("c1")
+        conversation["messages"] = [{"role": "user", "content": "new"}]
+        conversation["title"] = "Saved"
+        sqlite_store.save_conversation(conversation)
+        self.assertEqual(sqlite_store.get_conversation("c1"), conversation)
+
+    def test_missing_conversation_writes_fail(self):
+        with self.assertRaises(ValueError):
+            sqlite_store.add_user_message("nope", "hello")
+        with self.assertRaises(ValueError):
+            sqlite_store.update_conversation_title("nope", "title")
+        self.assertFalse(sqlite_store.delete_conversation("nope"))
+
+    def test_delete_removes_messages(self):
+        sqlite_store.create_conversation("c1")
+        sqlite_store.add_assistant_message("c1", [{"model": "a", "response": "one"}], None, {"response": "x"})
+        self.assertTrue(sqlite_store.delete_conversation("c1"))
+        conn = sqlite_store.get_connection()
+        for table in ("conversations", "messages", "stage_results"):
+            self.assertEqual(conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0], 0)
+
+
+class JsonImportTest(SqliteStoreTestCase):
+    def test_imports_on_first_open(self):
+        self.write_json_conversation("old", [
+            {"role": "user", "content": "question"},
+            {"role": "assistant", "stage1": [{"model": "a", "response": "one"}], "stage3": {"response": "x"}},
+        ])
+        conversation = sqlite_store.get_conversation("old")
+        self.assertEqual(conversation["title"], "Imported")
+        self.assertEqual([m["role"] for m in conversation["messages"]], ["user", "assistant"])
+        self.assertEqual(conversation["messages"][1]["stage3"], {"response": "x"})
+
+    def test_import_runs_once(self):
+        self.write_json_conversation("first")
+        self.assertEqual([c["id"] for c in sqlite_store.list_conversations()], ["first"])
+
+        # Files appearing later are not imported by reopening the database
+        self.write_json_conversation("second")
+        self.reopen()
+        self.assertEqual([c["id"] for c in sqlite_store.list_conversations()], ["first"])
+
+        # ...but the explicit import still picks them up, skipping existing ones
+        self.assertEqual(sqlite_store.import_json_conversations(self.json_dir), 1)
+        self.assertEqual(sqlite_store.import_json_conversations(self.json_dir), 0)
+
+    def test_unreadable_file_is_skipped(self):
+        self.write_json_conversation("good")
+        with open(os.path.join(self.json_dir, "bad.json"), "w") as f:
+            f.write("{not json")
+        with self.assertLogs(sqlite_store.logger, "WARNING"):
+            self.assertEqual([c["id"] for c in sqlite_store.list_conversations()], ["good"])
+
+    def test_failed_import_is_retried(self):
+        self.write_json_conversation("old", [{"role": "user", "content": "question"}])
+        with mock.patch.object(sqlite_store, "_import_conversation", side_effect=RuntimeError("locked")):
+            with self.assertRaises(RuntimeError):
+                sqlite_store.get_connection()
+        self.assertFalse(sqlite_store._initialized)
+
+        conversation = sqlite_store.get_conversation("old")
+        self.assertIsNotNone(conversation)
+        self.assertEqual(conversation["messages"], [{"role": "user", "content": "question"}])
+        self.assertTrue(sqlite_store._initialized)
+
+
+if __name__ == "__main__":
+    unittest.main()
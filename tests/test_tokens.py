@@ -0,0 +1,43 @@
+"""Accuracy of the heuristic token estimates against the shipped reference counts."""
+
+import unittest
+
+from backend.tokens.benchmark import load_reference_counts, relative_errors
+from backend.tokens.families import FAMILIES
+
+# Worst per-sample error allowed for a family fitted to reference counts
+MAX_SAMPLE_ERROR = 0.12
+# Worst error allowed on the total of all samples
+MAX_TOTAL_ERROR = 0.08
+
+
+class HeuristicAccuracyTest(unittest.TestCase):
+    def setUp(self):
+        self.references = load_reference_counts()
+
+    def test_every_fitted_family_has_references(self):
+        self.assertLessEqual({"openai", "anthropic", "llama", "mistral"}, set(self.references))
+
+    def test_per_sample_error_within_bound(self):
+        for family, counts in self.references.items():
+            for sample, error in relative_errors(FAMILIES[family], counts).items():
+                with self.subTest(family=family, sample=sample):
+                    self.assertLessEqual(abs(error), MAX_SAMPLE_ERROR)
+
+    def test_total_error_within_bound(self):
+        for family, counts in self.references.items():
+            errors = relative_errors(FAMILIES[family], counts)
+            total_reference = sum(counts[sample] for sample in errors)
+            total_estimate = sum(counts[sample] * (1 + error) for sample, error in errors.items())
+            with self.subTest(family=family):
+                self.assertLessEqual(abs(total_estimate / total_reference - 1), MAX_TOTAL_ERROR)
+
+    def test_generic_never_underestimates(self):
+        for family, counts in self.references.items():
+            for sample, error in relative_errors(FAMILIES["generic"], counts).items():
+                with self.subTest(family=family, sample=sample):
+                    self.assertGreaterEqual(error, 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+"""Sharded Stage 2: shard assignment, Bradley-Terry merging and aggregate rankings."""
+
+import unittest
+from collections import Counter
+from itertools import combinations
+
+from backend.council import calculate_aggregate_rankings
+from backend.tournament import assign_shards, merge_rankings, response_label
+
+
+def shard_results(order, shards, labels):
+    """Stage 2 results from judges that all agree with the true order (best first)."""
+    rank = {label: position for position, label in enumerate(order)}
+    results = []
+    for judge, shard in enumerate(shards):
+        shard_labels = [labels[i] for i in shard]
+        parsed = sorted(shard_labels, key=rank.get)
+        results.append({
+            "model": f"model-{judge}",
+            "ranking": "FINAL RANKING:\n" + "\n".join(f"{i}. {label}" for i, label in enumerate(parsed, 1)),
+            "parsed_ranking": parsed,
+            "shard": shard_labels,
+        })
+    return results
+
+
+class AssignShardsTest(unittest.TestCase):
+    def test_every_response_is_judged_shard_size_times(self):
+        for count in range(3, 33):
+            for shard_size in range(1, count):
+                with self.subTest(count=count, shard_size=shard_size):
+                    shards = assign_shards(count, shard_size)
+                    self.assertEqual(len(shards), count)
+                    for judge, shard in enumerate(shards):
+                        self.assertEqual(len(set(shard)), shard_size)
+                        self.assertNotIn(judge, shard)
+                    coverage = Counter(index for shard in shards for index in shard)
+                    self.assertEqual(coverage, Counter({index: shard_size for index in range(count)}))
+
+    def test_pairs_meet_about_equally_often(self):
+        for count, shard_size in ((8, 3), (12, 4), (20, 5), (32, 6)):
+            with self.subTest(count=count, shard_size=shard_size):
+                meetings = Counter(pair for shard in assign_shards(count, shard_size) for pair in combinations(shard, 2))
+                counts = [meetings[pair] for pair in combinations(range(count), 2)]
+                self.assertLessEqual(max(counts) - min(counts), shard_size - 1)
+
+    def test_comparisons_connect_all_responses(self):
+        for count in range(3, 33):
+            for shard_size in range(2, count):
+                with self.subTest(count=count, shard_size=shard_size):
+                    reached, frontier = {0}, [0]
+                    shards = assign_shards(count, shard_size)
+                    while frontier:
+                        index = frontier.pop()
+                        for shard in shards:
+                            if index in shard:
+                                frontier.extend(set(shard) - reached)
+                                reached.update(shard)
+                    self.assertEqual(reached, set(range(count)))
+
+    def test_labels(self):
+        self.assertEqual([response_label(i) for i in (0, 25, 26, 27, 51, 52)], ["A", "Z", "AA", "AB", "AZ", "BA"])
+
+
+class MergeRankingsTest(unittest.TestCase):
+    def test_consistent_partial_rankings_recover_the_order(self):
+        count = 12
+        labels = [response_label(i) for i in range(count)]
+        order = labels[::-1]
+        results = shard_results(order, assign_shards(count, 4), labels)
+        strengths = merge_rankings([r["parsed_ranking"] for r in results], labels)
+
+        self.assertEqual(sorted(labels, key=strengths.get, reverse=True), order)
+        self.assertAlmostEqual(sum(strengths.values()) / count, 1.0)
+
+    def test_unranked_items_stay_average(self):
+        strengths = merge_rankings([["A", "B"]], ["A", "B", "C"])
+        self.assertGreater(strengths["A"], strengths["C"])
+        self.assertGreater(strengths["C"], strengths["B"])
+
+    def test_strength_reflects_opponents(self):
+        # A and C each win once, but A beat the response that beat everyone else
+        rankings = [["A", "B"], ["B", "C"], ["B", "D"], ["C", "D"], ["B", "E"]]
+        strengths = merge_rankings(rankings, ["A", "B", "C", "D", "E"])
+        self.assertGreater(strengths["A"], strengths["C"])
+
+
+class AggregateRankingsTest(unittest.TestCase):
+    def test_sharded_results_follow_the_fitted_order(self):
+        count = 10
+        labels = [response_label(i) for i in range(count)]
+        label_to_model = {f"Response {label}": f"model-{i}" for i, label in enumerate(labels)}
+        full_labels = list(label_to_model)
+        order = [full_labels[i] for i in (3, 7, 0, 9, 1, 5, 2, 8, 4, 6)]
+        results = shard_results(order, assign_shards(count, 5), full_labels)
+
+        aggregate = calculate_aggregate_rankings(results, label_to_model)
+        self.assertEqual([entry["model"] for entry in aggregate], [label_to_model[label] for label in order])
+        for entry in aggregate:
+            self.assertIn("strength", entry)
+            self.assertEqual(entry["rankings_count"], 5)
+            self.assertGreaterEqual(entry["average_rank"], 1)
+            self.assertLessEqual(entry["average_rank"], count)
+        # Shard positions are spread over 1..N, so the top response averages 1
+        self.assertEqual(aggregate[0]["average_rank"], 1)
+
+    def test_sharded_rankings_are_reparsed_within_the_shard(self):
+        label_to_model = {"Response A": "a", "Response B": "b", "Response C": "c", "Response D": "d"}
+        results = [
+            {"model": "a", "ranking": "FINAL RANKING:\n1. Response C\n2. Response A\n3. Response B",
+             "shard": ["Response B", "Response C"]},
+            {"model": "b", "ranking": "FINAL RANKING:\n1. Response C\n2. Response D", "shard": ["Response C", "Response D"]},
+        ]
+        aggregate = calculate_aggregate_rankings(results, label_to_model)
+        # 'Response A' is outside judge a's shard and must not count
+        self.assertNotIn("a", [entry["model"] for entry in aggregate])
+        self.assertEqual(aggregate[0]["model"], "c")
+
+    def test_full_rankings_sort_by_average_rank(self):
+        label_to_model = {"Response A": "a", "Response B": "b", "Response C": "c"}
+        results = [
+            {"model": "a", "ranking": "", "parsed_ranking": ["Response B", "Response A", "Response C"]},
+            {"model": "b", "ranking": "", "parsed_ranking": ["Response B", "Response C", "Response A"]},
+            {"model": "c", "ranking": "", "parsed_ranking": ["Response A", "Response B", "Response C"]},
+        ]
+        aggregate = calculate_aggregate_rankings(results, label_to_model)
+        self.assertEqual([entry["model"] for entry in aggregate], ["b", "a", "c"])
+        self.assertNotIn("strength", aggregate[0])
+        self.assertEqual(aggregate[0]["average_rank"], 1.33)
+
+
+if __name__ == "__main__":
+    unittest.main()